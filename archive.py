@@ -0,0 +1,91 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Dict, List
+import json
+import re
+
+from templating import render
+from utils import read_json, write_if_changed
+
+MONTHS_PL = ["styczeń", "luty", "marzec", "kwiecień", "maj", "czerwiec", "lipiec",
+             "sierpień", "wrzesień", "październik", "listopad", "grudzień"]
+
+_LEGACY_LINK_RE = re.compile(r'<li><a href="(\d{4}-\d{2}-\d{2})\.html">')
+
+
+def month_label(month: str) -> str:
+    year, mm = month.split("-")
+    return f"{MONTHS_PL[int(mm) - 1]} {year}"
+
+
+class Archive:
+    """Month-sharded archive backed by ``<site>/archive/index.json``.
+
+    The index maps month -> {date: title}; ``archive.html`` only lists the
+    months and each ``archive/YYYY-MM.html`` shard lists that month's issues.
+    Files go through ``manifest.write`` when a build manifest is given, and
+    are only rewritten when their bytes change either way.
+    """
+
+    def __init__(self, site_dir: str | Path = "site", manifest=None):
+        self.site = Path(site_dir)
+        self._write = manifest.write if manifest is not None else write_if_changed
+        self.dir = self.site / "archive"
+        self.index_path = self.dir / "index.json"
+        self.months: Dict[str, Dict[str, str]] = read_json(self.index_path, {}).get("months", {})
+        if not self.index_path.exists():
+            self._import_legacy()
+
+    def _import_legacy(self) -> None:
+        legacy = self.site / "archive.html"
+        if not legacy.exists():
+            return
+        dates = _LEGACY_LINK_RE.findall(legacy.read_text(encoding="utf-8"))
+        if not dates:
+            return
+        for d in dates:
+            self.months.setdefault(d[:7], {})[d] = ""
+        self.rebuild()
+
+    def __contains__(self, date_str: str) -> bool:
+        return date_str in self.months.get(date_str[:7], {})
+
+    def record(self, date_str: str, title: str = "") -> None:
+        """Add an issue to the in-memory index only; ``rebuild()`` writes it out."""
+        self.months.setdefault(date_str[:7], {}).setdefault(date_str, title)
+
+    def add_issue(self, date_str: str, title: str = "") -> List[Path]:
+        """Record an issue; returns the files it had to write (none if already listed)."""
+        if date_str in self:
+            return []
+        month = date_str[:7]
+        new_month = month not in self.months
+        self.record(date_str, title)
+        written = [self._write_index(), self._write_shard(month)]
+        if new_month:
+            written.append(self._write_top())
+        return written
+
+    def rebuild(self) -> List[Path]:
+        written = [self._write_index()]
+        written += [self._write_shard(m) for m in sorted(self.months)]
+        written.append(self._write_top())
+        return written
+
+    def _write_index(self) -> Path:
+        months = {m: dict(sorted(self.months[m].items())) for m in sorted(self.months)}
+        self._write(self.index_path, json.dumps({"months": months}, ensure_ascii=False, indent=2))
+        return self.index_path
+
+    def _write_shard(self, month: str) -> Path:
+        page = render("archive_month.html", month=month, label=month_label(month),
+                      dates=sorted(self.months[month], reverse=True))
+        path = self.dir / f"{month}.html"
+        self._write(path, page)
+        return path
+
+    def _write_top(self) -> Path:
+        months = [{"month": m, "label": month_label(m)} for m in sorted(self.months, reverse=True)]
+        path = self.site / "archive.html"
+        self._write(path, render("archive_index.html", months=months))
+        return path
@@ -0,0 +1,70 @@
+"""Near-duplicate clustering scaling benchmark.
+
+    python benchmarks/bench_dedup.py [--sizes 10000,20000,50000,100000] [--backend python]
+
+Prints the wall time per size and the fitted log-log slope; a slope close
+to 1.0 means candidate lookup stays sub-quadratic (all-pairs would be 2.0).
+"""
+from __future__ import annotations
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import neardup  # noqa: E402
+
+# every feed query shares a few words, the rest of a headline is drawn from a
+# long-tailed vocabulary like real news text
+COMMON = "ai sztuczna inteligencja model openai google".split()
+VOCAB = [f"w{i}" for i in range(20000)]
+WEIGHTS = [1 / (i + 1) for i in range(len(VOCAB))]
+
+
+def make_items(n: int, dup_rate: float = 0.1, seed: int = 7):
+    rng = random.Random(seed)
+    items = []
+    for i in range(n):
+        if items and rng.random() < dup_rate:
+            base = rng.choice(items)
+            title = base["title"].rsplit(" - ", 1)[0] + " - " + rng.choice(["Onet", "WP", "Bankier", "Interia"])
+        else:
+            words = rng.sample(COMMON, 2) + rng.choices(VOCAB, WEIGHTS, k=7)
+            title = " ".join(words) + " - Onet"
+        items.append({"title": title, "summary": "", "url": f"https://example.com/{i}"})
+    return items
+
+
+def run(sizes, backend):
+    rows = []
+    for n in sizes:
+        items = make_items(n)
+        started = time.perf_counter()
+        kept = sum(1 for _ in neardup.cluster(items, 0.5, backend))
+        elapsed = time.perf_counter() - started
+        rows.append((n, elapsed, kept))
+        print(f"n={n:>7}  {elapsed:8.3f}s  {n / elapsed:10.0f} items/s  clusters={kept}")
+    if len(rows) > 1:
+        xs = [math.log(n) for n, _, _ in rows]
+        ys = [math.log(t) for _, t, _ in rows]
+        mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+        slope = sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / sum((x - mx) ** 2 for x in xs)
+        print(f"log-log slope: {slope:.2f} (1.0 = linear, 2.0 = quadratic)")
+    return rows
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="10000,20000,50000,100000")
+    ap.add_argument("--backend", default="auto", choices=["auto", "python", "datasketch"])
+    args = ap.parse_args(argv)
+    run([int(s) for s in args.sizes.split(",")], args.backend)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Relevance matcher benchmark: legacy substring scans vs the compiled matcher.
+
+    python benchmarks/bench_relevance.py [--terms 3000] [--items 100000]
+"""
+from __future__ import annotations
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import filters  # noqa: E402
+
+# key terms, noise terms and filler text use disjoint syllables, so an item
+# only matches the terms inserted into it
+SYLLABLES = "ba ce dy fo gu ha ki lo mu na pe ro sy ta wu za ść ął óż rz cz".split()
+NOISE_SYLLABLES = "ję vę xę ńj źv jx".split()
+FILLER = "vi xo je bre stu kwi plo dro gle smy".split()
+KEY_SHARE = 0.2
+NOISE_SHARE = 0.1
+
+
+def _word(rng: random.Random, syllables=SYLLABLES) -> str:
+    return "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4)))
+
+
+def make_terms(n: int, rng: random.Random, base=(), syllables=SYLLABLES):
+    terms = set(base)
+    while len(terms) < n:
+        terms.add(" ".join(_word(rng, syllables) for _ in range(rng.choice((1, 1, 2)))))
+    return sorted(terms)
+
+
+def make_items(n: int, rng: random.Random, keys, noise):
+    """About ``KEY_SHARE`` of items carry a key term and ``NOISE_SHARE`` a
+    noise term (independently); the rest match nothing."""
+    items = []
+    for _ in range(n):
+        words = [_word(rng, FILLER) for _ in range(14)]
+        if rng.random() < KEY_SHARE:
+            words.insert(rng.randrange(len(words)), rng.choice(keys))
+        if rng.random() < NOISE_SHARE:
+            words.insert(rng.randrange(len(words)), rng.choice(noise))
+        items.append({"title": " ".join(words[:7]).capitalize(), "summary": " ".join(words[7:])})
+    return items
+
+
+def legacy(items, noise, keys):
+    # filters.is_relevant before the compiled matcher: substring scans that
+    # only look for key terms once a noise term was found
+    out = []
+    for item in items:
+        text = f"{item.get('title','')} {item.get('summary','')}".lower()
+        if any(n in text for n in noise):
+            if not any(k.lower() in text for k in keys):
+                continue
+        out.append(item)
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--terms", type=int, default=3000)
+    ap.add_argument("--items", type=int, default=100000)
+    args = ap.parse_args(argv)
+    rng = random.Random(11)
+    keys = make_terms(args.terms, rng, filters.KEY_TERMS)
+    noise = make_terms(args.terms // 10, rng, syllables=NOISE_SYLLABLES)
+    items = make_items(args.items, rng, keys, noise)
+    cfg = {"filters": {"noise": noise, "key_terms": keys}}
+
+    started = time.perf_counter()
+    filters.matchers(cfg)
+    compile_s = time.perf_counter() - started
+    started = time.perf_counter()
+    kept = filters.filter_relevant([dict(it) for it in items], cfg)
+    compiled_s = time.perf_counter() - started
+    print(f"compiled: {len(keys)} terms built in {compile_s:.3f}s, "
+          f"{len(items)} items in {compiled_s:.3f}s ({len(items) / compiled_s:,.0f} items/s), kept {len(kept)}")
+
+    sample = items[: max(1, len(items) // 20)]
+    started = time.perf_counter()
+    legacy_kept = len(legacy(sample, noise, keys))
+    legacy_s = (time.perf_counter() - started) * len(items) / len(sample)
+    print(f"legacy:   {len(items)} items in ~{legacy_s:.3f}s (extrapolated from {len(sample)}), "
+          f"kept {legacy_kept}/{len(sample)} of the sample, speedup x{legacy_s / compiled_s:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Page rendering benchmark: compiled templates vs the previous f-string code.
+
+    python benchmarks/bench_render.py [--issues 2000] [--items 20]
+"""
+from __future__ import annotations
+import argparse
+import html
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import make_posts  # noqa: E402
+
+
+def legacy_to_md(items: List[Dict]) -> str:
+    lines = []
+    for it in items:
+        lines.append(f"- **{it['title'].strip()}** — {it.get('summary', '').strip()} [Czytaj]({it['url']})")
+    return "\n".join(lines)
+
+
+def legacy_to_html_page(date_str, title, banner, items, footer_links) -> str:
+    lis = []
+    for it in items:
+        lis.append(f"""<li><a href=\"{it['url']}\" target=\"_blank\" rel=\"noopener\">{it['title']}</a>
+        <span class=\"src\">({it.get('source','')})</span></li>""")
+    links = " | ".join([f'<a href="{u}">{t}</a>' for t, u in footer_links])
+    return f"""<!doctype html>
+<html lang="pl">
+<head>
+<meta charset="utf-8" />
+<meta name="viewport" content="width=device-width, initial-scale=1" />
+<title>{title} — {date_str}</title>
+<link rel="stylesheet" href="assets/custom.css" />
+</head>
+<body>
+<header><h1>{banner}</h1><div class="date">{date_str}</div></header>
+<main>
+  <ul class="news">
+    {''.join(lis)}
+  </ul>
+</main>
+<footer>
+  <nav>{links} | <a href="archive.html">Archiwum</a></nav>
+</footer>
+</body>
+</html>"""
+
+
+HTML_CFG = {"title": "Machine Cinema — AI News (PL)", "banner_text": "Machine Cinema — Przegląd AI (PL)",
+            "footer_links": [["GitHub", "https://github.com/"], ["Kontakt", "mailto:x@example.com"]]}
+
+
+def make_issues(n_issues: int, n_items: int):
+    return [
+        {"date": f"2025-{1 + d % 12:02d}-{1 + d % 28:02d}",
+         "items": [{"title": f"OpenAI & Meta: wiadomość {d}-{i} o modelach <AI>", "summary": "Krótki opis zmian.",
+                    "url": f"https://example.com/{d}/{i}?a=1&b=2", "source": "Example"} for i in range(n_items)]}
+        for d in range(n_issues)
+    ]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--issues", type=int, default=2000)
+    ap.add_argument("--items", type=int, default=20)
+    args = ap.parse_args(argv)
+    issues = make_issues(args.issues, args.items)
+
+    started = time.perf_counter()
+    for issue in issues:
+        legacy_to_md(issue["items"])
+        legacy_to_html_page(issue["date"], HTML_CFG["title"], HTML_CFG["banner_text"], issue["items"], HTML_CFG["footer_links"])
+    legacy_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for issue in issues:
+        # the f-string path with the escaping it was missing, for a like-for-like number
+        safe = [{k: html.escape(v) for k, v in it.items()} for it in issue["items"]]
+        legacy_to_md(issue["items"])
+        legacy_to_html_page(issue["date"], html.escape(HTML_CFG["title"]), html.escape(HTML_CFG["banner_text"]),
+                            safe, HTML_CFG["footer_links"])
+    escaped_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in make_posts.render_many(issues, HTML_CFG):
+        pass
+    tpl_s = time.perf_counter() - started
+
+    n = len(issues)
+    print(f"f-string (no escaping): {n / legacy_s:10,.0f} issues/s")
+    print(f"f-string + html.escape: {n / escaped_s:10,.0f} issues/s")
+    print(f"templates (escaped):    {n / tpl_s:10,.0f} issues/s  ({tpl_s / escaped_s:.2f}x the escaped f-string time)")
+
+
+if __name__ == "__main__":
+    main()
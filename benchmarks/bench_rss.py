@@ -0,0 +1,82 @@
+"""Feed parsing benchmark: streaming Google News parser vs feedparser.
+
+    python benchmarks/bench_rss.py [FEED.xml ...] [--scale 1,10] [--repeat 20]
+
+Parses each recorded feed (default: ``tests/fixtures/*.xml``) with
+``rss_stream`` and with feedparser, both capped at ``MAX_ENTRIES`` as in a
+live fetch and uncapped, and prints the best time, entries per second and
+the tracemalloc peak. ``--scale`` repeats the items of each feed to
+simulate larger documents.
+"""
+from __future__ import annotations
+import argparse
+import re
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import feedparser  # noqa: E402
+import fetch_ai_news  # noqa: E402
+import rss_stream  # noqa: E402
+
+_ITEMS_RE = re.compile(rb"(<item>.*</item>)", re.S)
+
+
+def scaled(body: bytes, factor: int) -> bytes:
+    m = _ITEMS_RE.search(body)
+    if factor <= 1 or m is None:
+        return body
+    return body[:m.start()] + m.group(1) * factor + body[m.end():]
+
+
+# (name, cap) -> parse; the capped pair is what a live fetch runs
+CASES = {
+    ("stream", "cap"): fetch_ai_news._parse_entries,
+    ("feedparser", "cap"): fetch_ai_news._feedparser_entries,
+    ("stream", "all"): lambda body: list(rss_stream.iter_entries(body)),
+    ("feedparser", "all"): lambda body: feedparser.parse(body).entries,
+}
+
+
+def measure(fn, body: bytes, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        n = len(fn(body))
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    fn(body)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return n, best, peak
+
+
+def run(paths, scales, repeat):
+    for path in paths:
+        raw = Path(path).read_bytes()
+        for factor in scales:
+            body = scaled(raw, factor)
+            print(f"{Path(path).name} x{factor}  ({len(body) / 1024:.0f} KiB)")
+            for (name, mode), fn in CASES.items():
+                n, secs, peak = measure(fn, body, repeat)
+                print(f"  {name:<10} {mode:<4} {n:>6} entries  {secs * 1000:8.2f} ms  "
+                      f"{n / secs:10.0f} entries/s  peak {peak / 1024:8.0f} KiB")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("feeds", nargs="*")
+    ap.add_argument("--scale", default="1,10")
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args(argv)
+    paths = args.feeds or sorted((ROOT / "tests" / "fixtures").glob("*.xml"))
+    run(paths, [int(s) for s in args.scale.split(",")], args.repeat)
+
+
+if __name__ == "__main__":
+    main()
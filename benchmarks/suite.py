@@ -0,0 +1,209 @@
+"""Hot-path benchmark suite on seeded synthetic items (see synth.py).
+
+    python benchmarks/suite.py run [--sizes 1000,100000,1000000] [--cases dedup,apply_seen] [--out FILE]
+    python benchmarks/suite.py compare BASELINE CURRENT [--tolerance 0.25]
+
+``run`` times each case at each size (best of ``--repeat``, default 5 runs
+below 10k items, 3 below 100k, 1 above) and can write the results as a JSON
+baseline; ``compare`` prints the per-case ratio and exits 1 when any case
+is slower than the baseline by more than the tolerance.
+"""
+from __future__ import annotations
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+for p in (ROOT, ROOT / "benchmarks"):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+
+import filters  # noqa: E402
+import generate_all  # noqa: E402
+import gnews  # noqa: E402
+import make_posts  # noqa: E402
+import synth  # noqa: E402
+import topics  # noqa: E402
+import urlkey  # noqa: E402
+from fetch_ai_news import normalize  # noqa: E402
+from seen_store import SeenStore  # noqa: E402
+from utils import canonical_or_allowed  # noqa: E402
+
+DEFAULT_SIZES = "1000,100000"
+SEED = 2024
+SEEN_MIN = 100_000
+PAGE_ITEMS = 20
+HTML_CFG = {"title": "Machine Cinema — AI News (PL)", "banner_text": "Machine Cinema — Przegląd AI (PL)",
+            "footer_links": [["GitHub", "https://github.com/"], ["Kontakt", "mailto:x@example.com"]]}
+NEWSLETTER = {"mode": "top", "per_bucket": 5, "total_fallback": 10}
+
+# name -> setup(data, tmp) returning the zero-argument callable that is timed
+CASES: Dict[str, Callable[[Dict, Path], Callable[[], object]]] = {}
+
+
+def case(name: str):
+    def deco(fn):
+        CASES[name] = fn
+        return fn
+    return deco
+
+
+def _offline_gnews():
+    # a fresh memo per run, so every run pays for decoding
+    gnews.configure({"link_policy": {"decode_google_news": True, "online_resolver": False}})
+
+
+@case("canonical_or_allowed")
+def _canonical(data, tmp):
+    _offline_gnews()
+    urls = [it["url"] for it in data["raw"]]
+    # urlkey memoizes; clear it so every run normalizes each URL once, as a live run does
+    return lambda: (urlkey.clear(), [canonical_or_allowed(u) for u in urls])
+
+
+@case("normalize")
+def _normalize(data, tmp):
+    _offline_gnews()
+    return lambda: (urlkey.clear(), normalize(data["raw"]))
+
+
+@case("is_relevant")
+def _relevant(data, tmp):
+    items = data["norm"]
+    return lambda: sum(1 for it in items if filters.is_relevant(it))
+
+
+@case("classify_topics")
+def _classify(data, tmp):
+    model = topics.load_model(str(ROOT / "data" / "topic_model.npy"))
+    items, size = data["norm"], topics.BATCH_SIZE
+    return lambda: [model.predict(items[i:i + size]) for i in range(0, len(items), size)]
+
+
+@case("dedup")
+def _dedup(data, tmp):
+    return lambda: filters.dedup(data["norm"])
+
+
+@case("apply_seen")
+def _apply_seen(data, tmp):
+    # a cache at least SEEN_MIN entries large that already holds every other item
+    path = tmp / f"seen_{len(data['norm'])}.jsonl"
+    if not path.exists():
+        store = SeenStore(path)
+        store.add_many((urlkey.key(it["url"]) for it in data["norm"][::2]), 1_700_000_000.0)
+        extra = max(0, SEEN_MIN - len(store))
+        store.add_many((urlkey.key(f"https://old.example/{i}") for i in range(extra)), 1_690_000_000.0)
+        store.flush()
+    cfg = {"seen_cache": {"path": str(path), "ttl_days": None}}
+    return lambda: generate_all.apply_seen(data["norm"], cfg)
+
+
+@case("select_items")
+def _select(data, tmp):
+    cfg = {"newsletter": NEWSLETTER}
+    return lambda: generate_all.select_items(data["norm"], cfg)
+
+
+@case("to_html_page")
+def _html(data, tmp):
+    items = data["norm"]
+    pages = [items[i:i + PAGE_ITEMS] for i in range(0, len(items), PAGE_ITEMS)]
+    return lambda: [make_posts.to_html_page("2025-10-25", HTML_CFG["title"], HTML_CFG["banner_text"], page,
+                                            HTML_CFG["footer_links"]) for page in pages]
+
+
+def _repeat_for(n: int, repeat: int | None) -> int:
+    return repeat or (5 if n < 10_000 else 3 if n < 100_000 else 1)
+
+
+def run(sizes: List[int], names: List[str], repeat: int | None = None) -> Dict:
+    results: Dict[str, Dict[str, Dict]] = {name: {} for name in names}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            raw = synth.make_items(n, SEED)
+            _offline_gnews()
+            data = {"raw": raw, "norm": normalize(raw)}
+            for name in names:
+                best = float("inf")
+                for _ in range(_repeat_for(n, repeat)):
+                    fn = CASES[name](data, Path(tmp))
+                    started = time.perf_counter()
+                    fn()
+                    best = min(best, time.perf_counter() - started)
+                results[name][str(n)] = {"seconds": round(best, 6), "us_per_item": round(best / n * 1e6, 3)}
+                print(f"{name:<22} n={n:>8}  {best:9.4f}s  {best / n * 1e6:9.2f} µs/item", flush=True)
+            del data, raw
+    return {
+        "meta": {"python": platform.python_version(), "machine": platform.machine(),
+                 "platform": platform.platform(terse=True), "seed": SEED,
+                 "created": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": results,
+    }
+
+
+def compare(baseline: Dict, current: Dict, tolerance: float = 0.25) -> List[str]:
+    """Print current/baseline time ratios; returns the regressed ``case@n`` keys."""
+    regressions = []
+    for name, by_size in sorted(current["results"].items()):
+        for n, cur in sorted(by_size.items(), key=lambda kv: int(kv[0])):
+            base = baseline["results"].get(name, {}).get(n)
+            if not base or not base["seconds"]:
+                print(f"{name:<22} n={n:>8}  {cur['seconds']:9.4f}s  (no baseline)")
+                continue
+            ratio = cur["seconds"] / base["seconds"]
+            mark = ""
+            if ratio > 1 + tolerance:
+                mark = "  REGRESSION"
+                regressions.append(f"{name}@{n}")
+            elif ratio < 1 - tolerance:
+                mark = "  faster"
+            print(f"{name:<22} n={n:>8}  {base['seconds']:9.4f}s -> {cur['seconds']:9.4f}s  x{ratio:5.2f}{mark}")
+    return regressions
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run")
+    r.add_argument("--sizes", default=DEFAULT_SIZES)
+    r.add_argument("--cases", default=",".join(CASES), help="comma-separated subset of: " + ", ".join(CASES))
+    r.add_argument("--repeat", type=int, default=None)
+    r.add_argument("--out", help="write results as a JSON baseline")
+    r.add_argument("--compare", metavar="BASELINE", help="compare against a stored baseline afterwards")
+    r.add_argument("--tolerance", type=float, default=0.25)
+    c = sub.add_parser("compare")
+    c.add_argument("baseline")
+    c.add_argument("current")
+    c.add_argument("--tolerance", type=float, default=0.25)
+    args = ap.parse_args(argv)
+
+    if args.cmd == "run":
+        names = [s for s in args.cases.split(",") if s]
+        unknown = [s for s in names if s not in CASES]
+        if unknown:
+            ap.error(f"unknown cases: {', '.join(unknown)}")
+        current = run([int(s) for s in args.sizes.split(",")], names, args.repeat)
+        if args.out:
+            Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+            Path(args.out).write_text(json.dumps(current, indent=2) + "\n", encoding="utf-8")
+        if not args.compare:
+            return 0
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+    else:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        current = json.loads(Path(args.current).read_text(encoding="utf-8"))
+    regressions = compare(baseline, current, args.tolerance)
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
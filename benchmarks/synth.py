@@ -0,0 +1,122 @@
+"""Seeded synthetic news items for the benchmarks.
+
+Titles and summaries are assembled from Polish headline fragments; URLs mix
+publisher links carrying tracking parameters with Google News article links
+that decode offline. A share of items repeats an earlier story: the same
+link with different tracking parameters, or the same headline from another
+outlet.
+"""
+from __future__ import annotations
+import base64
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List
+from zoneinfo import ZoneInfo
+
+TZ = ZoneInfo("Europe/Warsaw")
+
+OUTLETS = [("Onet", "onet.pl"), ("Wirtualna Polska", "wp.pl"), ("Interia", "interia.pl"),
+           ("Bankier", "bankier.pl"), ("Spider's Web", "spidersweb.pl"), ("Antyweb", "antyweb.pl"),
+           ("Rzeczpospolita", "rp.pl"), ("Puls Biznesu", "pb.pl"), ("Gazeta Wyborcza", "wyborcza.pl"),
+           ("Business Insider", "businessinsider.com.pl"), ("Komputer Świat", "komputerswiat.pl")]
+SUBJECTS = ["OpenAI", "Google", "Anthropic", "Meta", "Microsoft", "Nvidia", "Hugging Face", "Polski startup",
+            "Ministerstwo Cyfryzacji", "Unia Europejska", "Naukowcy z Warszawy", "Samsung", "Apple", "Allegro",
+            "Politechnika Wrocławska", "Bank PKO", "Orlen", "Stability", "Mistral", "Amazon"]
+VERBS = ["pokazuje", "wprowadza", "testuje", "ogłasza", "analizuje", "inwestuje w", "krytykuje",
+         "udostępnia", "zapowiada", "wycofuje", "rozwija", "promuje"]
+OBJECTS = ["nowy model językowy", "generatywną sztuczną inteligencję", "asystenta AI dla firm",
+           "uczenie maszynowe w medycynie", "multimodalny model wideo", "narzędzia do rozpoznawania mowy",
+           "regulacje dotyczące AI", "chatbota w języku polskim", "robotykę przemysłową", "centrum danych",
+           "kupon rabatowy na subskrypcję", "system NLP dla urzędów", "model dyfuzyjny do grafiki",
+           "benchmark nowych procesorów", "program szkoleń z AI", "plotka o przejęciu"]
+TAILS = ["", "", "", " w Polsce", " jeszcze w tym roku", " — co to oznacza?", " dla milionów użytkowników",
+         " za miliard dolarów", " po fali krytyki", " szybciej niż zakładano"]
+SUMMARY_BITS = ["Firma przekazała szczegóły podczas konferencji.", "Eksperci komentują zmiany ostrożnie.",
+                "Nowa wersja ma być tańsza i szybsza.", "Rozwiązanie trafi najpierw do klientów biznesowych.",
+                "Według analityków rynek AI rośnie najszybciej w Europie Środkowej.",
+                "Projekt wspiera Narodowe Centrum Badań i Rozwoju.", "Testy potrwają do końca kwartału.",
+                "Użytkownicy zgłaszają błędy w polskiej wersji językowej.", "Dane treningowe pochodzą z otwartych źródeł."]
+TRACKING = ["utm_source=google", "utm_medium=rss", "utm_campaign=feed", "fbclid=IwAR0x", "gclid=EAIa",
+            "utm_content=ai", "ref=gnews"]
+SLUG_CHARS = "abcdefghijklmnoprstuwyz"
+# names of products, places and people, so distinct stories stay distinct
+SYLLABLES = "ba ce dy fo gu ha ki lo mu na pe ro sy ta wu za ść ął óż rz cz".split()
+
+
+def _varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        out.append(b | (0x80 if n else 0))
+        if not n:
+            return bytes(out)
+
+
+def gnews_url(target: str) -> str:
+    """A ``news.google.com/rss/articles/CBMi...`` link wrapping ``target``."""
+    raw = target.encode("utf-8")
+    blob = b"\x08\x13\x22" + _varint(len(raw)) + raw + b"\xd2\x01\x00"
+    return "https://news.google.com/rss/articles/" + base64.urlsafe_b64encode(blob).decode().rstrip("=") + "?oc=5"
+
+
+def _name(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+
+def _publisher_url(rng: random.Random, domain: str, i: int) -> str:
+    slug = "-".join("".join(rng.choices(SLUG_CHARS, k=rng.randint(3, 9))) for _ in range(rng.randint(3, 7)))
+    url = f"https://www.{domain}/technologie/{slug},{i}.html"
+    if rng.random() < 0.6:
+        url += "?" + "&".join(rng.sample(TRACKING, rng.randint(1, 3)))
+    return url
+
+
+def _retrack(rng: random.Random, url: str) -> str:
+    if url.startswith("https://news.google."):
+        return url
+    return url.split("?")[0] + "?" + "&".join(rng.sample(TRACKING, rng.randint(1, 3)))
+
+
+def iter_items(n: int, seed: int = 2024, dup_rate: float = 0.15, gnews_rate: float = 0.5,
+               now: datetime | None = None) -> Iterator[Dict]:
+    """Yield ``n`` raw items shaped like ``fetch_ai_news._to_items`` output."""
+    rng = random.Random(seed)
+    now = now or datetime(2025, 10, 25, 9, 0, tzinfo=TZ)
+    stories: List[Dict] = []
+    for i in range(n):
+        published = (now - timedelta(seconds=rng.randrange(24 * 3600))).isoformat()
+        if stories and rng.random() < dup_rate:
+            base = rng.choice(stories)
+            if rng.random() < 0.5:
+                # same link again, different tracking parameters
+                item = dict(base, url=_retrack(rng, base["url"]), published_at=published)
+            else:
+                # same story from another outlet
+                outlet, domain = rng.choice(OUTLETS)
+                url = _publisher_url(rng, domain, i)
+                item = dict(base, title=f"{base['headline']} - {outlet}", source=outlet, published_at=published,
+                            url=gnews_url(url) if rng.random() < gnews_rate else url)
+        else:
+            outlet, domain = rng.choice(OUTLETS)
+            headline = (f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)} {_name(rng)} "
+                        f"{_name(rng)}{rng.choice(TAILS)}")
+            url = _publisher_url(rng, domain, i)
+            item = {
+                "title": f"{headline} - {outlet}",
+                "headline": headline,
+                "summary": " ".join(rng.sample(SUMMARY_BITS, rng.randint(1, 3))),
+                "url": gnews_url(url) if rng.random() < gnews_rate else url,
+                "source": outlet,
+                "published_at": published,
+                "topic": "Ogólne",
+            }
+            if len(stories) < 50000:
+                stories.append(item)
+        out = dict(item)
+        out.pop("headline", None)
+        yield out
+
+
+def make_items(n: int, seed: int = 2024, **kw) -> List[Dict]:
+    return list(iter_items(n, seed, **kw))
@@ -0,0 +1,86 @@
+"""Several newsletters from one fetch.
+
+The top-level config is the main edition (``site/``, ``out/``, ``data/``).
+Each entry of ``editions`` adds one more: its keys are merged over the main
+config (nested sections key by key, lists replaced), and unless it sets
+them itself it gets its own directories and state files::
+
+    site/<name>/   out/<name>/   data/editions/<name>/{issues,seen.jsonl,...}
+"""
+from __future__ import annotations
+from copy import deepcopy
+from pathlib import Path
+from typing import Dict, List
+import re
+
+MAIN = "main"
+_NAME_RE = re.compile(r"^[a-z0-9][a-z0-9-]*$")
+# what the main edition itself writes directly under site/
+SITE_DIRS = frozenset({"archive", "search", "assets"})
+SITE_SUFFIXES = (".html", ".xml", ".json")
+
+
+def _main_site_path(site_dir: str) -> bool:
+    p = Path(site_dir)
+    if p == Path("site"):
+        return True
+    return p.parent == Path("site") and (p.name in SITE_DIRS or p.name.endswith(SITE_SUFFIXES))
+
+
+def deep_merge(base: Dict, over: Dict) -> Dict:
+    out = deepcopy(base)
+    for key, value in over.items():
+        if isinstance(value, dict) and isinstance(out.get(key), dict):
+            out[key] = deep_merge(out[key], value)
+        else:
+            out[key] = deepcopy(value)
+    return out
+
+
+def edition_configs(cfg: Dict) -> List[Dict]:
+    """The main config followed by one merged config per ``editions`` entry;
+    each carries ``edition: {name, site_dir, out_dir, issues_dir}``."""
+    base = {k: v for k, v in cfg.items() if k != "editions"}
+    out = [dict(base, edition=dirs(base))]
+    names = {MAIN}
+    for over in cfg.get("editions") or []:
+        name = over.get("name") or ""
+        if not _NAME_RE.match(name) or name in names:
+            raise ValueError(f"edition name must be a unique lowercase slug, got {name!r}")
+        if name in SITE_DIRS:
+            raise ValueError(f"edition name {name!r} is a directory of the main site")
+        names.add(name)
+        data_dir = f"data/editions/{name}"
+        own = {
+            "seen_cache": {"path": f"{data_dir}/seen.jsonl", "legacy_path": None},
+            "feed": {"window_path": f"{data_dir}/feed_window.json"},
+        }
+        if (base.get("stories") or {}).get("path"):
+            own["stories"] = {"path": f"{data_dir}/stories.jsonl"}
+        site_url = (base.get("feed") or {}).get("site_url")
+        if site_url:
+            own["feed"]["site_url"] = site_url.rstrip("/") + f"/{name}/"
+        ed = deep_merge(deep_merge(base, own), {k: v for k, v in over.items() if k not in ("name", "output")})
+        ed["edition"] = dict({"name": name, "site_dir": f"site/{name}", "out_dir": f"out/{name}",
+                              "issues_dir": f"{data_dir}/issues"}, **(over.get("output") or {}))
+        if _main_site_path(ed["edition"]["site_dir"]):
+            raise ValueError(f"edition {name!r} would publish into the main site: {ed['edition']['site_dir']}")
+        out.append(ed)
+    seen_paths = [ed["seen_cache"]["path"] for ed in out]
+    if len(set(seen_paths)) != len(seen_paths):
+        raise ValueError("every edition needs its own seen_cache.path")
+    return out
+
+
+def dirs(cfg: Dict) -> Dict:
+    ed = cfg.get("edition") or {}
+    return {
+        "name": ed.get("name", MAIN),
+        "site_dir": ed.get("site_dir", "site"),
+        "out_dir": ed.get("out_dir", "out"),
+        "issues_dir": ed.get("issues_dir", "data/issues"),
+    }
+
+
+def site_path(cfg: Dict, *parts: str) -> Path:
+    return Path(dirs(cfg)["site_dir"], *parts)
@@ -0,0 +1,282 @@
+from __future__ import annotations
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import json
+import os
+import re
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+try:  # optional; see scratch/probes/trafilatura_extract.py
+    import trafilatura
+except ImportError:  # pragma: no cover - exercised when trafilatura is missing
+    trafilatura = None
+
+from utils import LOG, read_json, stable_hash, write_if_changed
+
+USER_AGENT = "MachineCinemaPLNews/1.0 (+https://github.com/GameOwerMedia/MachineCinemaPLNews)"
+LEAD_CHARS = 300
+MAX_BYTES = 2_000_000
+MIN_PARAGRAPH = 40
+
+_CHARSET_RE = re.compile(r"charset=([\w-]+)", re.I)
+_WS_RE = re.compile(r"\s+")
+_SENTENCE_END_RE = re.compile(r"[.!?…](?=\s|$)")
+
+
+class _TextParser(HTMLParser):
+    """Paragraph text, preferring ``<article>`` / ``<main>`` over the whole page."""
+
+    SKIP = {"script", "style", "noscript", "nav", "header", "footer", "aside", "form", "figure", "template"}
+    BLOCKS = {"p", "li", "blockquote", "h2", "h3"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.skip = 0
+        self.main = 0
+        self.block: Optional[List[str]] = None
+        self.main_paras: List[str] = []
+        self.paras: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self.skip += 1
+        elif tag in ("article", "main"):
+            self.main += 1
+        elif tag in self.BLOCKS and not self.skip:
+            self.block = []
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP:
+            self.skip = max(0, self.skip - 1)
+        elif tag in ("article", "main"):
+            self.main = max(0, self.main - 1)
+        elif tag in self.BLOCKS and self.block is not None:
+            text = _WS_RE.sub(" ", "".join(self.block)).strip()
+            if text:
+                (self.main_paras if self.main else self.paras).append(text)
+            self.block = None
+
+    def handle_data(self, data):
+        if self.block is not None and not self.skip:
+            self.block.append(data)
+
+
+def extract_text(html: str) -> str:
+    """Main text of a page, one paragraph per line."""
+    if trafilatura is not None:
+        text = trafilatura.extract(html, include_comments=False, include_tables=False)
+        if text:
+            return text.strip()
+    parser = _TextParser()
+    parser.feed(html)
+    parser.close()
+    paras = parser.main_paras or parser.paras
+    return "\n".join(p for p in paras if len(p) >= MIN_PARAGRAPH)
+
+
+def make_lead(text: str, max_chars: int = LEAD_CHARS) -> str:
+    """First paragraphs of ``text`` up to ``max_chars``, cut at a sentence end."""
+    lead = ""
+    for para in text.splitlines():
+        para = para.strip()
+        if not para:
+            continue
+        lead = f"{lead} {para}".strip()
+        if len(lead) >= max_chars:
+            break
+    if len(lead) <= max_chars:
+        return lead
+    ends = [m.end() for m in _SENTENCE_END_RE.finditer(lead, 0, max_chars + 1)]
+    if ends and ends[-1] >= max_chars // 3:
+        return lead[:ends[-1]]
+    return lead[:max_chars].rsplit(" ", 1)[0] + "…"
+
+
+class ArticleCache:
+    """One JSON file per URL under ``directory``, named ``stable_hash(url)``.
+
+    The access order is kept in ``index.json`` in the same directory (file
+    mtimes do not survive a fresh checkout of the committed cache); once the
+    directory grows past ``max_bytes`` the least recently used files are
+    removed. Call :meth:`save` to persist the order.
+    """
+
+    INDEX = "index.json"
+
+    def __init__(self, directory: str | Path, max_bytes: int = 5_000_000):
+        self.dir = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._files: "OrderedDict[str, int]" = OrderedDict()
+        self.dir.mkdir(parents=True, exist_ok=True)
+        sizes = {p.stem: p.stat().st_size for p in self.dir.glob("*.json") if p.name != self.INDEX}
+        order = [k for k in read_json(self.dir / self.INDEX, []) if k in sizes]
+        # files missing from the index count as least recently used
+        for key in sorted(set(sizes) - set(order)) + order:
+            self._files[key] = sizes[key]
+        self._total = sum(self._files.values())
+
+    def _path(self, key: str) -> Path:
+        return self.dir / f"{key}.json"
+
+    def get(self, url: str) -> Optional[Dict]:
+        key = stable_hash(url)
+        with self._lock:
+            if key not in self._files:
+                return None
+            self._files.move_to_end(key)
+        path = self._path(key)
+        try:
+            rec = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return rec if rec.get("url") == url else None
+
+    def put(self, url: str, rec: Dict) -> None:
+        key = stable_hash(url)
+        data = json.dumps(dict(rec, url=url), ensure_ascii=False).encode("utf-8")
+        path = self._path(key)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self._total += len(data) - self._files.pop(key, 0)
+            self._files[key] = len(data)
+            while self._total > self.max_bytes and len(self._files) > 1:
+                old, size = self._files.popitem(last=False)
+                self._total -= size
+                try:
+                    self._path(old).unlink()
+                except FileNotFoundError:
+                    pass
+
+    def save(self) -> None:
+        with self._lock:
+            order = list(self._files)
+        write_if_changed(self.dir / self.INDEX, json.dumps(order))
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+
+def _download(url: str, timeout: float, max_bytes: int = MAX_BYTES) -> str:
+    req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT, "Accept": "text/html"})
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        body = resp.read(max_bytes)
+        m = _CHARSET_RE.search(resp.headers.get("Content-Type") or "")
+    try:
+        return body.decode(m.group(1) if m else "utf-8", errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+
+class Extractor:
+    """Fetch and extract publisher pages through a bounded thread pool.
+
+    At most ``per_host`` requests run against one host at a time; results
+    and failures are cached, so a rerun only fetches URLs it has not seen
+    (failures are retried after ``retry_failed_s``).
+    """
+
+    def __init__(self, cache: ArticleCache, max_workers: int = 8, per_host: int = 2, timeout: float = 10,
+                 lead_chars: int = LEAD_CHARS, retry_failed_s: float = 24 * 3600, fetch=_download):
+        self.cache = cache
+        self.max_workers = max(1, max_workers)
+        self.per_host = max(1, per_host)
+        self.timeout = timeout
+        self.lead_chars = lead_chars
+        self.retry_failed_s = retry_failed_s
+        self.fetch = fetch
+        self._hosts: Dict[str, threading.BoundedSemaphore] = {}
+        self._hosts_lock = threading.Lock()
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urllib.parse.urlsplit(url).netloc.lower()
+        with self._hosts_lock:
+            sem = self._hosts.get(host)
+            if sem is None:
+                sem = self._hosts[host] = threading.BoundedSemaphore(self.per_host)
+            return sem
+
+    def _cached(self, url: str) -> Optional[Dict]:
+        rec = self.cache.get(url)
+        if rec is not None and rec.get("error") and time.time() - rec.get("fetched", 0) > self.retry_failed_s:
+            return None
+        return rec
+
+    def article(self, url: str) -> Dict:
+        rec = self._cached(url)
+        if rec is not None:
+            return rec
+        try:
+            with self._host_slot(url):
+                html = self.fetch(url, self.timeout)
+            text = extract_text(html)
+            rec = {"lead": make_lead(text, self.lead_chars), "chars": len(text), "fetched": time.time()}
+        except Exception as ex:
+            # anything a bad page does to the extractor is one failed lead, not a failed issue
+            LOG.warning("Article fetch failed for %s: %s", url, ex)
+            rec = {"error": str(ex), "fetched": time.time()}
+        self.cache.put(url, rec)
+        return rec
+
+    def iter_enrich(self, items: Iterable[Dict]) -> Iterator[Dict]:
+        """Yield items in order with ``summary`` replaced by the page lead.
+
+        Up to twice the pool size is kept in flight, so the stage streams
+        instead of waiting for the whole input.
+        """
+        window: "deque[Tuple[Dict, Optional[Future]]]" = deque()
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="article")
+        try:
+            for it in items:
+                url = it.get("url") or ""
+                fut = pool.submit(self.article, url) if _fetchable(url) else None
+                window.append((it, fut))
+                if len(window) >= 2 * self.max_workers:
+                    yield _apply(*window.popleft())
+            while window:
+                yield _apply(*window.popleft())
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+            self.cache.save()
+
+
+def _fetchable(url: str) -> bool:
+    # undecoded Google News links lead to a consent/redirect page, not the article
+    return url.startswith(("http://", "https://")) and "news.google." not in url
+
+
+def _apply(it: Dict, fut: Optional[Future]) -> Dict:
+    rec = fut.result() if fut is not None else None
+    if rec and rec.get("lead"):
+        it["summary_rss"] = it.get("summary", "")
+        it["summary"] = rec["lead"]
+    return it
+
+
+def from_config(cfg: Dict) -> Extractor:
+    ec = cfg.get("extract") or {}
+    cache = ArticleCache(ec.get("cache_dir", "data/article_cache"), int(float(ec.get("cache_max_mb", 5)) * 1_000_000))
+    return Extractor(
+        cache,
+        max_workers=int(ec.get("max_workers", 8)),
+        per_host=int(ec.get("per_host", 2)),
+        timeout=float(ec.get("timeout_s", 10)),
+        lead_chars=int(ec.get("lead_chars", LEAD_CHARS)),
+        retry_failed_s=float(ec.get("retry_failed_hours", 24)) * 3600,
+    )
+
+
+def enabled(cfg: Dict) -> bool:
+    return bool((cfg.get("extract") or {}).get("enabled"))
+
+
+def iter_extract(items: Iterable[Dict], cfg: Dict) -> Iterator[Dict]:
+    return from_config(cfg).iter_enrich(items)
@@ -0,0 +1,142 @@
+"""Per-feed health record, circuit breaker and adaptive polling.
+
+``data/feed_health.json`` keeps, for every configured feed, its last
+``WINDOW`` outcomes, latencies and new-item yields (entries in the window
+whose link was not in the previous fetch of that feed), plus:
+
+- a circuit breaker: ``failure_threshold`` failures in a row open it and
+  the feed is skipped for ``cooldown_h`` hours, doubling with every failed
+  retry up to ``max_cooldown_h``; the first fetch after the cooldown closes
+  it again on success;
+- a poll interval in runs: after ``low_yield_runs`` fetches in a row
+  without a new item the feed is polled every 2nd, then 4th... run (up to
+  ``max_skip_runs`` skipped runs); any new item resets it to every run;
+- an entry cap: a feed that fills its cap with mostly new items gets the
+  cap doubled (up to ``max_entries``); one that stops doing so falls back
+  towards ``entries``.
+"""
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional
+import math
+import time
+
+from utils import read_json, write_json
+
+WINDOW = 20
+DEFAULTS = {
+    "failure_threshold": 3,
+    "cooldown_h": 20,
+    "max_cooldown_h": 160,
+    "low_yield_runs": 3,
+    "max_skip_runs": 7,
+    "entries": 50,
+    "max_entries": 200,
+}
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile, ``q`` in 0..100."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def _push(values: List, value) -> None:
+    values.append(value)
+    del values[:-WINDOW]
+
+
+class FeedHealth:
+    def __init__(self, path: str | None = None, clock=time.time, **settings):
+        self.path = path
+        self.clock = clock
+        self.settings = dict(DEFAULTS, **{k: v for k, v in settings.items() if v is not None})
+        self.feeds: Dict[str, Dict] = read_json(path, {}) if path else {}
+
+    def _rec(self, url: str) -> Dict:
+        rec = self.feeds.setdefault(url, {})
+        for key, value in (("outcomes", []), ("latency_s", []), ("new_items", []), ("streak", 0), ("opened_at", None),
+                           ("opens", 0), ("skip_runs", 0), ("skip_left", 0), ("cap", self.settings["entries"])):
+            rec.setdefault(key, value)
+        return rec
+
+    def cooldown_s(self, rec: Dict) -> float:
+        hours = self.settings["cooldown_h"] * 2 ** max(0, rec.get("opens", 1) - 1)
+        return min(hours, self.settings["max_cooldown_h"]) * 3600
+
+    def check(self, url: str) -> Optional[str]:
+        """None when the feed should be fetched this run, else why it is
+        skipped: ``circuit_open`` or ``backoff``. A backoff check uses up
+        one skipped run."""
+        rec = self.feeds.get(url)
+        if rec is None:
+            return None
+        if rec.get("opened_at") is not None:
+            # after the cooldown the next fetch is the half-open trial
+            return "circuit_open" if self.clock() < rec["opened_at"] + self.cooldown_s(rec) else None
+        if rec.get("skip_left", 0) > 0:
+            rec["skip_left"] -= 1
+            return "backoff"
+        return None
+
+    def cap(self, url: str) -> int:
+        return int((self.feeds.get(url) or {}).get("cap", self.settings["entries"]))
+
+    def success(self, url: str, seconds: float, entries: int, new_items: int) -> None:
+        rec = self._rec(url)
+        _push(rec["outcomes"], 1)
+        _push(rec["latency_s"], round(seconds, 4))
+        _push(rec["new_items"], new_items)
+        rec.update(streak=0, opened_at=None, opens=0, last_ok=self.clock())
+        s = self.settings
+        # poll less often after a run of empty fetches, every run again on a hit
+        recent = rec["new_items"][-s["low_yield_runs"]:]
+        if new_items:
+            rec["skip_runs"] = 0
+        elif len(recent) == s["low_yield_runs"] and not any(recent):
+            rec["skip_runs"] = min(max(1, rec["skip_runs"] * 2), s["max_skip_runs"])
+        rec["skip_left"] = rec["skip_runs"]
+        # a larger cap for feeds that fill it with mostly new items
+        if entries >= rec["cap"] and new_items * 2 >= rec["cap"]:
+            rec["cap"] = min(rec["cap"] * 2, s["max_entries"])
+        elif rec["cap"] > s["entries"] and new_items * 4 < rec["cap"]:
+            rec["cap"] = max(rec["cap"] // 2, s["entries"])
+
+    def failure(self, url: str, error: str) -> None:
+        rec = self._rec(url)
+        _push(rec["outcomes"], 0)
+        rec["streak"] += 1
+        rec["last_error"] = error[:200]
+        if rec["streak"] >= self.settings["failure_threshold"]:
+            rec["opened_at"] = self.clock()
+            rec["opens"] += 1
+
+    def summary(self, url: str) -> Dict:
+        rec = self.feeds.get(url) or {}
+        outcomes, latency, new_items = rec.get("outcomes", []), rec.get("latency_s", []), rec.get("new_items", [])
+        return {
+            "success_rate": round(sum(outcomes) / len(outcomes), 3) if outcomes else None,
+            "latency_p50_s": percentile(latency, 50),
+            "latency_p95_s": percentile(latency, 95),
+            "mean_new_items": round(sum(new_items) / len(new_items), 2) if new_items else None,
+        }
+
+    def save(self, feeds: Iterable[str]) -> None:
+        """Persist the records of ``feeds`` only, so removed feeds are forgotten."""
+        if not self.path:
+            return
+        out = {}
+        for url in feeds:
+            if url in self.feeds:
+                out[url] = dict(self.feeds[url], **self.summary(url))
+        write_json(self.path, out)
+
+
+def open_health(src: Dict) -> Optional[FeedHealth]:
+    """The tracker configured by ``sources.health``; None without a ``path``."""
+    hc = dict(src.get("health") or {})
+    path = hc.pop("path", None)
+    if not path:
+        return None
+    return FeedHealth(path, **{k: v for k, v in hc.items() if k in DEFAULTS})
@@ -1,10 +1,21 @@
 from __future__ import annotations
-from typing import List, Dict
-from datetime import datetime, timedelta
+from typing import Iterable, Iterator, List, Dict, Tuple
+from datetime import datetime, timedelta, timezone
+from itertools import islice
 from zoneinfo import ZoneInfo
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import hashlib
+import time
+import urllib.error
+import urllib.request
+import xml.etree.ElementTree as ET
 import feedparser
 
-from utils import LOG, canonical_or_allowed, now_pl
+import gnews
+import rss_stream
+import urlkey
+from feed_health import FeedHealth, open_health
+from utils import LOG, now_pl, read_json, write_json
 
 TZ = ZoneInfo("Europe/Warsaw")
 
@@ -17,40 +28,212 @@ RSS_FEEDS = [
 ]
 
 
-def _live_fetch_24h(window_hours: int) -> List[Dict]:
-    cutoff = now_pl() - timedelta(hours=window_hours)
+USER_AGENT = "MachineCinemaPLNews/1.0 (+https://github.com/GameOwerMedia/MachineCinemaPLNews)"
+MAX_ENTRIES = 50
+MAX_STATE_FEEDS = 64
+DOWNLOAD_CHUNK = 64 * 1024
+
+
+def _download(url: str, timeout: float, etag: str | None = None,
+              modified: str | None = None) -> Tuple[int, bytes, Dict[str, str]]:
+    headers = {"User-Agent": USER_AGENT}
+    if etag:
+        headers["If-None-Match"] = etag
+    if modified:
+        headers["If-Modified-Since"] = modified
+    req = urllib.request.Request(url, headers=headers)
+    deadline = time.monotonic() + timeout
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            # the socket timeout bounds each recv only; a host trickling bytes
+            # is cut off once the whole download has taken ``timeout``
+            chunks = []
+            while chunk := resp.read1(DOWNLOAD_CHUNK):
+                chunks.append(chunk)
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"download took over {timeout}s")
+            return resp.status, b"".join(chunks), dict(resp.headers)
+    except urllib.error.HTTPError as ex:
+        if ex.code == 304:
+            return 304, b"", dict(ex.headers or {})
+        raise
+
+
+def _feedparser_entries(body: bytes, cutoff: datetime | None = None, limit: int = MAX_ENTRIES) -> List[Dict]:
+    feed = feedparser.parse(body)
+    source = feed.feed.get("title", "Google News")
+    out: List[Dict] = []
+    for entry in feed.entries:
+        parsed = getattr(entry, "published_parsed", None) or getattr(entry, "updated_parsed", None)
+        # feedparser normalizes to UTC
+        dt = datetime(*parsed[:6], tzinfo=timezone.utc).astimezone(TZ) if parsed else None
+        if cutoff is not None and dt is not None and dt < cutoff:
+            continue
+        out.append(
+            {
+                "link": entry.get("link") or entry.get("id") or "",
+                "title": (entry.get("title") or "").strip(),
+                "summary": (entry.get("summary") or entry.get("description") or "").strip(),
+                "published": dt.isoformat() if dt else None,
+                "source": source,
+                "outlet": ((entry.get("source") or {}).get("title") or "").strip() or None,
+            }
+        )
+        if len(out) >= limit:
+            break
+    return out
+
+
+def _parse_entries(body: bytes, cutoff: datetime | None = None, limit: int = MAX_ENTRIES) -> List[Dict]:
+    """Up to ``limit`` entries published at or after ``cutoff``: the
+    streaming Google News parser first, feedparser for any other shape."""
+    try:
+        return list(islice(rss_stream.iter_entries(body, cutoff), limit))
+    except (rss_stream.UnexpectedFeed, ET.ParseError) as ex:
+        LOG.info("Falling back to feedparser: %s", ex)
+        return _feedparser_entries(body, cutoff, limit)
+
+
+def _fetch_feed(url: str, timeout: float, prev: Dict | None = None,
+                cutoff: datetime | None = None, limit: int = MAX_ENTRIES) -> Tuple[List[Dict], Dict, str]:
+    """Returns (entries, new state, status); status is ``not_modified``,
+    ``unchanged`` (same body hash) or ``parsed``."""
+    prev = prev or {}
+    status, body, headers = _download(url, timeout, prev.get("etag"), prev.get("last_modified"))
+    if status == 304 and "entries" in prev:
+        return prev["entries"], dict(prev, checked=now_pl().timestamp()), "not_modified"
+    body_hash = hashlib.sha256(body).hexdigest()
+    if body_hash == prev.get("body_hash") and "entries" in prev:
+        entries, status = prev["entries"], "unchanged"
+    else:
+        entries, status = _parse_entries(body, cutoff, limit), "parsed"
+    state = {
+        "etag": headers.get("ETag") or headers.get("Etag"),
+        "last_modified": headers.get("Last-Modified"),
+        "body_hash": body_hash,
+        "entries": entries,
+        "checked": now_pl().timestamp(),
+    }
+    return entries, state, status
+
+
+def _timed_fetch(url: str, timeout: float, prev: Dict | None = None, cutoff: datetime | None = None,
+                 limit: int = MAX_ENTRIES):
+    started = time.perf_counter()
+    return _fetch_feed(url, timeout, prev, cutoff, limit), time.perf_counter() - started
+
+
+def _to_items(entries: List[Dict], cutoff: datetime) -> List[Dict]:
     out: List[Dict] = []
-    for url in RSS_FEEDS:
-        try:
-            feed = feedparser.parse(url)
-            for entry in feed.entries[:50]:
-                link = entry.get("link") or entry.get("id") or ""
-                title = (entry.get("title") or "").strip()
-                summary = (entry.get("summary") or entry.get("description") or "").strip()
-                dt = None
-                if getattr(entry, "published_parsed", None):
-                    dt = datetime(*entry.published_parsed[:6], tzinfo=TZ)
-                elif getattr(entry, "updated_parsed", None):
-                    dt = datetime(*entry.updated_parsed[:6], tzinfo=TZ)
-                else:
-                    dt = now_pl()
-                if dt < cutoff:
-                    continue
-                out.append(
-                    {
-                        "title": title,
-                        "summary": summary,
-                        "url": canonical_or_allowed(link),
-                        "source": feed.feed.get("title", "Google News"),
-                        "published_at": dt.isoformat(),
-                        "topic": "Ogólne",
-                    }
-                )
-        except Exception as ex:
-            LOG.warning("RSS fetch failed for %s: %s", url, ex)
+    for e in entries:
+        dt = datetime.fromisoformat(e["published"]) if e.get("published") else now_pl()
+        if dt < cutoff:
+            continue
+        out.append(
+            {
+                "title": e["title"],
+                "summary": e["summary"],
+                "url": e["link"],
+                "source": e["source"],
+                "outlet": e.get("outlet"),
+                "published_at": dt.isoformat(),
+                "topic": "Ogólne",
+            }
+        )
     return out
 
 
+def _prune_state(state: Dict[str, Dict], feeds: List[str]) -> Dict[str, Dict]:
+    keep = [u for u in feeds if u in state]
+    others = sorted((u for u in state if u not in feeds), key=lambda u: state[u].get("checked", 0), reverse=True)
+    return {u: state[u] for u in (keep + others)[:MAX_STATE_FEEDS]}
+
+
+def _settle(url: str, fut, wait: float, timeout_s: float, cutoff, prev: Dict | None,
+            health: FeedHealth | None, metrics) -> Tuple[List[Dict], Dict] | None:
+    """Record one feed's outcome; its items and new state, or None if it failed."""
+    known = {e["link"] for e in (prev or {}).get("entries", ())}
+    try:
+        (entries, new_state, status), secs = fut.result(timeout=wait)
+    except FutureTimeout:
+        LOG.warning("RSS fetch timed out for %s after %ss", url, timeout_s)
+        if health is not None:
+            health.failure(url, "timeout")
+        if metrics is not None:
+            metrics.feed(url, None, "timeout")
+        return None
+    except Exception as ex:
+        LOG.warning("RSS fetch failed for %s: %s", url, ex)
+        if health is not None:
+            health.failure(url, str(ex))
+        if metrics is not None:
+            metrics.feed(url, None, "error", error=str(ex))
+        return None
+    items = _to_items(entries, cutoff)
+    if health is not None:
+        health.success(url, secs, len(entries), sum(1 for it in items if it["url"] not in known))
+    if metrics is not None:
+        metrics.feed(url, secs, status, len(entries), len(items))
+    return items, new_state
+
+
+def _iter_live(window_hours: int, timeout_s: float = 12, max_workers: int = 5,
+               state_path: str | None = None, ctx=None, feeds: List[str] | None = None,
+               health: FeedHealth | None = None) -> Iterator[Dict]:
+    feeds = list(feeds or RSS_FEEDS)
+    cutoff = now_pl() - timedelta(hours=window_hours)
+    state: Dict[str, Dict] = read_json(state_path, {}) if state_path else {}
+    metrics = getattr(ctx, "metrics", None)
+    # Feeds behind an open circuit or backing off are not requested at all.
+    due = []
+    for url in feeds:
+        skipped = health.check(url) if health is not None else None
+        if skipped is None:
+            due.append(url)
+        elif metrics is not None:
+            metrics.feed(url, None, skipped)
+    # The run shares one deadline, ``timeout_s`` per wave of ``workers`` feeds;
+    # a feed still running then is abandoned. Its download is itself bounded
+    # by ``timeout_s`` (see _download), so the worker does not outlive the run.
+    workers = max(1, min(max_workers, len(due)))
+    waves = -(-len(due) // workers)
+    deadline = time.monotonic() + timeout_s * waves
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="feed")
+    futures = [pool.submit(_timed_fetch, url, timeout_s, state.get(url), cutoff,
+                           health.cap(url) if health is not None else MAX_ENTRIES) for url in due]
+    finished = 0
+    try:
+        # Results are yielded in feed order, not completion order, so the
+        # downstream tie-breaks stay stable between runs.
+        for url, fut in zip(due, futures):
+            if ctx is not None and ctx.stopped:
+                break
+            finished += 1
+            got = _settle(url, fut, max(0.0, deadline - time.monotonic()), timeout_s, cutoff,
+                          state.get(url), health, metrics)
+            if got is not None:
+                items, state[url] = got
+                yield from items
+    finally:
+        # A run that stops early still records the feeds that already came
+        # back (or ran out of time); their state is left alone so the items
+        # not yielded here are fetched again next run.
+        for url, fut in zip(due[finished:], futures[finished:]):
+            if fut.done() or time.monotonic() >= deadline:
+                _settle(url, fut, 0.0, timeout_s, cutoff, state.get(url), health, metrics)
+        pool.shutdown(wait=False, cancel_futures=True)
+        if state_path:
+            write_json(state_path, _prune_state(state, feeds))
+        if health is not None:
+            health.save(feeds)
+
+
+def _live_fetch_24h(window_hours: int, timeout_s: float = 12, max_workers: int = 5,
+                    state_path: str | None = None, feeds: List[str] | None = None,
+                    health: FeedHealth | None = None) -> List[Dict]:
+    return list(_iter_live(window_hours, timeout_s, max_workers, state_path, feeds=feeds, health=health))
+
+
 def _load_curated() -> List[Dict]:
     import json
     from pathlib import Path
@@ -61,29 +244,50 @@ def _load_curated() -> List[Dict]:
     return json.loads(p.read_text(encoding="utf-8"))
 
 
-def normalize(items: List[Dict]) -> List[Dict]:
-    out: List[Dict] = []
+def iter_normalize(items: Iterable[Dict]) -> Iterator[Dict]:
     for it in items:
-        url = canonical_or_allowed((it.get("url") or "").strip())
+        url = urlkey.canonical((it.get("url") or "").strip())
         if not url:
             continue
-        out.append(
-            {
-                "title": (it.get("title") or "").strip(),
-                "summary": (it.get("summary") or "").strip(),
-                "url": url,
-                "source": (it.get("source") or "unknown").strip(),
-                "published_at": it.get("published_at") or now_pl().isoformat(),
-                "topic": it.get("topic") or "Ogólne",
-            }
-        )
-    return out
+        yield {
+            "title": (it.get("title") or "").strip(),
+            "summary": (it.get("summary") or "").strip(),
+            "url": url,
+            # computed once here; dedup and the seen cache read it back
+            "key": urlkey.digest(url),
+            "source": (it.get("source") or "unknown").strip(),
+            "outlet": (it.get("outlet") or "").strip() or None,
+            "published_at": it.get("published_at") or now_pl().isoformat(),
+            "topic": it.get("topic") or "Ogólne",
+        }
 
 
-def fetch(config) -> List[Dict]:
-    items: List[Dict] = []
+def normalize(items: List[Dict]) -> List[Dict]:
+    return list(iter_normalize(items))
+
+
+def iter_fetch(config, ctx=None) -> Iterator[Dict]:
+    """Raw items from the live feeds, or the curated file when live yields nothing."""
+    gnews.configure(config)
+    live = False
     if config["sources"]["live_enabled"]:
-        items = _live_fetch_24h(int(config["time"]["window_hours"]))
-    if not items and config["sources"]["curated_first"]:
-        items = _load_curated()
-    return normalize(items)
+        src = config["sources"]
+        for it in _iter_live(
+            int(config["time"]["window_hours"]),
+            timeout_s=float(src.get("live_timeout_s", 12)),
+            max_workers=int(src.get("max_concurrency", 5)),
+            state_path=src.get("state_path"),
+            ctx=ctx,
+            feeds=src.get("feeds") or RSS_FEEDS,
+            health=open_health(src),
+        ):
+            live = True
+            yield it
+    if not live and config["sources"]["curated_first"]:
+        yield from _load_curated()
+
+
+def fetch(config) -> List[Dict]:
+    items = normalize(iter_fetch(config))
+    gnews.save()
+    return items
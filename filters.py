@@ -1,5 +1,12 @@
 from __future__ import annotations
-from typing import List, Dict
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
+from collections import Counter
+from functools import lru_cache
+import re
+import unicodedata
+
+from neardup import cluster
+from urlkey import key as url_key
 
 NOISE = ["sponsorowany", "kupon", "rabaty", "benchmark", "plotka", "zniżka"]
 
@@ -9,21 +16,116 @@ KEY_TERMS = [
     "stabilność","OpenAI","Google","Anthropic","Meta","Stability","Hugging Face",
 ]
 
+# Terms this short are acronyms ("AI", "LLM") and must end on a word boundary;
+# longer ones also match inflected forms ("model językowy" -> "model językowych").
+SHORT_TERM = 3
+
+_WS_RE = re.compile(r"\s+")
+
+
+def fold(text: str) -> str:
+    # NFKC + casefold handles Polish capitals (Ż, Ł, Ś) and compatibility forms
+    return _WS_RE.sub(" ", unicodedata.normalize("NFKC", text).casefold()).strip()
+
+
+def _trie_pattern(node: Dict) -> str:
+    alts = []
+    for ch in sorted((k for k in node if k), reverse=True):
+        alts.append(re.escape(ch) + _trie_pattern(node[ch]))
+    if "" in node:
+        # the terminal goes last so the longest term wins
+        alts.append(node[""])
+    if len(alts) == 1:
+        return alts[0]
+    return "(?:" + "|".join(alts) + ")"
+
+
+class TermMatcher:
+    """All terms compiled into one trie-shaped regex; one scan per text."""
+
+    def __init__(self, terms: Iterable[str]):
+        self.canonical: Dict[str, str] = {}
+        trie: Dict = {}
+        for term in terms:
+            key = fold(term)
+            if not key or key in self.canonical:
+                continue
+            self.canonical[key] = term
+            node = trie
+            for ch in key:
+                node = node.setdefault(ch, {})
+            node[""] = r"(?!\w)" if len(key) <= SHORT_TERM else ""
+        self._re = re.compile(r"(?<!\w)" + _trie_pattern(trie)) if trie else None
+
+    def findall(self, folded: str) -> List[str]:
+        if self._re is None:
+            return []
+        hits = dict.fromkeys(self.canonical[m] for m in self._re.findall(folded))
+        return list(hits)
+
+    def search(self, folded: str) -> bool:
+        return self._re is not None and self._re.search(folded) is not None
+
+
+@lru_cache(maxsize=8)
+def _matchers(noise: Tuple[str, ...], keys: Tuple[str, ...]) -> Tuple[TermMatcher, TermMatcher]:
+    return TermMatcher(noise), TermMatcher(keys)
+
+
+def matchers(cfg: Optional[Dict] = None) -> Tuple[TermMatcher, TermMatcher]:
+    terms = (cfg or {}).get("filters") or {}
+    return _matchers(tuple(terms.get("noise") or NOISE), tuple(terms.get("key_terms") or KEY_TERMS))
+
+
+def _item_text(item: Dict) -> str:
+    return fold(f"{item.get('title','')} {item.get('summary','')}")
+
+
 def is_relevant(item: Dict) -> bool:
-    text = f"{item.get('title','')} {item.get('summary','')}".lower()
-    if any(n in text for n in NOISE):
+    noise, keys = matchers()
+    text = _item_text(item)
+    if noise.search(text):
         # allow if KEY_TERMS present (AI value)
-        if not any(k.lower() in text for k in KEY_TERMS):
+        if not keys.search(text):
             return False
     return True
 
-def dedup(items: List[Dict]) -> List[Dict]:
-    seen = set()
-    out = []
+
+def iter_relevant(items: Iterable[Dict], cfg: Optional[Dict] = None) -> Iterator[Dict]:
+    noise, keys = matchers(cfg)
     for it in items:
-        key = it["url"].split("?")[0].rstrip("/")
-        if key in seen:
+        text = _item_text(it)
+        hits = keys.findall(text)
+        if not hits and noise.search(text):
             continue
-        seen.add(key)
-        out.append(it)
+        it["key_hits"] = hits
+        yield it
+
+
+def filter_relevant(items: Iterable[Dict], cfg: Optional[Dict] = None) -> List[Dict]:
+    """Keep relevant items and record the key terms each one hit in ``key_hits``."""
+    return list(iter_relevant(items, cfg))
+
+
+def iter_dedup(items: Iterable[Dict], near_threshold: float | None = 0.5,
+               drops: Optional[Counter] = None) -> Iterator[Dict]:
+    def by_url(stream):
+        seen = set()
+        for it in stream:
+            key = it.get("key") or url_key(it["url"])
+            if key in seen:
+                if drops is not None:
+                    drops["url_duplicate"] += 1
+                continue
+            seen.add(key)
+            yield it
+
+    out = by_url(items)
+    if near_threshold:
+        # collapse the same story syndicated under different URLs
+        out = cluster(out, near_threshold, drops=drops)
     return out
+
+
+def dedup(items: List[Dict], near_threshold: float | None = 0.5) -> List[Dict]:
+    return list(iter_dedup(items, near_threshold))
@@ -1,105 +1,303 @@
 from __future__ import annotations
+import argparse
 import os
+import sys
+import time
 from pathlib import Path
 
+# Only stdlib, utils and the small edition/manifest helpers at module level:
+# the second cron run of the day exits on the idempotent guard, and should not
+# pay for feedparser, the templates, numpy or YAML first. Everything else is
+# imported where it is used.
+from editions import dirs, edition_configs
+from manifest import BuildManifest, github_output
 from utils import (ensure_dirs, load_config, today_pl_date, idempotent_guard_for_today,
-                   read_json, write_json, now_pl, LOG)
-from fetch_ai_news import fetch
-from filters import is_relevant, dedup
-from make_posts import to_md, to_html_page
+                   now_pl, read_json, write_json, write_if_changed, LOG)
 
 def apply_seen(items, cfg):
-    seen_path = cfg["seen_cache"]["path"]
-    seen = read_json(seen_path, {})
-    reset_env = cfg["seen_cache"].get("allow_reset_env")
-    if reset_env and os.getenv(reset_env, "0") == "1":
-        seen = {}
-    ttl_days = cfg["seen_cache"]["ttl_days"]
-    if ttl_days:
-        cutoff = now_pl().timestamp() - (ttl_days*86400)
-        seen = {k:v for k,v in seen.items() if v.get("ts",0) >= cutoff}
-
-    out = []
-    for it in items:
-        url = it["url"]
-        if url in seen:
-            continue
-        out.append(it)
-
+    from seen_store import open_seen_store
+    from story_index import downranks, open_story_index
+    from urlkey import key
+    seen = open_seen_store(cfg)
+    out = [it for it in items if (it.get("key") or key(it["url"])) not in seen]
+    stories = open_story_index(cfg)
+    if stories is not None:
+        out = list(stories.iter_new(out, downranks(cfg)))
     return out, seen
 
-def commit_seen(items_to_record, cfg, prev):
-    seen_path = cfg["seen_cache"]["path"]
-    now = now_pl().timestamp()
-    for it in items_to_record:
-        prev[it["url"]] = {"ts": now}
-    write_json(seen_path, prev)
+def commit_seen(items_to_record, cfg, prev, stories=None, published=None):
+    from urlkey import key
+    ts = now_pl().timestamp()
+    prev.add_many((it.get("key") or key(it["url"]) for it in items_to_record), ts)
+    prev.flush()
+    if stories is not None:
+        stories.add_items(items_to_record if published is None else published, ts)
+        stories.flush()
 
 def select_items(items, cfg):
-    mode = cfg["newsletter"]["mode"]
-    per_bucket = int(cfg["newsletter"]["per_bucket"])
-    if mode == "top":
-        # naive score (recent first), deterministic tie-break by URL
-        items = sorted(items, key=lambda x: (x.get("published_at",""), x["url"]), reverse=True)
-        return items[:max(per_bucket, cfg["newsletter"]["total_fallback"])]
-    # segments (future: split by topic); for now, take first N deterministically
-    items = sorted(items, key=lambda x: (x.get("topic",""), x.get("published_at",""), x["url"]), reverse=True)
-    return items[:per_bucket]
-
-def update_archive(date_str, title):
-    arch = Path("site/archive.html")
-    if arch.exists():
-        html = arch.read_text(encoding="utf-8")
-    else:
-        html = """<!doctype html>\n<html lang=\"pl\">\n<head>\n<meta charset=\"utf-8\" />\n<title>Archiwum — Machine Cinema</title>\n<link rel=\"stylesheet\" href=\"assets/custom.css\" />\n</head>\n<body>\n<header><h1>Archiwum</h1></header>\n<main>\n<ul class=\"archive\">\n</ul>\n</main>\n</body>\n</html>\n"""
-    # Insert newest on top of <ul class="archive">
-    link = f'<li><a href="{date_str}.html">{date_str}</a></li>'
-    if link in html:
+    import ranking
+    # bounded heaps over scored items: global top-k, or top-k per topic
+    return ranking.select(items, cfg)
+
+def sectioned(cfg):
+    return cfg["newsletter"]["mode"] == "segments"
+
+def update_archive(date_str, title, manifest=None, site_dir="site"):
+    from archive import Archive
+    Archive(site_dir, manifest).add_issue(date_str, title)
+
+def update_search(date_str, items, title, manifest=None, site_dir="site"):
+    from search_index import SearchIndex
+    index = SearchIndex(site_dir, manifest)
+    index.add_issue(date_str, items)
+    index.write_page(title)
+
+def update_feeds(date_str, items, cfg, manifest=None):
+    from syndication import open_window, write_feeds
+    window = open_window(cfg)
+    window.add_issue(date_str, items)
+    window.save()
+    write_feeds(window, cfg, dirs(cfg)["site_dir"], manifest)
+
+def copy_assets(cfg, manifest=None):
+    # editions published under site/<name>/ get their own copy of site/assets
+    site_dir = Path(dirs(cfg)["site_dir"])
+    if site_dir == Path("site"):
+        return
+    write = manifest.write if manifest is not None else write_if_changed
+    for f in sorted(Path("site/assets").glob("*")):
+        if f.is_file():
+            write(site_dir / "assets" / f.name, f.read_bytes())
+
+ISSUES_DIR = Path("data/issues")
+
+def save_issue_input(date_str, items, is_sectioned=False, issues_dir=ISSUES_DIR):
+    # the selected items are everything a page is rendered from; keeping them
+    # lets --rebuild re-render old issues after template or CSS changes
+    write_json(Path(issues_dir) / f"{date_str}.json", {"date": date_str, "items": items, "sectioned": is_sectioned})
+
+def write_issue(date_str, cfg, items, is_sectioned=None, manifest=None):
+    from make_posts import render_many
+    if is_sectioned is None:
+        is_sectioned = sectioned(cfg)
+    write = manifest.write if manifest is not None else write_if_changed
+    issue = {"date": date_str, "items": items, "sectioned": is_sectioned}
+    rendered = next(render_many([issue], cfg["html"]))
+    paths = dirs(cfg)
+    out_md = Path(paths["out_dir"]) / f"{date_str}_ALL.md"
+    write(out_md, rendered["md"])
+    site_html = Path(paths["site_dir"]) / f"{date_str}.html"
+    write(site_html, rendered["html"])
+    return out_md, site_html, rendered["html"]
+
+def render_stored_issue(date_str, cfg):
+    started = time.perf_counter()
+    stored = read_json(Path(dirs(cfg)["issues_dir"]) / f"{date_str}.json", {})
+    items = stored.get("items", [])
+    # workers check against the last saved manifest; the parent merges what they wrote
+    manifest = BuildManifest()
+    out_md, site_html, _ = write_issue(date_str, cfg, items, stored.get("sectioned", False), manifest)
+    files = {k: manifest.files[k] for k in (out_md.as_posix(), site_html.as_posix())}
+    return date_str, len(items), time.perf_counter() - started, files, manifest.changed
+
+def rebuild(cfg, date_from=None, date_to=None, workers=None, manifest=None):
+    from concurrent.futures import ProcessPoolExecutor
+    from archive import Archive
+    from search_index import index_issues
+    from syndication import open_window, write_feeds
+    if manifest is None:
+        manifest = BuildManifest()
+    paths = dirs(cfg)
+    site_dir, issues_dir = Path(paths["site_dir"]), Path(paths["issues_dir"])
+    dates = sorted(p.stem for p in issues_dir.glob("*.json"))
+    todo = [d for d in dates if (not date_from or d >= date_from) and (not date_to or d <= date_to)]
+    if not todo:
+        LOG.warning("No stored issues between %s and %s; nothing to rebuild.", date_from or "start", date_to or "end")
+        return []
+    started = time.perf_counter()
+    # each issue is a pure function of its stored items and cfg, so the pool
+    # produces byte-identical files to a serial run
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(render_stored_issue, todo, [cfg] * len(todo)))
+    for date_str, n, secs, files, changed in results:
+        manifest.merge(files, changed)
+        LOG.info("Rebuilt %s (%d items) in %.3fs", date_str, n, secs)
+    total = time.perf_counter() - started
+    LOG.info("Rebuilt %d issues in %.2fs (%.1f issues/s).", len(results), total, len(results) / total if total else 0.0)
+
+    latest = site_dir / f"{dates[-1]}.html"
+    if latest.exists():
+        manifest.write(site_dir / "index.html", latest.read_bytes())
+    copy_assets(cfg, manifest)
+    arch = Archive(site_dir, manifest)
+    for d in todo:
+        arch.record(d, cfg["html"]["title"])
+    arch.rebuild()
+    index_issues((read_json(issues_dir / f"{d}.json", {"date": d}) for d in todo), site_dir, manifest,
+                 cfg["html"]["title"])
+    window = open_window(cfg)
+    for d in todo[-window.max_issues:]:
+        window.add_issue(d, read_json(issues_dir / f"{d}.json", {}).get("items", []))
+    window.save()
+    write_feeds(window, cfg, site_dir, manifest)
+    return results
+
+def parse_args(argv):
+    ap = argparse.ArgumentParser(description="Build today's issue, or re-render stored ones.")
+    ap.add_argument("--rebuild", action="store_true", help="re-render stored issues from data/issues/")
+    ap.add_argument("--from", dest="date_from", metavar="YYYY-MM-DD")
+    ap.add_argument("--to", dest="date_to", metavar="YYYY-MM-DD")
+    ap.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    ap.add_argument("--profile", action="store_true",
+                    help="write cProfile and tracemalloc top-N reports to reports/profile_<date>.txt")
+    ap.add_argument("--profile-top", type=int, default=30, metavar="N")
+    return ap.parse_args(argv)
+
+def profiled(fn, path, top=30):
+    """Run ``fn()`` under cProfile and tracemalloc; write both top-N reports to ``path``."""
+    import cProfile
+    import io
+    import pstats
+    import tracemalloc
+
+    prof = cProfile.Profile()
+    tracemalloc.start()
+    try:
+        return prof.runcall(fn)
+    finally:
+        snap = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        buf = io.StringIO()
+        buf.write(f"== cProfile (top {top} by cumulative time) ==\n")
+        pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(top)
+        buf.write(f"== tracemalloc (top {top} by line, peak {peak / 1024:.1f} KiB) ==\n")
+        for stat in snap.statistics("lineno")[:top]:
+            buf.write(f"{stat}\n")
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(buf.getvalue(), encoding="utf-8")
+        LOG.info("Profile written to %s", path)
+
+def main(argv=None):
+    args = parse_args(argv or [])
+    if args.profile:
+        return profiled(lambda: run(args), f"reports/profile_{today_pl_date()}.txt", args.profile_top)
+    return run(args)
+
+def run(args):
+    # Idempotent guard at 09:00 PL; checked before any config or heavy import
+    if not args.rebuild and os.environ.get("FORCE_RUN","0") != "1" and idempotent_guard_for_today():
+        LOG.info("Today’s issue already exists. Exiting.")
+        github_output(changed=False)
         return
-    html = html.replace('<ul class="archive">\n', '<ul class="archive">\n' + link + '\n')
-    arch.write_text(html if html.endswith("\n") else html + "\n", encoding="utf-8")
 
-def main():
     ensure_dirs()
     cfg = load_config()
     date_str = today_pl_date()
+    manifest = BuildManifest()
 
-    # Idempotent guard at 09:00 PL
-    if os.environ.get("FORCE_RUN","0") != "1" and idempotent_guard_for_today():
-        LOG.info("Today’s issue already exists. Exiting.")
+    if args.rebuild:
+        for ed in edition_configs(cfg):
+            rebuild(ed, args.date_from, args.date_to, args.workers, manifest)
+    else:
+        from metrics import RunMetrics
+        metrics = RunMetrics()
+        try:
+            build_issue(cfg, date_str, metrics, manifest)
+        finally:
+            metrics.write()
+    # later workflow steps skip commit and deploy when nothing changed
+    github_output(changed=bool(manifest.save()))
+
+def build_issue(cfg, date_str, metrics, manifest=None):
+    import gnews
+    from fetch_ai_news import iter_fetch
+    from pipeline import Context, Pipeline, selection_quota, split_stages, stage_names
+
+    editions = edition_configs(cfg)
+    margin = (cfg.get("pipeline") or {}).get("early_stop_margin")
+    if len(editions) == 1:
+        # fetch -> normalize -> relevance -> dedup -> seen, streamed item by item;
+        # the pipeline stops pulling once quota + margin candidates made it through
+        ctx = Context(cfg, selection_quota(cfg), margin, metrics)
+        cand = list(Pipeline.from_config(cfg).run(iter_fetch(cfg, ctx), ctx))
+        gnews.save()
+        publish(cfg, date_str, cand, ctx, metrics, manifest)
         return
 
-    raw = fetch(cfg)
-    raw = [it for it in raw if is_relevant(it)]
-    raw = dedup(raw)
+    # Several editions: fetch and run the edition-independent stages once,
+    # reading every feed (quotas differ per edition, so no early stop), then
+    # fan the shared items out to each edition's own stages
+    shared_names, _ = split_stages(stage_names(cfg))
+    ctx = Context(cfg, selection_quota(cfg), None, metrics)
+    shared = list(Pipeline.from_config(cfg, shared_names).run(iter_fetch(cfg, ctx), ctx))
+    gnews.save()
+    LOG.info("Fetched %d items once for %d editions.", len(shared), len(editions))
+
+    def one(ed):
+        name = dirs(ed)["name"]
+        names = [n for n in stage_names(ed) if n not in shared_names]
+        # the shared items are already fetched: stopping early would only
+        # drop the later feeds' items, so every edition reads them all
+        ectx = Context(ed, selection_quota(ed), None, metrics, name)
+        cand = list(Pipeline.from_config(ed, names).run((dict(it) for it in shared), ectx))
+        publish(ed, date_str, cand, ectx, metrics, manifest)
+
+    workers = int((cfg.get("pipeline") or {}).get("edition_workers") or 1)
+    if workers > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="edition") as pool:
+            list(pool.map(one, editions))
+    else:
+        for ed in editions:
+            one(ed)
 
-    # apply seen-cache before selection
-    cand, prev_seen = apply_seen(raw, cfg)
+def publish(cfg, date_str, cand, ctx, metrics, manifest=None):
+    """Select, write and record one edition's issue from its candidates."""
+    import extract
+    from seen_store import open_seen_store
+    from story_index import open_story_index
 
-    sel = select_items(cand, cfg)
+    prev_seen = ctx.state["seen"] if "seen" in ctx.state else open_seen_store(cfg)
+    stories = ctx.state["stories"] if "stories" in ctx.state else open_story_index(cfg)
+    paths = dirs(cfg)
+    site_dir = Path(paths["site_dir"])
+
+    with metrics.stage(ctx.stage_name("select"), len(cand)) as counts:
+        sel = select_items(cand, cfg)
+        counts["out"] = len(sel)
+    metrics.drop(ctx.stage_name("select"), "not_selected", len(cand) - len(sel))
     if not sel:
-        LOG.warning("No items selected; aborting without writing outputs.")
+        LOG.warning("No items selected for edition %s; not writing its outputs.", paths["name"])
         return
 
-    # Write outputs
-    out_md = Path(f"out/{date_str}_ALL.md")
-    out_md.write_text(to_md(sel), encoding="utf-8")
+    if extract.enabled(cfg):
+        # publisher-page leads, fetched for the selected items only
+        with metrics.stage(ctx.stage_name("extract"), len(sel)) as counts:
+            sel = list(extract.iter_extract(sel, cfg))
+            counts["out"] = len(sel)
 
-    site_html = Path(f"site/{date_str}.html")
-    page_html = to_html_page(date_str, cfg["html"]["title"], cfg["html"]["banner_text"], sel, cfg["html"]["footer_links"])
-    site_html.write_text(page_html, encoding="utf-8")
+    # Write outputs
+    with metrics.stage(ctx.stage_name("write"), len(sel)) as counts:
+        save_issue_input(date_str, sel, sectioned(cfg), paths["issues_dir"])
+        out_md, site_html, page_html = write_issue(date_str, cfg, sel, manifest=manifest)
 
-    # Overwrite index.html
-    Path("site/index.html").write_text(page_html, encoding="utf-8")
+        # Overwrite index.html
+        (manifest.write if manifest is not None else write_if_changed)(site_dir / "index.html", page_html)
+        copy_assets(cfg, manifest)
 
-    # Update archive
-    update_archive(date_str, cfg["html"]["title"])
+        # Update archive
+        update_archive(date_str, cfg["html"]["title"], manifest, site_dir)
+        update_search(date_str, sel, cfg["html"]["title"], manifest, site_dir)
+        update_feeds(date_str, sel, cfg, manifest)
+        counts["out"] = len(sel)
 
     record_only = cfg["seen_cache"].get("record_only_published", True)
     items_for_cache = sel if record_only else cand
-    commit_seen(items_for_cache, cfg, prev_seen)
+    # the story index only ever holds what was actually published
+    commit_seen(items_for_cache, cfg, prev_seen, stories, sel)
 
-    LOG.info("Wrote %s, %s, site/index.html and updated archive.", out_md, site_html)
+    LOG.info("Wrote %s, %s, %s and updated archive.", out_md, site_html, site_dir / "index.html")
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
@@ -0,0 +1,188 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+import base64
+import http.client
+import re
+import threading
+import urllib.parse as _up
+
+import urlkey
+from utils import LOG, read_json, write_json
+
+_ARTICLE_RE = re.compile(r"/articles/([A-Za-z0-9_-]{16,})")
+# IDs whose payload starts with this marker only carry an opaque token;
+# the publisher URL has to be looked up online.
+_OPAQUE_MARKER = b"AU_yqL"
+_MAX_REDIRECTS = 5
+_PRINTABLE_RE = re.compile(rb"[\x21-\x7e]*")
+
+
+def article_id(url: str) -> Optional[str]:
+    if "news.google." not in url:
+        return None
+    m = _ARTICLE_RE.search(_up.urlparse(url).path)
+    return m.group(1) if m else None
+
+
+def _varint(buf: bytes, pos: int) -> Tuple[int, int]:
+    shift = value = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        value |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return value, pos
+        shift += 7
+
+
+def decode_article_id(aid: str) -> Optional[str]:
+    """Pull the publisher URL out of a ``CBMi...`` article ID without network.
+
+    The ID is a urlsafe-base64 protobuf; field 4 holds the article URL
+    (field 26 the AMP URL). Returns None for opaque IDs.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(aid + "=" * (-len(aid) % 4))
+    except (ValueError, TypeError):
+        return None
+    found: Dict[int, str] = {}
+    pos = 0
+    try:
+        while pos < len(raw):
+            key, pos = _varint(raw, pos)
+            field, wire = key >> 3, key & 7
+            if wire == 0:
+                _, pos = _varint(raw, pos)
+            elif wire == 2:
+                size, pos = _varint(raw, pos)
+                chunk = raw[pos:pos + size]
+                if pos + size > len(raw):
+                    # some IDs declare a longer field than they carry; keep the printable URL part
+                    chunk = _PRINTABLE_RE.match(chunk).group(0)
+                pos += size
+                if chunk.startswith(_OPAQUE_MARKER):
+                    return None
+                if chunk.startswith((b"http://", b"https://")):
+                    found.setdefault(field, chunk.decode("utf-8", "replace"))
+            else:
+                break
+    except IndexError:
+        pass
+    return found.get(4) or next(iter(found.values()), None)
+
+
+class RedirectResolver:
+    """Follow HTTP redirects with HEAD requests over kept-alive connections."""
+
+    def __init__(self, timeout: float = 5.0):
+        self.timeout = timeout
+        self._conns: Dict[Tuple[str, str], http.client.HTTPConnection] = {}
+
+    def _conn(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        key = (scheme, netloc)
+        conn = self._conns.get(key)
+        if conn is None:
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = self._conns[key] = cls(netloc, timeout=self.timeout)
+        return conn
+
+    def _head(self, url: str) -> Tuple[int, Optional[str]]:
+        p = _up.urlsplit(url)
+        path = _up.urlunsplit(("", "", p.path or "/", p.query, ""))
+        try:
+            return self._request(self._conn(p.scheme, p.netloc), path)
+        except (http.client.HTTPException, OSError):
+            # a keep-alive connection the server closed gets one fresh retry
+            self._conns.pop((p.scheme, p.netloc)).close()
+            return self._request(self._conn(p.scheme, p.netloc), path)
+
+    @staticmethod
+    def _request(conn: http.client.HTTPConnection, path: str) -> Tuple[int, Optional[str]]:
+        conn.request("HEAD", path, headers={"User-Agent": "MachineCinemaPLNews/1.0"})
+        resp = conn.getresponse()
+        resp.read()
+        return resp.status, resp.getheader("Location")
+
+    def __call__(self, url: str) -> Optional[str]:
+        for _ in range(_MAX_REDIRECTS):
+            status, location = self._head(url)
+            if status not in (301, 302, 303, 307, 308) or not location:
+                return url
+            url = _up.urljoin(url, location)
+        return url
+
+    def close(self) -> None:
+        for conn in self._conns.values():
+            conn.close()
+        self._conns.clear()
+
+
+class GoogleNewsResolver:
+    """Article ID -> publisher URL, memoized in a bounded persistent LRU."""
+
+    def __init__(self, cache_path: Optional[str] = None, max_entries: int = 20000,
+                 online: Optional[Callable[[str], Optional[str]]] = None):
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self.online = online
+        self._memo: "OrderedDict[str, str]" = OrderedDict(read_json(cache_path, {}) if cache_path else {})
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def resolve(self, url: str) -> Optional[str]:
+        aid = article_id(url)
+        if aid is None:
+            return None
+        with self._lock:
+            hit = self._memo.get(aid)
+            if hit is not None:
+                self._memo.move_to_end(aid)
+                return hit
+        target = decode_article_id(aid)
+        if target is None and self.online is not None:
+            try:
+                target = self.online(url)
+            except Exception as ex:
+                LOG.warning("Online resolve failed for %s: %s", url, ex)
+                target = None
+            if target and "news.google." in target:
+                target = None
+        if not target:
+            return None
+        with self._lock:
+            self._memo[aid] = target
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+            self._dirty = True
+        return target
+
+    def save(self) -> None:
+        if self.cache_path and self._dirty:
+            with self._lock:
+                write_json(self.cache_path, dict(self._memo))
+                self._dirty = False
+
+
+_default = GoogleNewsResolver()
+
+
+def configure(cfg: Dict) -> GoogleNewsResolver:
+    global _default
+    urlkey.clear()
+    policy = cfg.get("link_policy") or {}
+    if not policy.get("decode_google_news", True):
+        _default = None
+        return None
+    online = RedirectResolver() if policy.get("online_resolver") else None
+    _default = GoogleNewsResolver(policy.get("gnews_cache_path"), int(policy.get("gnews_cache_max", 20000)), online)
+    return _default
+
+
+def resolve(url: str) -> Optional[str]:
+    return _default.resolve(url) if _default is not None else None
+
+
+def save() -> None:
+    if _default is not None:
+        _default.save()
@@ -1,38 +1,33 @@
 from __future__ import annotations
-from typing import List, Dict
-
-def to_md(items: List[Dict]) -> str:
-    lines = []
-    for it in items:
-        t = it["title"].strip()
-        s = it.get("summary","" ).strip()
-        u = it["url"]
-        lines.append(f"- **{t}** — {s} [Czytaj]({u})")
-    return "\n".join(lines)
-
-def to_html_page(date_str: str, title: str, banner: str, items: List[Dict], footer_links: list) -> str:
-    lis = []
-    for it in items:
-        lis.append(f"""<li><a href=\"{it['url']}\" target=\"_blank\" rel=\"noopener\">{it['title']}</a>
-        <span class=\"src\">({it.get('source','')})</span></li>""")
-    links = " | ".join([f'<a href="{u}">{t}</a>' for t,u in footer_links])
-    return f"""<!doctype html>
-<html lang="pl">
-<head>
-<meta charset="utf-8" />
-<meta name="viewport" content="width=device-width, initial-scale=1" />
-<title>{title} — {date_str}</title>
-<link rel="stylesheet" href="assets/custom.css" />
-</head>
-<body>
-<header><h1>{banner}</h1><div class="date">{date_str}</div></header>
-<main>
-  <ul class="news">
-    {''.join(lis)}
-  </ul>
-</main>
-<footer>
-  <nav>{links} | <a href="archive.html">Archiwum</a></nav>
-</footer>
-</body>
-</html>"""
+from typing import Dict, Iterable, Iterator, List
+
+from ranking import group_by_topic
+from templating import get_template
+
+
+def _context(date_str: str, title: str, banner: str, items: List[Dict], footer_links: list,
+             sectioned: bool = False) -> Dict:
+    return {"date": date_str, "title": title, "banner": banner, "items": items, "footer_links": footer_links,
+            "sections": group_by_topic(items) if sectioned else None}
+
+
+def to_md(items: List[Dict], sectioned: bool = False) -> str:
+    return get_template("issue.md")({"items": items, "sections": group_by_topic(items) if sectioned else None})
+
+
+def to_html_page(date_str: str, title: str, banner: str, items: List[Dict], footer_links: list,
+                 sectioned: bool = False) -> str:
+    return get_template("issue.html")(_context(date_str, title, banner, items, footer_links, sectioned))
+
+
+def render_many(issues: Iterable[Dict], html_cfg: Dict) -> Iterator[Dict]:
+    """Render ``{"date", "items"[, "sectioned"]}`` issues to ``{"date", "md", "html"}``.
+
+    Templates are looked up once for the whole batch and both outputs share
+    one context per issue; the daily page doubles as ``index.html``.
+    """
+    md_tpl, html_tpl = get_template("issue.md"), get_template("issue.html")
+    for issue in issues:
+        ctx = _context(issue["date"], html_cfg["title"], html_cfg["banner_text"], issue["items"], html_cfg["footer_links"],
+                       issue.get("sectioned", False))
+        yield {"date": issue["date"], "md": md_tpl(ctx), "html": html_tpl(ctx)}
@@ -0,0 +1,87 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Dict, Iterable, List
+import hashlib
+import json
+import os
+import threading
+
+from utils import LOG, read_json, write_if_changed
+
+MANIFEST_PATH = "data/build_manifest.json"
+REPORT_PATH = "reports/build_changes.txt"
+
+
+class BuildManifest:
+    """sha256 per output file from the last build, in ``data/build_manifest.json``.
+
+    ``write()`` skips a file whose new bytes hash the same as the recorded
+    ones (and whose size on disk still matches), so unchanged outputs are
+    neither read nor rewritten and keep their mtime. ``changed`` lists the
+    files this build actually wrote.
+    """
+
+    def __init__(self, path: str | Path = MANIFEST_PATH):
+        self.path = Path(path)
+        self.files: Dict[str, str] = read_json(self.path, {}).get("files", {})
+        self.changed: List[str] = []
+        self._dirty = False
+        self._lock = threading.Lock()  # editions may build in threads
+
+    def write(self, path: str | Path, data: str | bytes) -> bool:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        key = Path(path).as_posix()
+        digest = hashlib.sha256(data).hexdigest()
+        if self.files.get(key) == digest and _size(path) == len(data):
+            return False
+        wrote = write_if_changed(path, data)
+        self.record(key, digest, wrote)
+        return wrote
+
+    def record(self, key: str, digest: str, wrote: bool) -> None:
+        with self._lock:
+            if self.files.get(key) != digest:
+                self.files[key] = digest
+                self._dirty = True
+            if wrote and key not in self.changed:
+                self.changed.append(key)
+
+    def merge(self, files: Dict[str, str], changed: Iterable[str]) -> None:
+        """Fold in what another process's manifest wrote (``--rebuild`` workers)."""
+        changed = set(changed)
+        for key, digest in files.items():
+            self.record(key, digest, key in changed)
+
+    def save(self, report: str | Path | None = REPORT_PATH) -> List[str]:
+        """Persist the hashes and list the changed files in ``report``; returns them."""
+        if self._dirty:
+            write_if_changed(self.path, json.dumps({"files": dict(sorted(self.files.items()))}, indent=2))
+            self._dirty = False
+        changed = sorted(self.changed)
+        if report:
+            write_if_changed(report, "".join(f"{p}\n" for p in changed))
+        if changed:
+            LOG.info("Changed %d file(s): %s", len(changed), ", ".join(changed))
+        else:
+            LOG.info("No output files changed.")
+        return changed
+
+
+def _size(path: str | Path) -> int:
+    try:
+        return os.stat(path).st_size
+    except FileNotFoundError:
+        return -1
+
+
+def github_output(**values) -> None:
+    """Append ``key=value`` lines for later workflow steps when running in Actions."""
+    out = os.environ.get("GITHUB_OUTPUT")
+    if not out:
+        return
+    with open(out, "a", encoding="utf-8") as fh:
+        for key, value in values.items():
+            if isinstance(value, bool):
+                value = "true" if value else "false"
+            fh.write(f"{key}={value}\n")
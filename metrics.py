@@ -0,0 +1,99 @@
+from __future__ import annotations
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+import json
+import os
+import time
+
+from utils import LOG, now_pl, write_json
+
+HISTORY_KEEP = 90
+
+
+class Meter:
+    """Iterator wrapper counting items and the time spent producing them."""
+
+    def __init__(self, it):
+        self.it = iter(it)
+        self.count = 0
+        self.seconds = 0.0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            item = next(self.it)
+        finally:
+            self.seconds += time.perf_counter() - started
+        self.count += 1
+        return item
+
+    def close(self):
+        close = getattr(self.it, "close", None)
+        if close is not None:
+            close()
+
+
+class RunMetrics:
+    """Wall time, item counts and drop reasons for one build."""
+
+    def __init__(self):
+        self.started = now_pl()
+        self._t0 = time.perf_counter()
+        self.stages: Dict[str, Dict] = {}
+        self.drops: Dict[str, Counter] = defaultdict(Counter)
+        self.feeds: List[Dict] = []
+
+    def record_stage(self, name: str, seconds: float, items_in: Optional[int], items_out: Optional[int]) -> None:
+        rec = self.stages.setdefault(name, {"seconds": 0.0, "items_in": None, "items_out": None})
+        rec["seconds"] += seconds
+        rec["items_in"], rec["items_out"] = items_in, items_out
+
+    @contextmanager
+    def stage(self, name: str, items_in: Optional[int] = None) -> Iterator[Dict]:
+        """Time a block; set ``counts["out"]`` inside it to record the output size."""
+        counts = {"out": None}
+        started = time.perf_counter()
+        try:
+            yield counts
+        finally:
+            self.record_stage(name, time.perf_counter() - started, items_in, counts["out"])
+
+    def drop(self, stage: str, reason: str, n: int = 1) -> None:
+        self.drops[stage][reason] += n
+
+    def feed(self, url: str, seconds: float | None, status: str, entries: int = 0, in_window: int = 0,
+             error: str | None = None) -> None:
+        self.feeds.append({"url": url, "seconds": None if seconds is None else round(seconds, 4),
+                           "status": status, "entries": entries, "in_window": in_window, "error": error})
+
+    def to_dict(self) -> Dict:
+        stages = {}
+        for name, rec in self.stages.items():
+            out = dict(rec, seconds=round(rec["seconds"], 4))
+            if name in self.drops:
+                out["dropped"] = dict(self.drops[name])
+            stages[name] = out
+        return {
+            "started_at": self.started.isoformat(),
+            "total_seconds": round(time.perf_counter() - self._t0, 4),
+            "stages": stages,
+            "feeds": self.feeds,
+        }
+
+    def write(self, path: str = "reports/run_metrics.json", history: str = "reports/run_metrics_history.jsonl",
+              keep: int = HISTORY_KEEP) -> Dict:
+        data = self.to_dict()
+        write_json(path, data)
+        hist = Path(history)
+        lines = hist.read_text(encoding="utf-8").splitlines() if hist.exists() else []
+        lines = (lines + [json.dumps(data, ensure_ascii=False)])[-keep:]
+        tmp = f"{history}.tmp"
+        Path(tmp).write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(tmp, history)
+        LOG.info("Run metrics: %s", ", ".join(f"{k} {v['seconds']:.3f}s" for k, v in data["stages"].items()))
+        return data
@@ -0,0 +1,148 @@
+from __future__ import annotations
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional
+import html
+import re
+import zlib
+
+try:  # optional; see scratch/probes/datasketch_minhash.py
+    from datasketch import MinHash, MinHashLSH
+except ImportError:  # pragma: no cover - exercised when datasketch is missing
+    MinHash = MinHashLSH = None
+
+NUM_PERM = 60
+BANDS = 12
+_PRIME = (1 << 61) - 1
+_MAX_TOKEN_MEMO = 200_000
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_TOKEN_RE = re.compile(r"\w+")
+# Google News titles end with " - Outlet"; the outlet differs across copies of a story.
+_SOURCE_SUFFIX_RE = re.compile(r"\s+[-–—|]\s+[^-–—|]{2,60}$")
+
+
+def _perms(n: int):
+    # fixed seeds keep signatures identical across runs and processes
+    out, x = [], 0x9E3779B97F4A7C15
+    for _ in range(n):
+        x = (x * 6364136223846793005 + 1442695040888963407) & ((1 << 64) - 1)
+        a = (x >> 3) % _PRIME or 1
+        x = (x * 6364136223846793005 + 1442695040888963407) & ((1 << 64) - 1)
+        out.append((a, (x >> 3) % _PRIME))
+    return out
+
+
+_PERMS = _perms(NUM_PERM)
+_token_memo: Dict[str, tuple] = {}
+
+
+def tokens(item: Dict) -> FrozenSet[str]:
+    title = _SOURCE_SUFFIX_RE.sub("", item.get("title") or "")
+    summary = html.unescape(_TAG_RE.sub(" ", item.get("summary") or ""))
+    text = f"{title} {summary}".casefold()
+    return frozenset(t for t in _TOKEN_RE.findall(text) if len(t) > 1)
+
+
+def _token_vector(tok: str) -> tuple:
+    vec = _token_memo.get(tok)
+    if vec is None:
+        if len(_token_memo) >= _MAX_TOKEN_MEMO:
+            _token_memo.clear()
+        h = zlib.crc32(tok.encode("utf-8"))
+        vec = _token_memo[tok] = tuple((a * h + b) % _PRIME for a, b in _PERMS)
+    return vec
+
+
+def signature(toks: Iterable[str]) -> List[int]:
+    return list(map(min, zip(*map(_token_vector, toks))))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    inter = len(a & b)
+    return inter / (len(a) + len(b) - inter)
+
+
+class NearDupIndex:
+    """Incremental MinHash-LSH index of cluster representatives.
+
+    LSH banding only proposes candidates; a candidate is accepted when the
+    exact token Jaccard reaches ``threshold``, so both backends agree on
+    which items cluster together.
+    """
+
+    def __init__(self, threshold: float = 0.5, backend: str = "auto"):
+        self.threshold = threshold
+        if backend == "auto":
+            backend = "datasketch" if MinHashLSH is not None else "python"
+        self.backend = backend
+        self._reps: List[Dict] = []
+        self._toks: List[FrozenSet[str]] = []
+        if backend == "datasketch":
+            self._lsh = MinHashLSH(num_perm=NUM_PERM, params=(BANDS, NUM_PERM // BANDS))
+        else:
+            self._rows = NUM_PERM // BANDS
+            self._buckets: List[Dict[tuple, List[int]]] = [{} for _ in range(BANDS)]
+
+    def __len__(self) -> int:
+        return len(self._reps)
+
+    def _candidates_python(self, sig: List[int]) -> Iterator[int]:
+        r = self._rows
+        for band, table in enumerate(self._buckets):
+            yield from table.get(tuple(sig[band * r:(band + 1) * r]), ())
+
+    def _insert_python(self, idx: int, sig: List[int]) -> None:
+        r = self._rows
+        for band, table in enumerate(self._buckets):
+            table.setdefault(tuple(sig[band * r:(band + 1) * r]), []).append(idx)
+
+    def add(self, item: Dict) -> Optional[Dict]:
+        """Return the representative ``item`` duplicates, or index it and return None."""
+        toks = tokens(item)
+        if not toks:
+            self._reps.append(item)
+            self._toks.append(toks)
+            return None
+        if self.backend == "datasketch":
+            mh = MinHash(num_perm=NUM_PERM)
+            mh.update_batch([t.encode("utf-8") for t in toks])
+            cands = self._lsh.query(mh)
+        else:
+            sig = signature(toks)
+            cands = self._candidates_python(sig)
+        best, best_sim = None, 0.0
+        for idx in sorted(set(cands)):
+            sim = jaccard(toks, self._toks[idx])
+            if sim >= self.threshold and sim > best_sim:
+                best, best_sim = idx, sim
+        if best is not None:
+            return self._reps[best]
+        idx = len(self._reps)
+        self._reps.append(item)
+        self._toks.append(toks)
+        if self.backend == "datasketch":
+            self._lsh.insert(idx, mh)
+        else:
+            self._insert_python(idx, sig)
+        return None
+
+
+def cluster(items: Iterable[Dict], threshold: float = 0.5, backend: str = "auto",
+            drops: Optional[Counter] = None) -> Iterator[Dict]:
+    """Yield one representative per near-duplicate cluster, first seen wins.
+
+    Each representative carries ``cluster_size``; it keeps growing while
+    later duplicates stream in, so read it after the iterator is exhausted.
+    """
+    index = NearDupIndex(threshold, backend)
+    for it in items:
+        rep = index.add(it)
+        if rep is None:
+            it["cluster_size"] = 1
+            yield it
+        else:
+            rep["cluster_size"] += 1
+            if drops is not None:
+                drops["near_duplicate"] += 1
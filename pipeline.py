@@ -0,0 +1,185 @@
+from __future__ import annotations
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import importlib
+
+from fetch_ai_news import iter_normalize
+from filters import iter_dedup, iter_relevant
+from seen_store import open_seen_store
+from story_index import downranks, open_story_index
+from topics import iter_classify
+from urlkey import key as url_key
+from metrics import Meter, RunMetrics
+from utils import LOG
+
+StageFn = Callable[[Iterator[Dict], "Context"], Iterator[Dict]]
+
+STAGES: Dict[str, StageFn] = {}
+DROP_REASONS: Dict[str, str] = {}
+
+DEFAULT_STAGES = ["normalize", "topic", "relevance", "dedup", "seen", "limit"]
+# stages that only depend on the item itself; with several editions the
+# leading run of these is done once and its output fanned out
+SHARED_STAGES = {"normalize", "topic"}
+
+
+def stage(name: str, drop_reason: Optional[str] = None):
+    """Register ``fn(items, ctx) -> items`` under ``name`` for ``pipeline.stages``.
+
+    ``drop_reason`` labels items the stage removes in run metrics; a stage
+    can report finer reasons itself through ``ctx.metrics.drop``.
+    """
+    def deco(fn: StageFn) -> StageFn:
+        STAGES[name] = fn
+        DROP_REASONS[name] = drop_reason or name
+        return fn
+    return deco
+
+
+class Context:
+    """Shared state for one pipeline run.
+
+    ``stop()`` is the early-termination hook: any stage may call it and the
+    source stops producing at its next checkpoint. Stages can also leave
+    results for the caller in ``state`` (e.g. the open seen store).
+    """
+
+    def __init__(self, cfg: Dict, quota: int, margin: Optional[int] = None, metrics: Optional[RunMetrics] = None,
+                 label: Optional[str] = None):
+        self.cfg = cfg
+        self.metrics = metrics
+        self.label = label
+        self.quota = quota
+        self.want = None if margin is None else quota + margin
+        self.stopped = False
+        self.state: Dict = {}
+
+    def stage_name(self, name: str) -> str:
+        """``name`` as recorded in run metrics; editions prefix their own stages."""
+        return f"{self.label}/{name}" if self.label else name
+
+    def drops(self, name: str):
+        return self.metrics.drops[self.stage_name(name)] if self.metrics is not None else None
+
+    def stop(self) -> None:
+        if not self.stopped:
+            LOG.info("Collected %s candidates (quota %s); stopping upstream work.", self.want, self.quota)
+        self.stopped = True
+
+
+class Pipeline:
+    def __init__(self, stages: List[tuple]):
+        self.stages = stages
+
+    @classmethod
+    def from_config(cls, cfg: Dict, names: Optional[List[str]] = None) -> "Pipeline":
+        pcfg = cfg.get("pipeline") or {}
+        for mod in pcfg.get("plugins") or []:
+            importlib.import_module(mod)
+        if names is None:
+            names = stage_names(cfg)
+        unknown = [n for n in names if n not in STAGES]
+        if unknown:
+            raise ValueError(f"Unknown pipeline stage(s): {', '.join(unknown)}")
+        return cls([(n, STAGES[n]) for n in names])
+
+    def run(self, source: Iterable[Dict], ctx: Context) -> Iterator[Dict]:
+        src = iter(source)
+        items: Iterator[Dict] = src
+        meters = []
+        if ctx.metrics is not None:
+            items = src = Meter(src)
+            meters.append((ctx.stage_name("fetch" if ctx.label is None else "input"), src))
+        for name, fn in self.stages:
+            items = fn(items, ctx)
+            if ctx.metrics is not None:
+                items = Meter(items)
+                meters.append((ctx.stage_name(name), items))
+        try:
+            yield from items
+        finally:
+            # release the source (pending feed downloads, state files) even
+            # when a stage stopped early
+            close = getattr(src, "close", None)
+            if close is not None:
+                close()
+            if ctx.metrics is not None:
+                self._record(meters, ctx.metrics)
+
+    @staticmethod
+    def _record(meters, metrics: RunMetrics) -> None:
+        # each meter's time includes everything upstream of it
+        prev_seconds, prev_count = 0.0, None
+        for name, meter in meters:
+            metrics.record_stage(name, meter.seconds - prev_seconds, prev_count, meter.count)
+            if prev_count is not None:
+                rest = prev_count - meter.count - sum(metrics.drops.get(name, {}).values())
+                if rest > 0:
+                    stage_name = name.rsplit("/", 1)[-1]
+                    metrics.drop(name, DROP_REASONS.get(stage_name, stage_name), rest)
+            prev_seconds, prev_count = meter.seconds, meter.count
+
+
+def stage_names(cfg: Dict) -> List[str]:
+    return list((cfg.get("pipeline") or {}).get("stages") or DEFAULT_STAGES)
+
+
+def split_stages(names: List[str]) -> Tuple[List[str], List[str]]:
+    """``(shared prefix, per-edition rest)`` of a stage list."""
+    n = 0
+    while n < len(names) and names[n] in SHARED_STAGES:
+        n += 1
+    return names[:n], names[n:]
+
+
+def selection_quota(cfg: Dict) -> int:
+    nl = cfg["newsletter"]
+    per_bucket = int(nl["per_bucket"])
+    if nl["mode"] == "top":
+        return max(per_bucket, int(nl["total_fallback"]))
+    # segments: room for every configured topic's quota
+    quotas = {t: per_bucket for t in nl.get("topics") or []}
+    quotas.update({t: int(q) for t, q in (nl.get("quotas") or {}).items()})
+    return max(per_bucket, sum(quotas.values()))
+
+
+@stage("normalize", drop_reason="no_url")
+def _normalize(items, ctx):
+    return iter_normalize(items)
+
+
+@stage("topic")
+def _topic(items, ctx):
+    return iter_classify(items, ctx.cfg)
+
+
+@stage("relevance", drop_reason="noise_without_key_terms")
+def _relevance(items, ctx):
+    return iter_relevant(items, ctx.cfg)
+
+
+@stage("dedup", drop_reason="duplicate")
+def _dedup(items, ctx):
+    return iter_dedup(items, (ctx.cfg.get("dedup") or {}).get("near_threshold", 0.5), ctx.drops("dedup"))
+
+
+@stage("seen", drop_reason="already_published")
+def _seen(items, ctx):
+    seen = ctx.state["seen"] = open_seen_store(ctx.cfg)
+    stories = ctx.state["stories"] = open_story_index(ctx.cfg)
+    fresh = (it for it in items if (it.get("key") or url_key(it["url"])) not in seen)
+    if stories is None:
+        return fresh
+    # same story under another URL, published within stories.ttl_days
+    return stories.iter_new(fresh, downranks(ctx.cfg), ctx.drops("seen"))
+
+
+@stage("limit", drop_reason="over_quota")
+def _limit(items, ctx):
+    if ctx.want is None:
+        yield from items
+        return
+    for n, it in enumerate(items, 1):
+        yield it
+        if n >= ctx.want:
+            ctx.stop()
+            return
@@ -0,0 +1,125 @@
+from __future__ import annotations
+from collections import Counter
+from datetime import datetime
+from heapq import heappush, heappushpop, nlargest
+from typing import Dict, Iterable, List, Optional, Tuple
+import math
+
+from utils import now_pl
+
+DEFAULT_WEIGHTS = {"recency": 1.0, "key_hits": 0.6, "diversity": 0.4, "cluster": 0.5, "repeat": -1.0}
+HALF_LIFE_HOURS = 12.0
+MAX_KEY_HITS = 3
+MAX_CLUSTER = 8
+
+
+def outlet(it: Dict) -> str:
+    return it.get("outlet") or it.get("source") or "unknown"
+
+
+class Scorer:
+    """Item score from recency, key-term hits, source diversity and how many
+    outlets ran the same story (``cluster_size`` from dedup), minus a penalty
+    for stories already published on an earlier day (``repeat_of``).
+
+    Every factor is scaled to 0..1 before weighting. Diversity is the inverse
+    of how often the item's outlet appears among all candidates, so one
+    prolific outlet cannot fill the issue on its own. The outlet is the
+    publisher from the feed item's ``<source>``; items without one (curated
+    entries) fall back to ``source``.
+    """
+
+    def __init__(self, items: List[Dict], weights: Optional[Dict[str, float]] = None,
+                 half_life_hours: float = HALF_LIFE_HOURS, now: Optional[datetime] = None):
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.decay = math.log(2) / (max(half_life_hours, 1e-6) * 3600)
+        self.now = (now or now_pl()).timestamp()
+        self.outlets = Counter(map(outlet, items))
+
+    def factors(self, it: Dict) -> Dict[str, float]:
+        try:
+            age = max(0.0, self.now - datetime.fromisoformat(it["published_at"]).timestamp())
+        except (KeyError, TypeError, ValueError):
+            age = math.inf
+        size = it.get("cluster_size") or 1
+        return {
+            "recency": math.exp(-self.decay * age),
+            "key_hits": min(len(set(it.get("key_hits") or ())), MAX_KEY_HITS) / MAX_KEY_HITS,
+            "diversity": 1.0 / self.outlets[outlet(it)],
+            "cluster": math.log2(min(size, MAX_CLUSTER)) / math.log2(MAX_CLUSTER),
+            "repeat": 1.0 if it.get("repeat_of") else 0.0,
+        }
+
+    def __call__(self, it: Dict) -> float:
+        w = self.weights
+        f = self.factors(it)
+        return (w["recency"] * f["recency"] + w["key_hits"] * f["key_hits"]
+                + w["diversity"] * f["diversity"] + w["cluster"] * f["cluster"] + w["repeat"] * f["repeat"])
+
+
+def _key(score: float, it: Dict) -> Tuple:
+    # deterministic tie-break: newer first, then by URL
+    return (score, it.get("published_at") or "", it["url"])
+
+
+def top_k(items: Iterable[Dict], k: int, scorer: Scorer) -> List[Dict]:
+    """The ``k`` best items, best first, in O(n log k)."""
+    if k <= 0:
+        return []
+    best = nlargest(k, ((_key(scorer(it), it), it) for it in items), key=lambda p: p[0])
+    return [dict(it, score=round(key[0], 4)) for key, it in best]
+
+
+def top_k_per_topic(items: Iterable[Dict], quotas: Dict[str, int], default: int,
+                    scorer: Scorer) -> Dict[str, List[Dict]]:
+    """One bounded min-heap per topic; returns topic -> items, best first."""
+    heaps: Dict[str, List] = {}
+    seq = 0
+    for it in items:
+        topic = it.get("topic") or "Ogólne"
+        quota = quotas.get(topic, default)
+        if quota <= 0:
+            continue
+        heap = heaps.setdefault(topic, [])
+        # seq keeps heap entries comparable without ever comparing the dicts
+        entry = (_key(scorer(it), it), seq, it)
+        seq += 1
+        if len(heap) < quota:
+            heappush(heap, entry)
+        elif entry[0] > heap[0][0]:
+            heappushpop(heap, entry)
+    return {
+        topic: [dict(it, score=round(key[0], 4)) for key, _, it in sorted(heap, reverse=True)]
+        for topic, heap in heaps.items()
+    }
+
+
+def select(items: List[Dict], cfg: Dict, now: Optional[datetime] = None) -> List[Dict]:
+    """Pick the issue's items per ``newsletter.mode``.
+
+    ``top`` keeps the global top ``max(per_bucket, total_fallback)``;
+    ``segments`` keeps up to ``newsletter.quotas[topic]`` (default
+    ``per_bucket``) per topic and returns them grouped by topic, in
+    ``newsletter.topics`` order when given, else best section first.
+    """
+    nl = cfg["newsletter"]
+    rk = cfg.get("ranking") or {}
+    scorer = Scorer(items, rk.get("weights"), float(rk.get("half_life_hours", HALF_LIFE_HOURS)), now)
+    per_bucket = int(nl["per_bucket"])
+    if nl["mode"] == "top":
+        return top_k(items, max(per_bucket, int(nl["total_fallback"])), scorer)
+    sections = top_k_per_topic(items, {k: int(v) for k, v in (nl.get("quotas") or {}).items()}, per_bucket, scorer)
+    order = [t for t in nl.get("topics") or [] if t in sections]
+    order += sorted((t for t in sections if t not in order), key=lambda t: (-sections[t][0]["score"], t))
+    return [it for t in order for it in sections[t]]
+
+
+def group_by_topic(items: List[Dict]) -> List[Dict]:
+    """Consecutive runs of one topic -> ``[{"topic", "items"}]`` for sectioned templates."""
+    sections: List[Dict] = []
+    for it in items:
+        topic = it.get("topic") or "Ogólne"
+        if not sections or sections[-1]["topic"] != topic:
+            sections.append({"topic": topic, "items": []})
+        sections[-1]["items"].append(it)
+    return sections
@@ -0,0 +1,129 @@
+"""Static client-side search over published issues, under ``site/search/``.
+
+- ``terms/<pp>.json``: term -> sorted doc ids, one shard per 2-character
+  term prefix, so a query only downloads the shards of its own words;
+- ``docs/YYYY-MM.json``: doc id -> ``[title, url, source, topic]``;
+- ``index.json``: which shards each issue date wrote to.
+
+A doc id is ``yyyymmdd * 1000 + position in the issue``. Terms are folded
+to ASCII (``ł`` -> ``l``, ``ż`` -> ``z``) and cut to ``STEM`` characters, a
+crude stand-in for Polish stemming (``modelu``, ``modele``, ``modeli`` ->
+``model``). ``assets/search.js`` tokenizes queries the same way.
+"""
+from __future__ import annotations
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Set
+import json
+import re
+import unicodedata
+
+from templating import render
+from utils import read_json, write_if_changed
+
+STEM = 5
+PREFIX = 2
+MAX_ITEMS = 1000
+STOPWORDS = frozenset(
+    "ale az bo by byc co czy dla do go ich im jak jako jej jest jego ja juz ku lub ma na nad nie niz no od oraz "
+    "po pod przez przy sa sie ta tak te tej to tu ty tym we za ze zas".split()
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_TAG_RE = re.compile(r"<[^>]+>")
+# letters NFKD does not decompose; written into search.html for search.js
+FOLD = {"ł": "l", "đ": "d", "ø": "o", "ß": "ss"}
+_EXTRA = str.maketrans(FOLD)
+
+
+def fold(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text.casefold().translate(_EXTRA))
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def terms(text: str) -> Set[str]:
+    return {t[:STEM] for t in _TOKEN_RE.findall(fold(text)) if len(t) > 1 and t not in STOPWORDS}
+
+
+def item_terms(it: Dict) -> Set[str]:
+    summary = _TAG_RE.sub(" ", it.get("summary_rss") or it.get("summary") or "")
+    return terms(" ".join((it.get("title") or "", summary, it.get("source") or "", it.get("topic") or "")))
+
+
+def doc_id(date_str: str, pos: int) -> int:
+    return int(date_str.replace("-", "")) * MAX_ITEMS + pos
+
+
+def _dumps(data) -> str:
+    # sorted and compact: byte-stable output, so unchanged shards are skipped
+    return json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+class SearchIndex:
+    """Term and doc shards under ``<site>/search``, updated one issue at a time."""
+
+    def __init__(self, site_dir: str | Path = "site", manifest=None):
+        self.site = Path(site_dir)
+        self.dir = self.site / "search"
+        self.index_path = self.dir / "index.json"
+        self._write = manifest.write if manifest is not None else write_if_changed
+        self.dates: Dict[str, List[str]] = read_json(self.index_path, {}).get("dates", {})
+
+    def _shard(self, prefix: str) -> Path:
+        return self.dir / "terms" / f"{prefix}.json"
+
+    def add_issue(self, date_str: str, items: List[Dict]) -> List[Path]:
+        """Index one issue, replacing what an earlier build of the same date
+        indexed; only the shards for its terms (old and new) are touched."""
+        if len(items) > MAX_ITEMS:
+            raise ValueError(f"issue {date_str} has more than {MAX_ITEMS} items")
+        lo = doc_id(date_str, 0)
+        postings: Dict[str, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+        for pos, it in enumerate(items):
+            for term in item_terms(it):
+                postings[term[:PREFIX]][term].append(lo + pos)
+        prefixes = sorted(postings)
+        written = []
+        for prefix in sorted(set(prefixes) | set(self.dates.get(date_str, ()))):
+            path = self._shard(prefix)
+            shard: Dict[str, List[int]] = read_json(path, {})
+            for term in list(shard):
+                ids = [d for d in shard[term] if not lo <= d < lo + MAX_ITEMS]
+                if ids:
+                    shard[term] = ids
+                else:
+                    del shard[term]
+            for term, ids in postings.get(prefix, {}).items():
+                shard[term] = sorted(set(shard.get(term, ())) | set(ids))
+            if shard:
+                self._write(path, _dumps(shard))
+            elif path.exists():
+                path.unlink()
+            written.append(path)
+
+        month = self.dir / "docs" / f"{date_str[:7]}.json"
+        docs = {k: v for k, v in read_json(month, {}).items() if not lo <= int(k) < lo + MAX_ITEMS}
+        for pos, it in enumerate(items):
+            docs[str(lo + pos)] = [it.get("title") or "", it["url"], it.get("source") or "", it.get("topic") or ""]
+        self._write(month, _dumps(docs))
+        written.append(month)
+
+        self.dates[date_str] = prefixes
+        self._write(self.index_path, _dumps({"dates": dict(sorted(self.dates.items()))}))
+        written.append(self.index_path)
+        return written
+
+    def write_page(self, title: str) -> Path:
+        path = self.site / "search.html"
+        self._write(path, render("search.html", title=title, stem=STEM, prefix=PREFIX,
+                                 stopwords=" ".join(sorted(STOPWORDS)),
+                                 fold=" ".join(f"{k}={v}" for k, v in FOLD.items())))
+        return path
+
+
+def index_issues(issues: Iterable[Dict], site_dir: str | Path = "site", manifest=None, title: str = "") -> SearchIndex:
+    index = SearchIndex(site_dir, manifest)
+    for issue in issues:
+        index.add_issue(issue["date"], issue.get("items", []))
+    index.write_page(title)
+    return index
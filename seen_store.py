@@ -0,0 +1,148 @@
+from __future__ import annotations
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Tuple
+import json
+import os
+
+from urlkey import is_key, offline_key
+from utils import LOG, now_pl, read_json
+
+
+class SeenStore:
+    """Append-only seen cache: one JSON line per recorded key.
+
+    Keys live in an OrderedDict kept in timestamp order, so membership is
+    O(1) and TTL eviction only walks the expired head. Re-recording or
+    evicting a key leaves a dead line behind; the log is compacted once
+    dead lines outnumber live ones.
+    """
+
+    COMPACT_MIN_LINES = 64
+
+    def __init__(self, path: str, legacy_path: str | None = None):
+        self.path = Path(path)
+        self._keys: "OrderedDict[str, float]" = OrderedDict()
+        self._pending: List[Tuple[str, float]] = []
+        self._lines = 0
+        self._rewrite = False
+        if self.path.exists():
+            self._load()
+        elif legacy_path and Path(legacy_path).exists():
+            self._migrate(Path(legacy_path))
+
+    def _load(self) -> None:
+        with self.path.open(encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                self._lines += 1
+                try:
+                    rec = json.loads(line)
+                    self._put(rec["k"], float(rec["ts"]))
+                except (ValueError, KeyError, TypeError):
+                    LOG.warning("Skipping bad line in %s: %r", self.path, line[:80])
+
+    def _migrate(self, legacy: Path) -> None:
+        data: Dict[str, Dict] = read_json(legacy, {})
+        for key, rec in sorted(data.items(), key=lambda kv: (kv[1].get("ts", 0), kv[0])):
+            self._put(key, float(rec.get("ts", 0)))
+        self._compact()
+        legacy.unlink()
+        LOG.info("Migrated %d seen entries from %s to %s", len(self._keys), legacy, self.path)
+
+    def _put(self, key: str, ts: float) -> None:
+        if key in self._keys:
+            self._keys.move_to_end(key)
+        self._keys[key] = ts
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def get(self, key: str) -> float | None:
+        return self._keys.get(key)
+
+    def evict_before(self, cutoff: float) -> int:
+        evicted = 0
+        while self._keys:
+            key, ts = next(iter(self._keys.items()))
+            if ts >= cutoff:
+                break
+            self._keys.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def clear(self) -> None:
+        self._keys.clear()
+        self._pending.clear()
+        self._rewrite = True
+
+    def rekey(self, fn: Callable[[str], str], keep: Callable[[str], bool]) -> int:
+        """Replace every key failing ``keep`` with ``fn(key)``, keeping the
+        timestamps, and rewrite the log so the work is not repeated next run."""
+        if all(map(keep, self._keys)):
+            return 0
+        old, self._keys = self._keys, OrderedDict()
+        changed = 0
+        for key, ts in old.items():
+            if not keep(key):
+                key, changed = fn(key), changed + 1
+            self._put(key, ts)
+        self._compact()
+        return changed
+
+    def add(self, key: str, ts: float) -> None:
+        self._put(key, ts)
+        self._pending.append((key, ts))
+
+    def add_many(self, keys: Iterable[str], ts: float) -> None:
+        for key in keys:
+            self.add(key, ts)
+
+    def _compact(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as fh:
+            for key, ts in self._keys.items():
+                fh.write(_line(key, ts))
+        os.replace(tmp, self.path)
+        self._lines = len(self._keys)
+        self._pending.clear()
+        self._rewrite = False
+
+    def flush(self) -> None:
+        dead = self._lines + len(self._pending) - len(self._keys)
+        if self._rewrite or (self._lines >= self.COMPACT_MIN_LINES and dead > len(self._keys)):
+            self._compact()
+            return
+        if not self._pending:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.writelines(_line(key, ts) for key, ts in self._pending)
+        self._lines += len(self._pending)
+        self._pending.clear()
+
+
+def _line(key: str, ts: float) -> str:
+    return json.dumps({"k": key, "ts": round(ts, 3)}, ensure_ascii=False) + "\n"
+
+
+def open_seen_store(cfg: Dict) -> SeenStore:
+    sc = cfg["seen_cache"]
+    seen = SeenStore(sc["path"], sc.get("legacy_path"))
+    # entries written before URL keys were introduced hold the canonical URL
+    migrated = seen.rekey(offline_key, is_key)
+    if migrated:
+        LOG.info("Migrated %d seen entries in %s to URL keys", migrated, sc["path"])
+    reset_env = sc.get("allow_reset_env")
+    if reset_env and os.getenv(reset_env, "0") == "1":
+        seen.clear()
+    ttl_days = sc.get("ttl_days")
+    if ttl_days:
+        seen.evict_before(now_pl().timestamp() - (ttl_days * 86400))
+    return seen
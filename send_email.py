@@ -1,9 +1,209 @@
 from __future__ import annotations
-import os, smtplib
+import json, os, queue, smtplib, threading, time
 from email.mime.text import MIMEText
-from utils import read_textfile, today_pl_date, load_config
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from utils import LOG, read_textfile, today_pl_date, load_config
 
-def send_latest(html_path: str, subject_prefix: str):
+
+class RateLimiter:
+    """Token bucket shared by all delivery workers (messages per second)."""
+
+    def __init__(self, rate_per_sec: float | None):
+        self.rate = rate_per_sec
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def acquire(self) -> None:
+        if not self.rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + 1.0 / self.rate
+        if wait > 0:
+            time.sleep(wait)
+
+
+class SendLog:
+    """Per-issue JSON-lines log of delivered and hard-failed recipients.
+
+    Lines are flushed and fsynced after every batch, so a crashed run can
+    be restarted and skips everyone already handled.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.done: Set[str] = set()
+        self._lock = threading.Lock()
+        if self.path.exists():
+            for line in self.path.read_text(encoding="utf-8").splitlines():
+                try:
+                    self.done.add(json.loads(line)["rcpt"])
+                except (ValueError, KeyError):
+                    continue
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = self.path.open("a", encoding="utf-8")
+
+    def record(self, rcpts: Iterable[str], status: str, code: int | None = None) -> None:
+        with self._lock:
+            for r in rcpts:
+                self._fh.write(json.dumps({"rcpt": r, "status": status, "code": code}) + "\n")
+                self.done.add(r)
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+class DeliveryAborted(RuntimeError):
+    """A failure that is not about any recipient (bad credentials, TLS,
+    refused sender); nobody is logged, so a rerun retries everyone."""
+
+    def __init__(self, message: str, stats: Optional[Dict[str, int]] = None):
+        super().__init__(message)
+        self.stats = stats or {}
+
+
+class DeliveryEngine:
+    """Send one message per recipient (or per small BCC batch) over a pool
+    of reused, authenticated SMTP connections.
+
+    4xx replies and dropped connections are retried with exponential
+    backoff; 5xx recipients are logged as failed and the run continues.
+    5xx replies to connect, STARTTLS, login or the sender abort the run
+    with :class:`DeliveryAborted`.
+    """
+
+    def __init__(self, host: str, port: int, from_addr: str, user: str | None = None, pwd: str | None = None,
+                 pool_size: int = 2, batch_size: int = 1, rate_per_sec: float | None = None,
+                 max_retries: int = 3, backoff_s: float = 1.0, starttls: bool = True, timeout: float = 30,
+                 smtp_factory: Callable[..., smtplib.SMTP] = smtplib.SMTP):
+        self.host, self.port = host, port
+        self.from_addr, self.user, self.pwd = from_addr, user, pwd
+        self.pool_size = max(1, pool_size)
+        self.batch_size = max(1, batch_size)
+        self.limiter = RateLimiter(rate_per_sec)
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.starttls = starttls
+        self.timeout = timeout
+        self.smtp_factory = smtp_factory
+
+    def _connect(self) -> smtplib.SMTP:
+        conn = self.smtp_factory(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            conn.starttls()
+        if self.user and self.pwd:
+            conn.login(self.user, self.pwd)
+        return conn
+
+    def _message(self, subject: str, html: str) -> str:
+        msg = MIMEText(html, "html", "utf-8")
+        msg["Subject"] = subject
+        msg["From"] = self.from_addr
+        # the body is encoded once; each batch only prepends its To: header
+        return msg.as_string()
+
+    def _send_batch(self, conn_box: List, base: str, batch: List[str], log: SendLog, stats: Dict) -> None:
+        # a single recipient sees their own address; a BCC batch sees only the sender
+        to = batch[0] if len(batch) == 1 else self.from_addr
+        data = f"To: {to}\n{base}"
+        pending = list(batch)
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.backoff_s * 2 ** (attempt - 1))
+            try:
+                if conn_box[0] is None:
+                    conn_box[0] = self._connect()
+                self.limiter.acquire()
+                refused = conn_box[0].sendmail(self.from_addr, pending, data)
+            except smtplib.SMTPRecipientsRefused as ex:
+                refused = ex.recipients
+            except smtplib.SMTPResponseException as ex:
+                if 400 <= ex.smtp_code < 500:
+                    LOG.warning("SMTP %s for batch of %d, retrying: %s", ex.smtp_code, len(pending), ex.smtp_error)
+                    continue
+                if not isinstance(ex, smtplib.SMTPDataError):
+                    # connect greeting, HELO, login or MAIL FROM: not the recipients' fault
+                    raise DeliveryAborted(f"SMTP {ex.smtp_code}: {ex.smtp_error!r}") from ex
+                log.record(pending, "failed", ex.smtp_code)
+                stats["failed"] += len(pending)
+                return
+            except smtplib.SMTPServerDisconnected as ex:
+                LOG.warning("SMTP connection lost (%s); reconnecting.", ex)
+                conn_box[0] = None
+                continue
+            except smtplib.SMTPException as ex:
+                # e.g. STARTTLS or AUTH not supported by the server
+                raise DeliveryAborted(f"SMTP setup failed: {ex}") from ex
+            except OSError as ex:
+                LOG.warning("SMTP connection lost (%s); reconnecting.", ex)
+                conn_box[0] = None
+                continue
+            accepted = [r for r in pending if r not in refused]
+            if accepted:
+                log.record(accepted, "sent")
+                stats["sent"] += len(accepted)
+            hard = [r for r in pending if r in refused and not 400 <= refused[r][0] < 500]
+            for r in hard:
+                log.record([r], "failed", refused[r][0])
+            stats["failed"] += len(hard)
+            pending = [r for r in pending if r in refused and 400 <= refused[r][0] < 500]
+            if not pending:
+                return
+        LOG.warning("Giving up on %d recipient(s) after %d retries.", len(pending), self.max_retries)
+        stats["deferred"] += len(pending)
+
+    def deliver(self, subject: str, html: str, recipients: Iterable[str], log: SendLog) -> Dict[str, int]:
+        unique = list(dict.fromkeys(recipients))
+        todo = [r for r in unique if r not in log.done]
+        stats = {"sent": 0, "failed": 0, "deferred": 0, "skipped": len(unique) - len(todo)}
+        if not todo:
+            return stats
+        base = self._message(subject, html)
+        work: "queue.Queue[List[str]]" = queue.Queue()
+        for i in range(0, len(todo), self.batch_size):
+            work.put(todo[i:i + self.batch_size])
+        lock = threading.Lock()
+        aborted: List[DeliveryAborted] = []
+
+        def worker():
+            conn_box = [None]
+            local = {"sent": 0, "failed": 0, "deferred": 0}
+            try:
+                while not aborted:
+                    try:
+                        batch = work.get_nowait()
+                    except queue.Empty:
+                        return
+                    self._send_batch(conn_box, base, batch, log, local)
+            except DeliveryAborted as ex:
+                with lock:
+                    aborted.append(ex)
+            finally:
+                if conn_box[0] is not None:
+                    try:
+                        conn_box[0].quit()
+                    except (smtplib.SMTPException, OSError):
+                        pass
+                with lock:
+                    for k, v in local.items():
+                        stats[k] += v
+
+        threads = [threading.Thread(target=worker, name=f"smtp-{i}") for i in range(min(self.pool_size, work.qsize()))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        if aborted:
+            raise DeliveryAborted(str(aborted[0]), stats) from aborted[0]
+        return stats
+
+
+def send_latest(html_path: str, subject_prefix: str, opts: Optional[Dict] = None):
+    opts = opts or {}
     host = os.getenv("SMTP_HOST")
     port = int(os.getenv("SMTP_PORT","587"))
     user = os.getenv("SMTP_USER")
@@ -12,19 +212,33 @@ def send_latest(html_path: str, subject_prefix: str):
     if not (host and user and pwd):
         print("SMTP not configured; skipping.")
         return
-    subs = read_textfile("data/subscribers.txt")
+    subs = read_textfile(opts.get("to_file", "data/subscribers.txt"))
     if not subs:
         print("No subscribers; skipping.")
         return
     html = open(html_path, "r", encoding="utf-8").read()
-    msg = MIMEText(html, "html", "utf-8")
-    msg["Subject"] = f"{subject_prefix} {today_pl_date()}"
-    msg["From"] = from_addr
-    msg["To"] = ", ".join(subs)
-    with smtplib.SMTP(host, port) as s:
-        s.starttls()
-        s.login(user, pwd)
-        s.sendmail(from_addr, subs, msg.as_string())
+    engine = DeliveryEngine(
+        host, port, from_addr, user, pwd,
+        pool_size=int(opts.get("pool_size", 2)),
+        batch_size=int(opts.get("batch_size", 1)),
+        rate_per_sec=opts.get("rate_per_sec"),
+        max_retries=int(opts.get("max_retries", 3)),
+        backoff_s=float(opts.get("backoff_s", 1.0)),
+        starttls=os.getenv("SMTP_STARTTLS", "1") == "1",
+    )
+    issue = Path(html_path).stem
+    log = SendLog(Path(opts.get("log_dir", "data/sendlog")) / f"{issue}.jsonl")
+    try:
+        stats = engine.deliver(f"{subject_prefix} {today_pl_date()}", html, subs, log)
+    except DeliveryAborted as ex:
+        # not a failed step: the log of what did go out still has to be committed
+        LOG.error("Delivery aborted: %s. Unsent recipients are retried on the next run.", ex)
+        stats = ex.stats
+    finally:
+        log.close()
+    print(f"Sent {stats['sent']}, failed {stats['failed']}, deferred {stats['deferred']}, "
+          f"already handled {stats['skipped']} for {issue}.")
+    return stats
 
 
 def main(argv: list[str] | None = None):
@@ -34,8 +248,9 @@ def main(argv: list[str] | None = None):
         print("No HTML path provided; skipping send.")
         return
     cfg = load_config()
-    subject_prefix = cfg.get("email", {}).get("subject_prefix", "Newsletter")
-    send_latest(html_path, subject_prefix)
+    email_cfg = cfg.get("email", {})
+    subject_prefix = email_cfg.get("subject_prefix", "Newsletter")
+    send_latest(html_path, subject_prefix, email_cfg)
 
 
 if __name__ == "__main__":
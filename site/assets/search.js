@@ -0,0 +1,101 @@
+// Client side of search_index.py: fetches only the term shards (and month
+// doc shards) a query needs. Tokenization must match search_index.terms().
+(function () {
+  "use strict";
+  var form = document.getElementById("search");
+  var STEM = +form.dataset.stem, PREFIX = +form.dataset.prefix, LIMIT = 50;
+  var STOP = new Set(form.dataset.stopwords.split(" "));
+  // search_index.FOLD: letters NFKD leaves alone ("ł=l đ=d ...")
+  var FOLD = {};
+  (form.dataset.fold || "").split(" ").forEach(function (pair) {
+    var kv = pair.split("=");
+    if (kv.length === 2) FOLD[kv[0]] = kv[1];
+  });
+  var FOLD_RE = new RegExp("[" + Object.keys(FOLD).join("") + "]", "g");
+  var cache = {};
+
+  function load(path) {
+    if (!cache[path]) {
+      cache[path] = fetch(path).then(function (r) { return r.ok ? r.json() : {}; }, function () { return {}; });
+    }
+    return cache[path];
+  }
+
+  function fold(text) {
+    text = text.toLowerCase().replace(FOLD_RE, function (ch) { return FOLD[ch]; });
+    return text.normalize("NFKD").replace(/[\u0300-\u036f]/g, "");
+  }
+
+  function terms(text) {
+    var seen = new Set();
+    (fold(text).match(/[a-z0-9]+/g) || []).forEach(function (t) {
+      if (t.length > 1 && !STOP.has(t)) seen.add(t.slice(0, STEM));
+    });
+    return Array.from(seen);
+  }
+
+  // doc ids for one query word; shorter words match every term they start
+  function postings(term) {
+    return load("search/terms/" + term.slice(0, PREFIX) + ".json").then(function (shard) {
+      var ids = new Set();
+      Object.keys(shard).forEach(function (t) {
+        if (t === term || (term.length < STEM && t.lastIndexOf(term, 0) === 0)) shard[t].forEach(function (d) { ids.add(d); });
+      });
+      return ids;
+    });
+  }
+
+  function month(id) {
+    var d = String(Math.floor(id / 1000));
+    return d.slice(0, 4) + "-" + d.slice(4, 6);
+  }
+
+  function day(id) {
+    var d = String(Math.floor(id / 1000));
+    return d.slice(0, 4) + "-" + d.slice(4, 6) + "-" + d.slice(6, 8);
+  }
+
+  function show(ids, docs) {
+    var list = document.getElementById("results");
+    list.textContent = "";
+    ids.forEach(function (id) {
+      var doc = docs[month(id)][id];
+      if (!doc) return;
+      var li = document.createElement("li"), a = document.createElement("a"), src = document.createElement("span");
+      // only web links; a javascript: URL from a feed must not become clickable
+      if (/^https?:\/\//i.test(doc[1])) { a.href = doc[1]; a.target = "_blank"; a.rel = "noopener"; }
+      a.textContent = doc[0];
+      src.className = "src";
+      src.textContent = "(" + [doc[2], doc[3], day(id)].filter(Boolean).join(" · ") + ")";
+      li.appendChild(a); li.appendChild(src);
+      list.appendChild(li);
+    });
+  }
+
+  function search(q) {
+    var status = document.getElementById("status"), words = terms(q);
+    if (!words.length) { status.textContent = ""; show([], {}); return; }
+    status.textContent = "Szukam…";
+    Promise.all(words.map(postings)).then(function (sets) {
+      sets.sort(function (a, b) { return a.size - b.size; });
+      var hits = Array.from(sets[0]).filter(function (d) { return sets.every(function (s) { return s.has(d); }); });
+      hits.sort(function (a, b) { return b - a; });
+      var top = hits.slice(0, LIMIT), months = Array.from(new Set(top.map(month)));
+      return Promise.all(months.map(function (m) { return load("search/docs/" + m + ".json"); })).then(function (shards) {
+        var docs = {};
+        months.forEach(function (m, i) { docs[m] = shards[i]; });
+        status.textContent = hits.length ? "Wyniki: " + hits.length + (hits.length > LIMIT ? " (pokazano " + LIMIT + ")" : "") : "Brak wyników.";
+        show(top, docs);
+      });
+    });
+  }
+
+  form.addEventListener("submit", function (ev) {
+    ev.preventDefault();
+    var q = form.elements.q.value;
+    history.replaceState(null, "", "?q=" + encodeURIComponent(q));
+    search(q);
+  });
+  var initial = new URLSearchParams(location.search).get("q");
+  if (initial) { form.elements.q.value = initial; search(initial); }
+})();
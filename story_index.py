@@ -0,0 +1,209 @@
+"""Cross-day story index: SimHash fingerprints of published items.
+
+A new item whose fingerprint is within ``max_distance`` bits of a story
+published in the last ``ttl_days`` is a repeat of it, even when the URL
+and outlet differ. Fingerprints are split into ``BANDS`` 16-bit bands and
+each band value maps to the entries holding it, so a query only compares
+against entries sharing a band; any two fingerprints that differ in fewer
+than ``BANDS`` bits share at least one band.
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import hashlib
+import json
+import os
+
+from neardup import tokens
+from utils import LOG, now_pl
+
+BITS = 64
+BANDS = 4
+BAND_BITS = BITS // BANDS
+_BAND_MASK = (1 << BAND_BITS) - 1
+MAX_DISTANCE = 3
+_MAX_TOKEN_MEMO = 200_000
+_token_memo: Dict[str, str] = {}
+
+
+def _token_bits(tok: str) -> str:
+    bits = _token_memo.get(tok)
+    if bits is None:
+        if len(_token_memo) >= _MAX_TOKEN_MEMO:
+            _token_memo.clear()
+        h = int.from_bytes(hashlib.blake2b(tok.encode("utf-8"), digest_size=8).digest(), "big")
+        bits = _token_memo[tok] = format(h, "064b")
+    return bits
+
+
+def simhash(item: Dict) -> int:
+    """64-bit SimHash of the item's title and summary tokens."""
+    toks = tokens(item)
+    if not toks:
+        return 0
+    half = len(toks) / 2
+    # one column per bit; a bit is set when most tokens have it set
+    cols = zip(*map(_token_bits, toks))
+    return int("".join("1" if col.count("1") > half else "0" for col in cols), 2)
+
+
+def _bands(fp: int) -> List[int]:
+    return [(fp >> (i * BAND_BITS)) & _BAND_MASK for i in range(BANDS)]
+
+
+class StoryIndex:
+    """Append-only log of ``(url, fingerprint, ts)`` with a banded lookup table.
+
+    Entries are kept in timestamp order like :class:`seen_store.SeenStore`,
+    so TTL eviction only walks the expired head and drops those entries
+    from their band buckets; the log is rewritten from the live entries on
+    the next flush after an eviction instead of being rebuilt.
+    """
+
+    COMPACT_MIN_LINES = 64
+
+    def __init__(self, path: str, max_distance: int = MAX_DISTANCE):
+        self.path = Path(path)
+        self.max_distance = max_distance
+        self._entries: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._table: List[Dict[int, Set[str]]] = [{} for _ in range(BANDS)]
+        self._pending: List[Tuple[str, int, float]] = []
+        self._lines = 0
+        self._rewrite = False
+        if self.path.exists():
+            self._load()
+
+    def _load(self) -> None:
+        with self.path.open(encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                self._lines += 1
+                try:
+                    rec = json.loads(line)
+                    self._put(rec["u"], int(rec["h"], 16), float(rec["ts"]))
+                except (ValueError, KeyError, TypeError):
+                    LOG.warning("Skipping bad line in %s: %r", self.path, line[:80])
+
+    def _put(self, url: str, fp: int, ts: float) -> None:
+        if url in self._entries:
+            self._unindex(url)
+        self._entries[url] = (fp, ts)
+        for band, value in zip(self._table, _bands(fp)):
+            band.setdefault(value, set()).add(url)
+
+    def _unindex(self, url: str) -> None:
+        fp, _ = self._entries.pop(url)
+        for band, value in zip(self._table, _bands(fp)):
+            bucket = band[value]
+            bucket.discard(url)
+            if not bucket:
+                del band[value]
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def match(self, fp: int) -> Optional[str]:
+        """URL of the closest indexed story within ``max_distance`` bits, or None."""
+        best, best_dist = None, self.max_distance + 1
+        seen: Set[str] = set()
+        for band, value in zip(self._table, _bands(fp)):
+            for url in band.get(value, ()):
+                if url in seen:
+                    continue
+                seen.add(url)
+                dist = (self._entries[url][0] ^ fp).bit_count()
+                if dist < best_dist or (dist == best_dist and url < best):
+                    best, best_dist = url, dist
+        return best
+
+    def add(self, url: str, fp: int, ts: float) -> None:
+        self._put(url, fp, ts)
+        self._pending.append((url, fp, ts))
+
+    def add_items(self, items: Iterable[Dict], ts: float) -> None:
+        for it in items:
+            self.add(it["url"], simhash(it), ts)
+
+    def evict_before(self, cutoff: float) -> int:
+        evicted = 0
+        while self._entries:
+            url, (_, ts) = next(iter(self._entries.items()))
+            if ts >= cutoff:
+                break
+            self._unindex(url)
+            evicted += 1
+        if evicted:
+            self._rewrite = True
+        return evicted
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._table = [{} for _ in range(BANDS)]
+        self._pending.clear()
+        self._rewrite = True
+
+    def iter_new(self, items: Iterable[Dict], downrank: bool = False, drops=None) -> Iterator[Dict]:
+        """Drop items that repeat an indexed story, or with ``downrank`` keep
+        them marked with ``repeat_of`` for the ranking penalty."""
+        for it in items:
+            prev = self.match(simhash(it))
+            if prev is None:
+                yield it
+            elif downrank:
+                it["repeat_of"] = prev
+                yield it
+            elif drops is not None:
+                drops["repeat_story"] += 1
+
+    def _compact(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as fh:
+            for url, (fp, ts) in self._entries.items():
+                fh.write(_line(url, fp, ts))
+        os.replace(tmp, self.path)
+        self._lines = len(self._entries)
+        self._pending.clear()
+        self._rewrite = False
+
+    def flush(self) -> None:
+        dead = self._lines + len(self._pending) - len(self._entries)
+        if self._rewrite or (self._lines >= self.COMPACT_MIN_LINES and dead > len(self._entries)):
+            self._compact()
+            return
+        if not self._pending:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.writelines(_line(url, fp, ts) for url, fp, ts in self._pending)
+        self._lines += len(self._pending)
+        self._pending.clear()
+
+
+def _line(url: str, fp: int, ts: float) -> str:
+    return json.dumps({"u": url, "h": f"{fp:016x}", "ts": round(ts, 3)}, ensure_ascii=False) + "\n"
+
+
+def open_story_index(cfg: Dict) -> Optional[StoryIndex]:
+    """The configured index with expired stories evicted; None when ``stories.path`` is unset."""
+    sc = cfg.get("stories") or {}
+    if not sc.get("path"):
+        return None
+    index = StoryIndex(sc["path"], int(sc.get("max_distance", MAX_DISTANCE)))
+    reset_env = (cfg.get("seen_cache") or {}).get("allow_reset_env")
+    if reset_env and os.getenv(reset_env, "0") == "1":
+        index.clear()
+    ttl_days = sc.get("ttl_days")
+    if ttl_days:
+        index.evict_before(now_pl().timestamp() - (ttl_days * 86400))
+    return index
+
+
+def downranks(cfg: Dict) -> bool:
+    return (cfg.get("stories") or {}).get("action", "drop") == "downrank"
@@ -0,0 +1,119 @@
+"""``site/feed.xml`` (RSS 2.0) and ``site/feed.json`` (JSON Feed 1.1).
+
+Both are written from ``data/feed_window.json``, a small buffer holding the
+feed fields of the last ``feed.max_issues`` issues: a build adds its own
+issue to the buffer and streams the two files out of it, without reading
+any earlier page. Dates come from the items and issues, never the clock,
+so an unchanged window produces byte-identical files.
+"""
+from __future__ import annotations
+from datetime import datetime
+from email.utils import format_datetime
+from pathlib import Path
+from typing import Dict, Iterator, List
+from xml.sax.saxutils import escape, quoteattr
+import html
+import json
+import re
+
+from utils import TZ, read_json, write_if_changed
+
+WINDOW_PATH = "data/feed_window.json"
+MAX_ISSUES = 7
+_TAG_RE = re.compile(r"<[^>]+>")
+_WS_RE = re.compile(r"\s+")
+
+
+def _text(s: str) -> str:
+    return _WS_RE.sub(" ", html.unescape(_TAG_RE.sub(" ", s or ""))).strip()
+
+
+def _entry(it: Dict, date_str: str) -> Dict:
+    return {
+        "title": _text(it.get("title")),
+        "url": it["url"],
+        "summary": _text(it.get("summary")),
+        "source": it.get("source") or "",
+        "topic": it.get("topic") or "",
+        "published": it.get("published_at") or f"{date_str}T00:00:00",
+    }
+
+
+def _when(ts: str) -> datetime:
+    dt = datetime.fromisoformat(ts)
+    return dt if dt.tzinfo else dt.replace(tzinfo=TZ)
+
+
+class FeedWindow:
+    """The newest ``max_issues`` issues as ``[{"date", "items"}]``, newest first."""
+
+    def __init__(self, path: str | Path = WINDOW_PATH, max_issues: int = MAX_ISSUES):
+        self.path = Path(path)
+        self.max_issues = max_issues
+        self.issues: List[Dict] = read_json(self.path, {}).get("issues", [])
+
+    def add_issue(self, date_str: str, items: List[Dict]) -> None:
+        issues = [i for i in self.issues if i["date"] != date_str]
+        issues.append({"date": date_str, "items": [_entry(it, date_str) for it in items]})
+        issues.sort(key=lambda i: i["date"], reverse=True)
+        self.issues = issues[:self.max_issues]
+
+    def save(self) -> bool:
+        return write_if_changed(self.path, json.dumps({"issues": self.issues}, ensure_ascii=False, indent=1))
+
+    def entries(self) -> Iterator[Dict]:
+        for issue in self.issues:
+            yield from issue["items"]
+
+
+def iter_rss(window: FeedWindow, title: str, site_url: str) -> Iterator[str]:
+    updated = format_datetime(_when(f"{window.issues[0]['date']}T00:00:00")) if window.issues else ""
+    yield '<?xml version="1.0" encoding="utf-8"?>\n<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">\n<channel>\n'
+    yield f"<title>{escape(title)}</title>\n<link>{escape(site_url)}</link>\n"
+    yield f"<description>{escape(title)}</description>\n<language>pl</language>\n"
+    yield f'<atom:link href={quoteattr(site_url + "feed.xml")} rel="self" type="application/rss+xml" />\n'
+    if updated:
+        yield f"<lastBuildDate>{updated}</lastBuildDate>\n"
+    for e in window.entries():
+        yield (f"<item><title>{escape(e['title'])}</title><link>{escape(e['url'])}</link>"
+               f'<guid isPermaLink="true">{escape(e["url"])}</guid>'
+               f"<pubDate>{format_datetime(_when(e['published']))}</pubDate>")
+        if e["topic"]:
+            yield f"<category>{escape(e['topic'])}</category>"
+        desc = " — ".join(s for s in (e["summary"], e["source"]) if s)
+        yield f"<description>{escape(desc)}</description></item>\n"
+    yield "</channel>\n</rss>\n"
+
+
+def iter_json_feed(window: FeedWindow, title: str, site_url: str) -> Iterator[str]:
+    head = {"version": "https://jsonfeed.org/version/1.1", "title": title, "home_page_url": site_url,
+            "feed_url": site_url + "feed.json", "language": "pl"}
+    yield json.dumps(head, ensure_ascii=False, indent=2)[:-2] + ',\n  "items": ['
+    sep = "\n"
+    for e in window.entries():
+        item = {"id": e["url"], "url": e["url"], "title": e["title"], "content_text": e["summary"],
+                "date_published": _when(e["published"]).isoformat()}
+        if e["source"]:
+            item["authors"] = [{"name": e["source"]}]
+        if e["topic"]:
+            item["tags"] = [e["topic"]]
+        yield sep + "    " + json.dumps(item, ensure_ascii=False)
+        sep = ",\n"
+    yield "\n  ]\n}\n"
+
+
+def write_feeds(window: FeedWindow, cfg: Dict, site_dir: str | Path = "site", manifest=None) -> List[Path]:
+    write = manifest.write if manifest is not None else write_if_changed
+    site_url = (cfg.get("feed") or {}).get("site_url") or ""
+    if site_url and not site_url.endswith("/"):
+        site_url += "/"
+    title = cfg["html"]["title"]
+    site = Path(site_dir)
+    write(site / "feed.xml", "".join(iter_rss(window, title, site_url)))
+    write(site / "feed.json", "".join(iter_json_feed(window, title, site_url)))
+    return [site / "feed.xml", site / "feed.json"]
+
+
+def open_window(cfg: Dict) -> FeedWindow:
+    fc = cfg.get("feed") or {}
+    return FeedWindow(fc.get("window_path", WINDOW_PATH), int(fc.get("max_issues", MAX_ISSUES)))
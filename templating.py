@@ -0,0 +1,162 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+import os
+import re
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / "templates"
+AUTOESCAPE_SUFFIXES = {".html", ".xml"}
+
+_TOKEN_RE = re.compile(r"({{.*?}}|{%.*?%})", re.S)
+_NAME_RE = re.compile(r"^[A-Za-z_][\w.]*$")
+
+_cache: Dict[Path, Tuple[int, Callable[[Dict], str]]] = {}
+
+
+class TemplateError(ValueError):
+    pass
+
+
+def _str(v) -> str:
+    return "" if v is None else str(v)
+
+
+def _esc(v) -> str:
+    if v.__class__ is not str:
+        v = _str(v)
+    return v.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;").replace("'", "&#x27;")
+
+
+def _get(obj, key: str):
+    if isinstance(obj, dict):
+        return obj.get(key)
+    if key.isdigit():
+        try:
+            return obj[int(key)]
+        except (IndexError, TypeError):
+            return None
+    return getattr(obj, key, None)
+
+
+class _Compiler:
+    def __init__(self, name: str, autoescape: bool):
+        self.name = name
+        self.autoescape = autoescape
+        self.lines = ["def _render(ctx):", " _out = []", " _w = _out.append", " _x = _out.extend"]
+        self.depth = 1
+        self.blocks: List[str] = []
+        self.loops: List[Tuple[str, int]] = []
+        self.parts: List[str] = []
+
+    def emit(self, line: str) -> None:
+        self.lines.append(" " * self.depth + line)
+
+    def flush(self) -> None:
+        # consecutive text and values become one extend() call
+        if len(self.parts) == 1:
+            self.emit(f"_w({self.parts[0]})")
+        elif self.parts:
+            self.emit(f"_x(({', '.join(self.parts)}))")
+        self.parts = []
+
+    def open(self, kind: str, line: str) -> None:
+        self.emit(line)
+        self.depth += 1
+        self.emit("pass")
+        self.blocks.append(kind)
+
+    def close(self, kind: str) -> None:
+        if not self.blocks or self.blocks[-1] != kind:
+            raise TemplateError(f"{self.name}: unexpected end{kind}")
+        self.blocks.pop()
+        self.depth -= 1
+        if kind == "for":
+            self.loops.pop()
+
+    def expr(self, text: str) -> str:
+        text = text.strip()
+        if text.startswith("not "):
+            return f"(not {self.expr(text[4:])})"
+        if not _NAME_RE.match(text):
+            raise TemplateError(f"{self.name}: unsupported expression {text!r}")
+        head, *rest = text.split(".")
+        loop_vars = {var: n for var, n in self.loops}
+        if head == "loop" and self.loops and rest and rest[0] in ("first", "index"):
+            n = self.loops[-1][1]
+            code = f"(_i{n} == 0)" if rest[0] == "first" else f"(_i{n} + 1)"
+            rest = rest[1:]
+        elif head in loop_vars:
+            code = f"v{loop_vars[head]}"
+        else:
+            code = f"ctx.get({head!r})"
+        for seg in rest:
+            # the common case (dict context) is inlined; _get covers the rest
+            code = f"(_t.get({seg!r}) if (_t := {code}).__class__ is dict else _get(_t, {seg!r}))"
+        return code
+
+    def statement(self, stmt: str) -> None:
+        word, _, rest = stmt.partition(" ")
+        if word == "for":
+            var, _, seq = rest.partition(" in ")
+            if not var.strip().isidentifier() or not seq:
+                raise TemplateError(f"{self.name}: bad for statement {stmt!r}")
+            n = len(self.lines)
+            self.open("for", f"for _i{n}, v{n} in enumerate({self.expr(seq)} or ()):")
+            self.loops.append((var.strip(), n))
+        elif word == "if":
+            self.open("if", f"if {self.expr(rest)}:")
+        elif word == "else":
+            if not self.blocks or self.blocks[-1] != "if":
+                raise TemplateError(f"{self.name}: else outside if")
+            self.depth -= 1
+            self.emit("else:")
+            self.depth += 1
+            self.emit("pass")
+        elif word in ("endfor", "endif"):
+            self.close(word[3:])
+        else:
+            raise TemplateError(f"{self.name}: unknown tag {word!r}")
+
+    def compile(self, source: str) -> Callable[[Dict], str]:
+        for tok in _TOKEN_RE.split(source):
+            if tok.startswith("{{"):
+                expr, _, flt = tok[2:-2].partition("|")
+                wrap = "_esc" if self.autoescape and flt.strip() != "safe" else "_str"
+                self.parts.append(f"{wrap}({self.expr(expr)})")
+            elif tok.startswith("{%"):
+                self.flush()
+                self.statement(tok[2:-2].strip())
+            elif tok:
+                self.parts.append(repr(tok))
+        self.flush()
+        if self.blocks:
+            raise TemplateError(f"{self.name}: unclosed {self.blocks[-1]}")
+        self.emit("return ''.join(_out)")
+        ns = {"_esc": _esc, "_str": _str, "_get": _get}
+        exec(compile("\n".join(self.lines), f"<template {self.name}>", "exec"), ns)
+        return ns["_render"]
+
+
+def compile_template(source: str, name: str = "<string>", autoescape: bool = True) -> Callable[[Dict], str]:
+    """Compile ``source`` into a plain Python function ``render(ctx) -> str``.
+
+    Supports ``{{ a.b }}`` (escaped unless ``|safe`` or autoescape is off),
+    ``{% for x in seq %}`` with ``loop.first`` / ``loop.index``, and
+    ``{% if [not] a.b %}...{% else %}...{% endif %}``.
+    """
+    return _Compiler(name, autoescape).compile(source)
+
+
+def get_template(name: str, directory: Path | str = TEMPLATE_DIR) -> Callable[[Dict], str]:
+    path = Path(directory) / name
+    mtime = os.stat(path).st_mtime_ns
+    hit = _cache.get(path)
+    if hit is not None and hit[0] == mtime:
+        return hit[1]
+    fn = compile_template(path.read_text(encoding="utf-8"), name, path.suffix in AUTOESCAPE_SUFFIXES)
+    _cache[path] = (mtime, fn)
+    return fn
+
+
+def render(name: str, **ctx) -> str:
+    return get_template(name)(ctx)
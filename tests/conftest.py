@@ -0,0 +1,76 @@
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture
+def http_server():
+    """Start a local HTTP stand-in; ``routes`` maps a path to a handler callable.
+
+    A handler receives the request handler instance and returns
+    ``(status, headers, body)``, or None after writing the response itself.
+    """
+    servers = []
+
+    def start(routes):
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                route = routes.get(self.path.split("?")[0])
+                if route is None:
+                    self.send_error(404)
+                    return
+                response = route(self)
+                if response is None:
+                    return
+                status, headers, body = response
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if self.command == "HEAD":
+                    return
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            do_HEAD = do_GET
+
+            def log_message(self, *args):
+                pass
+
+        srv = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        srv.daemon_threads = True
+        threading.Thread(target=srv.serve_forever, daemon=True).start()
+        servers.append(srv)
+        return f"http://127.0.0.1:{srv.server_address[1]}"
+
+    yield start
+    for srv in servers:
+        srv.shutdown()
+        srv.server_close()
+
+
+def rss(items, title="Stand-in"):
+    """Build a minimal Google News shaped RSS document."""
+    parts = []
+    for it in items:
+        parts.append(
+            "<item><title>{title}</title><link>{url}</link>"
+            "<pubDate>{date}</pubDate><description>{summary}</description>"
+            "<source url=\"https://example.com\">{source}</source></item>".format(**it)
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        f"<title>{title}</title>{''.join(parts)}</channel></rss>"
+    ).encode("utf-8")
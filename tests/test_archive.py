@@ -0,0 +1,46 @@
+import json
+
+from archive import Archive
+
+LEGACY = """<!doctype html>
+<html lang="pl">
+<body>
+<ul class="archive">
+<li><a href="2025-10-25.html">2025-10-25</a></li>
+<li><a href="2025-09-30.html">2025-09-30</a></li>
+</ul>
+</body>
+</html>
+"""
+
+
+def test_imports_legacy_archive(tmp_path):
+    (tmp_path / "archive.html").write_text(LEGACY, encoding="utf-8")
+    arch = Archive(tmp_path)
+    assert "2025-10-25" in arch and "2025-09-30" in arch
+    top = (tmp_path / "archive.html").read_text(encoding="utf-8")
+    assert 'href="archive/2025-10.html">październik 2025' in top
+    assert 'href="../2025-09-30.html"' in (tmp_path / "archive" / "2025-09.html").read_text(encoding="utf-8")
+
+
+def test_add_touches_only_current_month(tmp_path):
+    arch = Archive(tmp_path)
+    assert len(arch.add_issue("2025-09-30", "t")) == 3
+    sep = (tmp_path / "archive" / "2025-09.html").read_text(encoding="utf-8")
+
+    written = Archive(tmp_path).add_issue("2025-10-01", "t")
+    assert {p.name for p in written} == {"index.json", "2025-10.html", "archive.html"}
+    written = Archive(tmp_path).add_issue("2025-10-02", "t")
+    assert {p.name for p in written} == {"index.json", "2025-10.html"}
+    assert (tmp_path / "archive" / "2025-09.html").read_text(encoding="utf-8") == sep
+
+    shard = (tmp_path / "archive" / "2025-10.html").read_text(encoding="utf-8")
+    assert shard.index("2025-10-02.html") < shard.index("2025-10-01.html")
+
+
+def test_duplicate_issue_is_noop(tmp_path):
+    arch = Archive(tmp_path)
+    arch.add_issue("2025-10-01")
+    assert Archive(tmp_path).add_issue("2025-10-01") == []
+    index = json.loads((tmp_path / "archive" / "index.json").read_text(encoding="utf-8"))
+    assert index == {"months": {"2025-10": {"2025-10-01": ""}}}
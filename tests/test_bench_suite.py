@@ -0,0 +1,26 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+
+import suite  # noqa: E402
+import synth  # noqa: E402
+from utils import canonical_or_allowed  # noqa: E402
+
+
+def test_synth_is_seeded_and_realistic():
+    a, b = synth.make_items(300, seed=1), synth.make_items(300, seed=1)
+    assert a == b and a != synth.make_items(300, seed=2)
+    gn = [it for it in a if it["url"].startswith("https://news.google.com/rss/articles/")]
+    assert gn and all(canonical_or_allowed(it["url"]).startswith("https://www.") for it in gn)
+    assert any("utm_" in it["url"] for it in a)
+    assert len({it["title"].rsplit(" - ", 1)[0] for it in a}) < len(a)
+
+
+def test_run_and_compare(tmp_path, capsys):
+    base = suite.run([200], ["select_items", "to_html_page"], repeat=1)
+    assert set(base["results"]) == {"select_items", "to_html_page"}
+    slower = {"results": {k: {n: dict(r, seconds=r["seconds"] * 3) for n, r in v.items()}
+                          for k, v in base["results"].items()}}
+    assert suite.compare(base, base) == []
+    assert suite.compare(base, slower) == ["select_items@200", "to_html_page@200"]
@@ -0,0 +1,37 @@
+import neardup
+from filters import dedup
+
+
+def _item(title, url, summary=""):
+    return {"title": title, "summary": summary, "url": url}
+
+
+STORY = [
+    _item("OpenAI ogłasza nowy model językowy GPT dla firm - Onet", "https://onet.pl/a"),
+    _item("OpenAI ogłasza nowy model językowy GPT dla firm - WP Tech", "https://wp.pl/b"),
+    _item("OpenAI ogłasza nowy model językowy GPT dla firm w Polsce - Bankier", "https://bankier.pl/c"),
+    _item("Meta prezentuje multimodalne usprawnienia modeli", "https://meta.example/d"),
+]
+
+
+def test_near_duplicates_collapse_to_first_with_cluster_size():
+    out = dedup([dict(it) for it in STORY])
+    assert [it["url"] for it in out] == ["https://onet.pl/a", "https://meta.example/d"]
+    assert [it["cluster_size"] for it in out] == [3, 1]
+
+
+def test_exact_url_only_when_threshold_disabled():
+    items = [dict(it) for it in STORY] + [_item("x", "https://onet.pl/a/?utm_source=rss")]
+    assert len(dedup(items, None)) == 4
+
+
+def test_python_backend_matches_exact_pairs():
+    index = neardup.NearDupIndex(0.5, backend="python")
+    items = [_item(f"raport{i} firma{i} model{i} wdrożenie{i} sztuczna inteligencja", f"https://x/{i}") for i in range(200)]
+    assert all(index.add(it) is None for it in items)
+    assert index.add(_item("raport7 firma7 model7 wdrożenie7 sztuczna inteligencja - Onet", "https://y/7")) is items[7]
+
+
+def test_signature_is_stable():
+    toks = neardup.tokens(_item("Anthropic Claude", ""))
+    assert neardup.signature(toks) == neardup.signature(set(toks))
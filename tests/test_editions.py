@@ -0,0 +1,111 @@
+import json
+from pathlib import Path
+
+import pytest
+import yaml
+
+import editions
+import fetch_ai_news
+import generate_all
+import pipeline
+import seen_store
+from conftest import ROOT
+from manifest import BuildManifest
+from metrics import RunMetrics
+from urlkey import key as url_key
+
+VIDEO = {"name": "wideo", "html": {"title": "Wideo"}, "newsletter": {"mode": "top"},
+         "filters": {"key_terms": ["wideo", "film"], "noise": ["model", "sejm"]}}
+
+
+def _cfg(**over):
+    cfg = yaml.safe_load((ROOT / "config.yaml").read_text(encoding="utf-8"))
+    cfg["topics"]["model_path"] = None
+    cfg["pipeline"]["early_stop_margin"] = None
+    return editions.deep_merge(cfg, over)
+
+
+def test_edition_configs_merge_and_separate_state():
+    main, video = editions.edition_configs(_cfg(editions=[VIDEO]))
+    assert main["edition"]["site_dir"] == "site" and main["seen_cache"]["path"] == "data/seen.jsonl"
+    assert video["edition"] == {"name": "wideo", "site_dir": "site/wideo", "out_dir": "out/wideo",
+                                "issues_dir": "data/editions/wideo/issues"}
+    assert video["seen_cache"]["path"] == "data/editions/wideo/seen.jsonl"
+    assert video["stories"]["path"] == "data/editions/wideo/stories.jsonl"
+    assert video["feed"]["site_url"].endswith("/MachineCinemaPLNews/wideo/")
+    # merged section by section: unset keys such as html.footer_links are inherited
+    assert video["filters"]["key_terms"] == ["wideo", "film"] and video["filters"]["noise"] == ["model", "sejm"]
+    assert video["dedup"] == main["dedup"]
+    assert video["html"]["title"] == "Wideo" and video["html"]["footer_links"] == main["html"]["footer_links"]
+
+    with pytest.raises(ValueError):
+        editions.edition_configs(_cfg(editions=[VIDEO, VIDEO]))
+    with pytest.raises(ValueError):
+        editions.edition_configs(_cfg(editions=[dict(VIDEO, seen_cache={"path": "data/seen.jsonl"})]))
+
+
+@pytest.mark.parametrize("over", [
+    {"name": "main"},
+    {"name": "archive"},
+    {"name": "search"},
+    {"name": "assets"},
+    {"name": "feed.xml"},
+    {"output": {"site_dir": "site"}},
+    {"output": {"site_dir": "site/archive"}},
+    {"output": {"site_dir": "site/index.html"}},
+    {"output": {"site_dir": "site/feed.xml"}},
+    {"output": {"site_dir": "site/search.json"}},
+])
+def test_edition_cannot_publish_into_the_main_site(over):
+    with pytest.raises(ValueError):
+        editions.edition_configs(_cfg(editions=[dict(VIDEO, **over)]))
+
+
+def test_one_fetch_fans_out_to_editions(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    Path("site/assets").mkdir(parents=True)
+    Path("site/assets/custom.css").write_text("body{}", encoding="utf-8")
+    fetches = []
+
+    def fake_fetch(cfg, ctx=None):
+        fetches.append(1)
+        yield {"title": "Nowy model AI od OpenAI", "url": "https://a.pl/1?utm_source=x", "source": "A"}
+        yield {"title": "Film wideo zrobiony przez AI", "url": "https://b.pl/2", "source": "B"}
+        yield {"title": "Sejm o budżecie", "url": "https://c.pl/3", "source": "C"}
+
+    monkeypatch.setattr(fetch_ai_news, "iter_fetch", fake_fetch)
+    cfg = _cfg(editions=[VIDEO], pipeline={"edition_workers": 2})
+    metrics = RunMetrics()
+    generate_all.build_issue(cfg, "2025-10-25", metrics, BuildManifest())
+
+    assert fetches == [1]
+    main = json.loads(Path("data/issues/2025-10-25.json").read_text(encoding="utf-8"))["items"]
+    video = json.loads(Path("data/editions/wideo/issues/2025-10-25.json").read_text(encoding="utf-8"))["items"]
+    assert sorted(it["url"] for it in main) == ["https://a.pl/1", "https://b.pl/2", "https://c.pl/3"]
+    assert [it["url"] for it in video] == ["https://b.pl/2"]
+    assert Path("site/wideo/2025-10-25.html").exists() and Path("site/wideo/feed.xml").exists()
+    assert Path("site/wideo/assets/custom.css").read_text(encoding="utf-8") == "body{}"
+    assert url_key("https://b.pl/2") in Path("data/editions/wideo/seen.jsonl").read_text(encoding="utf-8")
+    assert url_key("https://b.pl/2") in Path("data/seen.jsonl").read_text(encoding="utf-8")
+
+    stages = metrics.to_dict()["stages"]
+    assert {"fetch", "normalize", "main/relevance", "wideo/relevance", "wideo/select", "main/write"} <= set(stages)
+    assert stages["wideo/relevance"]["dropped"] == {"noise_without_key_terms": 2}
+
+
+
+def test_empty_seen_store_is_opened_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    real, opened = seen_store.open_seen_store, []
+
+    def tracking(cfg):
+        opened.append(real(cfg))
+        return opened[-1]
+
+    # the seen stage and publish() must share the store even while it is empty
+    monkeypatch.setattr(pipeline, "open_seen_store", tracking)
+    monkeypatch.setattr(seen_store, "open_seen_store", tracking)
+    monkeypatch.setattr(fetch_ai_news, "iter_fetch",
+                        lambda cfg, ctx=None: iter([{"title": "Nowy model AI", "url": "https://a.pl/1", "source": "A"}]))
+    generate_all.build_issue(_cfg(), "2025-10-25", RunMetrics(), BuildManifest())
+    assert len(opened) == 1 and url_key("https://a.pl/1") in opened[0]
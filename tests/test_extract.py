@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+import yaml
+
+import extract
+import fetch_ai_news
+import generate_all
+from conftest import ROOT
+from extract import ArticleCache, Extractor
+from manifest import BuildManifest
+from metrics import RunMetrics
+
+FIXTURE = (Path(__file__).parent / "fixtures" / "article.html").read_bytes()
+
+
+def _page(counter, delay=0.0, body=FIXTURE):
+    lock = threading.Lock()
+
+    def handler(_req):
+        with lock:
+            counter["hits"] = counter.get("hits", 0) + 1
+            counter["active"] = counter.get("active", 0) + 1
+            counter["peak"] = max(counter.get("peak", 0), counter["active"])
+        time.sleep(delay)
+        with lock:
+            counter["active"] -= 1
+        return 200, {"Content-Type": "text/html; charset=utf-8"}, body
+    return handler
+
+
+def test_fallback_extractor_and_lead(monkeypatch):
+    monkeypatch.setattr(extract, "trafilatura", None)
+    text = extract.extract_text(FIXTURE.decode("utf-8"))
+    lines = text.splitlines()
+    assert lines[0].startswith("OpenAI zaprezentowało we wtorek") and "z językiem polskim" in lines[0]
+    assert "& konkurencji" in lines[1]
+    assert not any(s in text for s in ("newslettera", "reklama", "Przeczytaj", "prawa zastrzeżone", "Zdjęcie"))
+    lead = extract.make_lead(text, 200)
+    assert lead.endswith("biznesowych.") and len(lead) <= 200
+    assert extract.make_lead("słowo " * 100, 50).endswith("…")
+
+
+def test_enrich_caches_results(http_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(extract, "trafilatura", None)
+    counter = {}
+    base = http_server({"/a": _page(counter), "/broken": lambda _r: (500, {}, b"")})
+    items = [{"url": f"{base}/a", "summary": "<b>RSS</b>"}, {"url": f"{base}/broken", "summary": "s"},
+             {"url": "https://news.google.com/rss/articles/opaque", "summary": "g"}]
+
+    ex = Extractor(ArticleCache(tmp_path / "cache"), max_workers=4, lead_chars=200)
+    out = list(ex.iter_enrich([dict(it) for it in items]))
+    assert out[0]["summary"].startswith("OpenAI zaprezentowało") and out[0]["summary_rss"] == "<b>RSS</b>"
+    assert out[1]["summary"] == "s" and out[2]["summary"] == "g"
+    assert counter["hits"] == 1
+
+    # a second run (new process, same cache dir) does not refetch, failures included
+    ex2 = Extractor(ArticleCache(tmp_path / "cache"), max_workers=4, lead_chars=200,
+                    fetch=lambda *a: (_ for _ in ()).throw(AssertionError("refetched")))
+    again = list(ex2.iter_enrich([dict(it) for it in items]))
+    assert [it["summary"] for it in again] == [it["summary"] for it in out]
+
+
+def test_extractor_crash_keeps_the_rss_summary(tmp_path, monkeypatch):
+    def crash(_html):
+        raise RecursionError("maximum recursion depth exceeded")
+
+    monkeypatch.setattr(extract, "extract_text", crash)
+    ex = Extractor(ArticleCache(tmp_path / "cache"), fetch=lambda *a: "<html></html>")
+    out = list(ex.iter_enrich([{"url": "https://example.com/a", "summary": "s"}]))
+    assert out == [{"url": "https://example.com/a", "summary": "s"}]
+    assert "maximum recursion" in ex.cache.get("https://example.com/a")["error"]
+
+
+def test_per_host_limit(http_server, tmp_path):
+    counter = {}
+    base = http_server({f"/{i}": _page(counter, delay=0.2) for i in range(6)})
+    ex = Extractor(ArticleCache(tmp_path / "cache"), max_workers=6, per_host=2)
+    started = time.monotonic()
+    list(ex.iter_enrich([{"url": f"{base}/{i}"} for i in range(6)]))
+    assert counter["hits"] == 6 and counter["peak"] == 2
+    assert time.monotonic() - started < 1.0
+
+
+def test_cache_is_size_capped_lru(tmp_path):
+    cache = ArticleCache(tmp_path, max_bytes=600)
+    for i in range(3):
+        cache.put(f"https://x.pl/{i}", {"lead": "x" * 150})
+    assert cache.get("https://x.pl/0") is not None  # now most recently used
+    cache.put("https://x.pl/3", {"lead": "x" * 150})
+    assert cache.get("https://x.pl/1") is None
+    assert cache.get("https://x.pl/0") is not None and cache.get("https://x.pl/3") is not None
+    assert len(list(tmp_path.glob("*.json"))) == len(cache) == 3
+
+
+def test_lru_order_survives_a_fresh_checkout(tmp_path):
+    cache = ArticleCache(tmp_path, max_bytes=600)
+    for i in range(3):
+        cache.put(f"https://x.pl/{i}", {"lead": "x" * 150})
+    cache.get("https://x.pl/0")
+    cache.save()
+    # a checkout gives every file the same mtime
+    for p in tmp_path.glob("*.json"):
+        os.utime(p, (1_000_000, 1_000_000))
+    cache = ArticleCache(tmp_path, max_bytes=600)
+    cache.put("https://x.pl/3", {"lead": "x" * 150})
+    assert cache.get("https://x.pl/1") is None and cache.get("https://x.pl/0") is not None
+
+
+def test_only_selected_items_are_enriched(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    enriched = []
+
+    def fake_fetch(cfg, ctx=None):
+        for i in range(6):
+            yield {"title": f"Nowy model AI numer {i} od firmy {i}", "url": f"https://a{i}.pl/{i}", "source": "A"}
+
+    def fake_extract(items, cfg):
+        enriched.extend(it["url"] for it in items)
+        return iter(items)
+
+    monkeypatch.setattr(fetch_ai_news, "iter_fetch", fake_fetch)
+    monkeypatch.setattr(extract, "iter_extract", fake_extract)
+    cfg = yaml.safe_load((ROOT / "config.yaml").read_text(encoding="utf-8"))
+    cfg["topics"]["model_path"] = None
+    cfg["dedup"]["near_threshold"] = None
+    cfg["extract"]["enabled"] = True
+    cfg["newsletter"].update(mode="top", per_bucket=2, total_fallback=2)
+    metrics = RunMetrics()
+    generate_all.build_issue(cfg, "2025-10-25", metrics, BuildManifest())
+
+    published = [it["url"] for it in generate_all.read_json("data/issues/2025-10-25.json", {})["items"]]
+    assert len(published) == 2 and enriched == published
+    assert metrics.to_dict()["stages"]["extract"]["items_in"] == 2
@@ -0,0 +1,132 @@
+import json
+from email.utils import format_datetime
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import time
+
+import fetch_ai_news
+from conftest import rss
+from feed_health import FeedHealth, percentile
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _feed(name, run, n=2):
+    now = format_datetime(datetime.now(timezone.utc))
+    return rss([{"title": f"{name} AI {run}-{i}", "url": f"https://example.com/{name}/{run}/{i}", "date": now,
+                 "summary": "opis", "source": "Example"} for i in range(n)], title=name)
+
+
+def test_circuit_breaker_skips_flaky_feed_until_cooldown(http_server, tmp_path):
+    hits = {"flaky": 0, "ok": 0}
+    healthy = {"up": False}
+
+    def flaky(_req):
+        hits["flaky"] += 1
+        if not healthy["up"]:
+            return 500, {}, b"boom"
+        return 200, {}, _feed("flaky", hits["flaky"])
+
+    def ok(_req):
+        hits["ok"] += 1
+        return 200, {}, _feed("ok", hits["ok"])
+
+    base = http_server({"/flaky": flaky, "/ok": ok})
+    feeds = [f"{base}/flaky", f"{base}/ok"]
+    clock = Clock()
+    path = tmp_path / "feed_health.json"
+
+    def run():
+        health = FeedHealth(str(path), clock=clock, failure_threshold=2, cooldown_h=10)
+        return fetch_ai_news._live_fetch_24h(24, timeout_s=2, feeds=feeds, health=health)
+
+    run()
+    run()
+    assert hits["flaky"] == 2
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert saved[feeds[0]]["opened_at"] == clock.now and saved[feeds[0]]["success_rate"] == 0.0
+
+    # open: the feed is not requested at all during the cooldown
+    clock.now += 5 * 3600
+    healthy["up"] = True
+    items = run()
+    assert hits["flaky"] == 2 and hits["ok"] == 3
+    assert all(it["source"] == "ok" for it in items)
+
+    # after the cooldown one trial fetch closes the circuit again
+    clock.now += 6 * 3600
+    items = run()
+    assert hits["flaky"] == 3
+    assert {it["source"] for it in items} == {"flaky", "ok"}
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert saved[feeds[0]]["opened_at"] is None and saved[feeds[0]]["streak"] == 0
+    assert saved[feeds[1]]["success_rate"] == 1.0 and saved[feeds[1]]["latency_p50_s"] is not None
+
+
+def test_failed_retry_doubles_cooldown():
+    clock = Clock()
+    health = FeedHealth(clock=clock, failure_threshold=1, cooldown_h=1, max_cooldown_h=3)
+    health.failure("u", "boom")
+    clock.now += 3601
+    assert health.check("u") is None
+    health.failure("u", "boom")
+    clock.now += 3601
+    assert health.check("u") == "circuit_open"
+    clock.now += 3600
+    assert health.check("u") is None
+    health.failure("u", "boom")
+    clock.now += 3 * 3600 + 1  # capped at max_cooldown_h
+    assert health.check("u") is None
+
+
+def test_low_yield_feed_is_polled_less_often():
+    health = FeedHealth(low_yield_runs=2, max_skip_runs=3)
+    polled = []
+    for run in range(12):
+        if health.check("u") is None:
+            polled.append(run)
+            health.success("u", 0.1, 10, 5 if run == 0 else 0)
+    # a hit and two empty fetches, then 1, 2 and at most 3 skipped runs in between
+    assert polled == [0, 1, 2, 4, 7, 11]
+    health.success("u", 0.1, 10, 3)
+    assert health.check("u") is None
+
+
+def test_high_yield_feed_gets_larger_cap():
+    health = FeedHealth(entries=50, max_entries=150)
+    health.success("u", 0.1, 50, 40)
+    assert health.cap("u") == 100
+    health.success("u", 0.1, 100, 90)
+    assert health.cap("u") == 150
+    health.success("u", 0.1, 20, 5)
+    assert health.cap("u") == 75
+    health.success("u", 0.1, 20, 5)
+    assert health.cap("u") == 50
+    assert percentile([0.3, 0.1, 0.2, 0.9], 50) == 0.2 and percentile([0.3, 0.1, 0.2, 0.9], 95) == 0.9
+
+
+def test_stopped_run_still_records_finished_feeds(http_server, tmp_path):
+    base = http_server({"/a": lambda _req: (200, {}, _feed("a", 1)), "/b": lambda _req: (200, {}, _feed("b", 1))})
+    feeds = [f"{base}/a", f"{base}/b"]
+    path = tmp_path / "feed_health.json"
+    state_path = tmp_path / "state.json"
+    ctx = SimpleNamespace(stopped=False, metrics=None)
+
+    live = fetch_ai_news._iter_live(24, timeout_s=2, state_path=str(state_path), ctx=ctx, feeds=feeds,
+                                    health=FeedHealth(str(path)))
+    first = next(live)
+    assert first["source"] == "a"
+    time.sleep(0.3)  # /b has come back by now
+    ctx.stopped = True
+    assert all(it["source"] == "a" for it in live)
+
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert saved[feeds[1]]["success_rate"] == 1.0 and saved[feeds[1]]["new_items"] == [2]
+    # /b's items were never yielded, so its conditional-GET state is not kept
+    assert list(json.loads(state_path.read_text(encoding="utf-8"))) == [feeds[0]]
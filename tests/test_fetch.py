@@ -0,0 +1,136 @@
+import threading
+import time
+from email.utils import format_datetime
+from datetime import datetime, timezone
+
+import fetch_ai_news
+from conftest import rss
+
+
+def _feed(name, n=2):
+    now = format_datetime(datetime.now(timezone.utc))
+    return rss(
+        [
+            {"title": f"{name} AI {i}", "url": f"https://example.com/{name}/{i}", "date": now,
+             "summary": "opis", "source": "Example"}
+            for i in range(n)
+        ],
+        title=name,
+    )
+
+
+def test_concurrent_fetch_bounded_by_slowest_feed(http_server, monkeypatch):
+    def slow(name, delay):
+        def handler(_req):
+            time.sleep(delay)
+            return 200, {"Content-Type": "application/rss+xml"}, _feed(name)
+        return handler
+
+    base = http_server(
+        {
+            "/a": slow("a", 0.6),
+            "/b": slow("b", 0.6),
+            "/c": slow("c", 0.6),
+            "/hang": slow("hang", 5),
+        }
+    )
+    feeds = [f"{base}/a", f"{base}/hang", f"{base}/b", f"{base}/c"]
+    monkeypatch.setattr(fetch_ai_news, "RSS_FEEDS", feeds)
+
+    started = time.monotonic()
+    items = fetch_ai_news._live_fetch_24h(24, timeout_s=1.5, max_workers=4)
+    elapsed = time.monotonic() - started
+
+    # serial would be >= 1.8s for the three slow feeds alone, plus the hang
+    assert elapsed < 2.5
+    # the hanging feed is dropped, the rest keep RSS_FEEDS order
+    assert [it["title"] for it in items] == ["a AI 0", "a AI 1", "b AI 0", "b AI 1", "c AI 0", "c AI 1"]
+
+
+def test_slow_drip_is_cut_off_at_the_timeout(http_server, monkeypatch):
+    body = _feed("drip", 20)
+
+    def drip(req):
+        req.send_response(200)
+        req.send_header("Content-Length", str(len(body)))
+        req.end_headers()
+        # each byte arrives well inside the socket timeout
+        try:
+            for i in range(len(body)):
+                req.wfile.write(body[i:i + 1])
+                req.wfile.flush()
+                time.sleep(0.05)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    base = http_server({"/a": lambda _req: (200, {}, _feed("a", 1)), "/drip": drip})
+    monkeypatch.setattr(fetch_ai_news, "RSS_FEEDS", [f"{base}/drip", f"{base}/a"])
+    started = time.monotonic()
+    items = fetch_ai_news._live_fetch_24h(24, timeout_s=0.5, max_workers=2)
+    assert [it["source"] for it in items] == ["a"]
+    # the worker gave up too, so it cannot keep the process alive
+    while any(t.name.startswith("feed") for t in threading.enumerate()) and time.monotonic() - started < 5:
+        time.sleep(0.05)
+    assert time.monotonic() - started < 1.5
+
+
+def test_fetch_order_is_deterministic(http_server, monkeypatch):
+    def delayed(name, delay):
+        def handler(_req):
+            time.sleep(delay)
+            return 200, {}, _feed(name, 1)
+        return handler
+
+    base = http_server({"/x": delayed("x", 0.3), "/y": delayed("y", 0.0)})
+    monkeypatch.setattr(fetch_ai_news, "RSS_FEEDS", [f"{base}/x", f"{base}/y"])
+    items = fetch_ai_news._live_fetch_24h(24, timeout_s=2, max_workers=2)
+    assert [it["source"] for it in items] == ["x", "y"]
+
+
+def _count_parses(monkeypatch):
+    calls = []
+    real = fetch_ai_news._parse_entries
+
+    def counting(body, *args):
+        calls.append(body)
+        return real(body, *args)
+
+    monkeypatch.setattr(fetch_ai_news, "_parse_entries", counting)
+    return calls
+
+
+def test_conditional_get_reuses_cached_entries(http_server, monkeypatch, tmp_path):
+    body = _feed("etag", 3)
+    seen_headers = []
+
+    def handler(req):
+        seen_headers.append(req.headers.get("If-None-Match"))
+        if req.headers.get("If-None-Match") == '"v1"':
+            return 304, {"ETag": '"v1"'}, b""
+        return 200, {"ETag": '"v1"', "Last-Modified": "Sat, 25 Oct 2025 07:00:00 GMT"}, body
+
+    base = http_server({"/feed": handler})
+    monkeypatch.setattr(fetch_ai_news, "RSS_FEEDS", [f"{base}/feed"])
+    parses = _count_parses(monkeypatch)
+    state_path = tmp_path / "feed_state.json"
+
+    first = fetch_ai_news._live_fetch_24h(24, timeout_s=2, state_path=str(state_path))
+    second = fetch_ai_news._live_fetch_24h(24, timeout_s=2, state_path=str(state_path))
+
+    assert seen_headers == [None, '"v1"']
+    assert len(parses) == 1
+    assert first == second and len(first) == 3
+
+
+def test_identical_body_skips_parse(http_server, monkeypatch, tmp_path):
+    body = _feed("hash", 2)
+    base = http_server({"/feed": lambda req: (200, {}, body)})
+    monkeypatch.setattr(fetch_ai_news, "RSS_FEEDS", [f"{base}/feed"])
+    parses = _count_parses(monkeypatch)
+    state_path = tmp_path / "feed_state.json"
+
+    fetch_ai_news._live_fetch_24h(24, timeout_s=2, state_path=str(state_path))
+    items = fetch_ai_news._live_fetch_24h(24, timeout_s=2, state_path=str(state_path))
+
+    assert len(parses) == 1
+    assert len(items) == 2
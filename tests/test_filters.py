@@ -0,0 +1,32 @@
+from filters import TermMatcher, filter_relevant, fold, is_relevant
+
+
+def test_matcher_word_boundaries_and_inflection():
+    m = TermMatcher(["AI", "model językowy", "OpenAI", "Żabka"])
+    text = fold("Nowy MODEL JĘZYKOWYCH od OpenAI; e-mail bez ai-kropki, ŻABKA")
+    assert m.findall(text) == ["model językowy", "OpenAI", "AI", "Żabka"]
+    # "ai" inside a word is not the acronym
+    assert m.findall(fold("Mail i domain")) == []
+
+
+def test_longest_term_wins():
+    m = TermMatcher(["wideo", "wideo AI"])
+    assert m.findall(fold("Nowe wideo AI")) == ["wideo AI"]
+
+
+def test_filter_relevant_matches_is_relevant():
+    items = [
+        {"title": "Kupon na zakupy", "summary": ""},
+        {"title": "Kupon na ChatGPT", "summary": "OpenAI rozdaje"},
+        {"title": "Uczenie maszynowe w medycynie", "summary": ""},
+    ]
+    kept = filter_relevant([dict(it) for it in items])
+    assert [it["title"] for it in kept] == [it["title"] for it in items if is_relevant(it)]
+    assert kept[0]["key_hits"] == ["OpenAI"]
+    assert kept[1]["key_hits"] == ["uczenie maszynowe"]
+
+
+def test_terms_from_config():
+    cfg = {"filters": {"noise": ["reklama"], "key_terms": ["robot"]}}
+    items = [{"title": "Reklama robotów"}, {"title": "Reklama butów"}]
+    assert [it["title"] for it in filter_relevant(items, cfg)] == ["Reklama robotów"]
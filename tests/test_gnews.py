@@ -0,0 +1,60 @@
+import json
+
+import gnews
+from utils import canonical_or_allowed
+
+SAMPLE = "https://news.google.com/rss/articles/CBMiRmh0dHBzOi8vZXhhbXBsZS5jb20vYXJ0aWNsZS_SAQA?oc=5"
+SAMPLE_QS = "https://news.google.com/articles/CBMiN2h0dHBzOi8vZXhhbXBsZS5jb20vbmV3cz9ocmVmPXJzcy0x0gEA"
+
+
+def test_decode_article_ids_offline():
+    assert gnews.decode_article_id(gnews.article_id(SAMPLE)) == "https://example.com/article/"
+    assert gnews.decode_article_id(gnews.article_id(SAMPLE_QS)) == "https://example.com/news?href=rss-1"
+    assert gnews.decode_article_id("CBMiQkFVX3lxTE5hYmNkZWZnaGlqa2xtbm9wcXJzdHV2d3h5ejAxMjM0NTY3ODlBQkNERUZHSElKS0xNTk9QUVJTVFVW") is None
+
+
+def test_canonical_unwraps_article_links():
+    assert canonical_or_allowed(SAMPLE) == "https://example.com/article/"
+    # undecodable links are kept as-is
+    opaque = "https://news.google.com/articles/placeholder-openai-video"
+    assert canonical_or_allowed(opaque) == opaque
+
+
+def test_memo_cache_is_persistent_and_bounded(tmp_path):
+    path = tmp_path / "gnews.json"
+    calls = []
+
+    def online(url):
+        calls.append(url)
+        return "https://publisher.example/" + url.rsplit("/", 1)[1]
+
+    r = gnews.GoogleNewsResolver(str(path), max_entries=2, online=online)
+    urls = [f"https://news.google.com/rss/articles/opaque-article-{i:04d}" for i in range(3)]
+    assert [r.resolve(u) for u in urls] == [f"https://publisher.example/opaque-article-{i:04d}" for i in range(3)]
+    r.save()
+    assert list(json.loads(path.read_text(encoding="utf-8"))) == ["opaque-article-0001", "opaque-article-0002"]
+
+    again = gnews.GoogleNewsResolver(str(path), max_entries=2, online=online)
+    assert again.resolve(urls[2]) == "https://publisher.example/opaque-article-0002"
+    assert len(calls) == 3
+
+
+def test_redirect_resolver_reuses_connection(http_server):
+    clients = set()
+
+    def hop(target):
+        def handler(req):
+            clients.add(req.client_address)
+            return 302, {"Location": target}, b""
+        return handler
+
+    def final(req):
+        clients.add(req.client_address)
+        return 200, {}, b"ok"
+
+    base = http_server({"/a": hop("/b"), "/b": hop("/final"), "/final": final})
+    resolver = gnews.RedirectResolver(timeout=2)
+    assert resolver(f"{base}/a") == f"{base}/final"
+    assert resolver(f"{base}/b") == f"{base}/final"
+    resolver.close()
+    assert len(clients) == 1
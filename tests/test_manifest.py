@@ -0,0 +1,43 @@
+import os
+from pathlib import Path
+
+from conftest import ROOT
+from manifest import BuildManifest
+
+
+def test_write_skips_identical_bytes(tmp_path):
+    m = BuildManifest(tmp_path / "manifest.json")
+    page = tmp_path / "site" / "a.html"
+    assert m.write(page, "<p>ą</p>") and m.changed == [page.as_posix()]
+    os.utime(page, ns=(1, 1))
+    assert m.save(report=tmp_path / "changes.txt") == [page.as_posix()]
+
+    m = BuildManifest(tmp_path / "manifest.json")
+    assert not m.write(page, "<p>ą</p>") and m.changed == []
+    assert page.stat().st_mtime_ns == 1
+    # edited behind the manifest's back: sizes differ, so it is rewritten
+    page.write_text("<p>edited</p>", encoding="utf-8")
+    assert m.write(page, "<p>ą</p>") and page.read_text(encoding="utf-8") == "<p>ą</p>"
+    assert m.save(report=None) == [page.as_posix()]
+
+
+def test_repeated_rebuild_changes_nothing(tmp_path, monkeypatch):
+    import generate_all
+    from test_rebuild import _issue
+
+    (tmp_path / "config.yaml").write_bytes((ROOT / "config.yaml").read_bytes())
+    monkeypatch.chdir(tmp_path)
+    for d in ["2025-10-01", "2025-10-02"]:
+        generate_all.save_issue_input(d, _issue(d))
+    out = tmp_path / "gh_output"
+    monkeypatch.setenv("GITHUB_OUTPUT", str(out))
+
+    generate_all.main(["--rebuild", "--workers", "2"])
+    first = Path("reports/build_changes.txt").read_text(encoding="utf-8").splitlines()
+    assert {"site/2025-10-02.html", "site/index.html", "site/archive.html", "out/2025-10-01_ALL.md"} <= set(first)
+    mtimes = {p: p.stat().st_mtime_ns for p in Path("site").rglob("*") if p.is_file()}
+
+    generate_all.main(["--rebuild", "--workers", "2"])
+    assert Path("reports/build_changes.txt").read_text(encoding="utf-8") == ""
+    assert {p: p.stat().st_mtime_ns for p in Path("site").rglob("*") if p.is_file()} == mtimes
+    assert out.read_text(encoding="utf-8").splitlines() == ["changed=true", "changed=false"]
@@ -0,0 +1,79 @@
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime
+
+import fetch_ai_news
+import generate_all
+import pipeline
+from conftest import rss
+from metrics import RunMetrics
+from pipeline import Context, Pipeline
+
+NOW = format_datetime(datetime.now(timezone.utc))
+
+
+def _cfg(tmp_path):
+    return {
+        "newsletter": {"mode": "top", "per_bucket": 2, "total_fallback": 2},
+        "seen_cache": {"path": str(tmp_path / "seen.jsonl"), "ttl_days": None},
+        "dedup": {"near_threshold": 0.5},
+        "pipeline": {},
+    }
+
+
+def test_stage_counts_and_drop_reasons(tmp_path):
+    items = [
+        {"title": "OpenAI pokazuje nowy model językowy", "url": "https://a.pl/1"},
+        {"title": "OpenAI pokazuje nowy model językowy", "url": "https://a.pl/1?utm_source=x"},
+        {"title": "OpenAI pokazuje nowy model językowy dzisiaj", "url": "https://b.pl/2"},
+        {"title": "Kupon rabatowy na weekend", "url": "https://c.pl/3"},
+        {"title": "Brak adresu", "url": ""},
+    ]
+    cfg = _cfg(tmp_path)
+    m = RunMetrics()
+    ctx = Context(cfg, pipeline.selection_quota(cfg), metrics=m)
+    out = list(Pipeline.from_config(cfg).run(iter(items), ctx))
+    assert len(out) == 1
+
+    stages = m.to_dict()["stages"]
+    assert list(stages) == ["fetch", "normalize", "topic", "relevance", "dedup", "seen", "limit"]
+    assert stages["fetch"]["items_out"] == 5
+    assert (stages["normalize"]["items_in"], stages["normalize"]["items_out"]) == (5, 4)
+    assert stages["normalize"]["dropped"] == {"no_url": 1}
+    assert stages["relevance"]["dropped"] == {"noise_without_key_terms": 1}
+    assert stages["dedup"]["dropped"] == {"url_duplicate": 1, "near_duplicate": 1}
+    assert "dropped" not in stages["seen"]
+    assert all(s["seconds"] >= 0 for s in stages.values())
+
+
+def test_feed_metrics(http_server, monkeypatch):
+    base = http_server({
+        "/ok": lambda _req: (200, {}, rss([{"title": "AI", "url": "https://x.pl/1", "date": NOW, "summary": "", "source": "X"}])),
+        "/broken": lambda _req: (500, {}, b""),
+    })
+    monkeypatch.setattr(fetch_ai_news, "RSS_FEEDS", [f"{base}/ok", f"{base}/broken"])
+    ctx = Context({}, 10, metrics=RunMetrics())
+    list(fetch_ai_news._iter_live(24, timeout_s=2, ctx=ctx))
+    ok, broken = ctx.metrics.feeds
+    assert (ok["status"], ok["entries"], ok["in_window"]) == ("parsed", 1, 1)
+    assert ok["seconds"] is not None
+    assert broken["status"] == "error" and broken["error"]
+
+
+def test_write_keeps_rolling_history(tmp_path):
+    path, hist = tmp_path / "run.json", tmp_path / "hist.jsonl"
+    for i in range(5):
+        m = RunMetrics()
+        with m.stage("write", 3) as counts:
+            counts["out"] = i
+        m.write(path, hist, keep=3)
+    assert json.loads(path.read_text(encoding="utf-8"))["stages"]["write"]["items_out"] == 4
+    lines = hist.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(l)["stages"]["write"]["items_out"] for l in lines] == [2, 3, 4]
+
+
+def test_profiled_writes_report(tmp_path):
+    out = tmp_path / "profile.txt"
+    assert generate_all.profiled(lambda: sum(range(1000)), out, top=5) == 499500
+    text = out.read_text(encoding="utf-8")
+    assert "cProfile" in text and "tracemalloc" in text
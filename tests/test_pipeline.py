@@ -0,0 +1,51 @@
+import pipeline
+from pipeline import Context, Pipeline
+
+
+def _cfg(tmp_path, **pcfg):
+    return {
+        "newsletter": {"mode": "top", "per_bucket": 2, "total_fallback": 2},
+        "seen_cache": {"path": str(tmp_path / "seen.jsonl"), "ttl_days": None},
+        "dedup": {"near_threshold": 0.5},
+        "pipeline": pcfg,
+    }
+
+
+def _source(pulled, n=1000):
+    try:
+        for i in range(n):
+            pulled.append(i)
+            yield {"title": f"OpenAI temat{i} wiadomość{i}", "summary": "", "url": f"https://example.com/{i}"}
+    finally:
+        pulled.append("closed")
+
+
+def test_limit_stops_upstream_work(tmp_path):
+    cfg = _cfg(tmp_path)
+    ctx = Context(cfg, pipeline.selection_quota(cfg), margin=3)
+    pulled = []
+    out = list(Pipeline.from_config(cfg).run(_source(pulled), ctx))
+    assert len(out) == 5
+    assert ctx.stopped
+    assert pulled[-1] == "closed" and len(pulled) == 6
+    assert ctx.state["seen"] is not None
+
+
+def test_without_margin_everything_flows(tmp_path):
+    cfg = _cfg(tmp_path)
+    ctx = Context(cfg, 2)
+    pulled = []
+    assert len(list(Pipeline.from_config(cfg).run(_source(pulled, 50), ctx))) == 50
+    assert not ctx.stopped
+
+
+def test_plugin_stage(tmp_path):
+    @pipeline.stage("drop_odd")
+    def drop_odd(items, ctx):
+        return (it for it in items if int(it["url"].rsplit("/", 1)[1]) % 2 == 0)
+
+    cfg = _cfg(tmp_path, stages=["normalize", "drop_odd", "limit"])
+    ctx = Context(cfg, 2, margin=1)
+    out = list(Pipeline.from_config(cfg).run(_source([]), ctx))
+    assert [it["url"] for it in out] == ["https://example.com/0", "https://example.com/2", "https://example.com/4"]
+    del pipeline.STAGES["drop_odd"]
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import make_posts
+import ranking
+
+NOW = datetime(2025, 10, 25, 9, 0, tzinfo=ZoneInfo("Europe/Warsaw"))
+
+
+def _item(i, hours=1, topic="Ogólne", source=None, hits=(), cluster=1):
+    return {"title": f"t{i}", "summary": "", "url": f"https://x.pl/{i}", "topic": topic,
+            "source": source or f"s{i}", "published_at": (NOW - timedelta(hours=hours)).isoformat(),
+            "key_hits": list(hits), "cluster_size": cluster}
+
+
+def _cfg(mode, **nl):
+    return {"newsletter": dict({"mode": mode, "per_bucket": 2, "total_fallback": 2}, **nl)}
+
+
+def test_score_factors():
+    items = [_item(0), _item(1, hours=30), _item(2, hits=["AI", "LLM"]), _item(3, cluster=4),
+             _item(4, source="Onet"), _item(5, source="Onet")]
+    s = ranking.Scorer(items, now=NOW)
+    assert s(items[0]) > s(items[1])
+    assert s(items[2]) > s(items[0]) and s(items[3]) > s(items[0])
+    assert s(items[4]) < s(items[0])
+
+
+def test_diversity_counts_outlets_not_feeds():
+    feed = '"sztuczna inteligencja" - Google News'
+    items = [dict(_item(0, source=feed), outlet="Onet"), dict(_item(1, source=feed), outlet="Onet"),
+             dict(_item(2, source=feed), outlet="WP")]
+    f = ranking.Scorer(items, now=NOW).factors
+    assert f(items[0])["diversity"] == 0.5 and f(items[2])["diversity"] == 1.0
+
+
+def test_top_mode_matches_full_sort():
+    items = [_item(i, hours=i % 17, hits=["AI"] * (i % 3), cluster=1 + i % 5, source=f"s{i % 7}") for i in range(500)]
+    cfg = _cfg("top", total_fallback=10)
+    got = ranking.select(items, cfg, NOW)
+    scorer = ranking.Scorer(items, now=NOW)
+    expected = sorted(items, key=lambda it: (scorer(it), it["published_at"], it["url"]), reverse=True)[:10]
+    assert [it["url"] for it in got] == [it["url"] for it in expected]
+    assert all("score" in it for it in got) and "score" not in items[0]
+
+
+def test_segments_quotas_and_order():
+    items = [_item(i, hours=i, topic=t) for i, t in enumerate(["Biznes", "Nauka", "Biznes", "Nauka", "Biznes", "Prawo"])]
+    got = ranking.select(items, _cfg("segments", quotas={"Prawo": 0}, topics=["Nauka"]), NOW)
+    assert [(it["topic"], it["url"]) for it in got] == [
+        ("Nauka", "https://x.pl/1"), ("Nauka", "https://x.pl/3"),
+        ("Biznes", "https://x.pl/0"), ("Biznes", "https://x.pl/2"),
+    ]
+
+
+def test_sectioned_rendering():
+    items = [_item(0, topic="Nauka"), _item(1, topic="Nauka"), _item(2, topic="Biznes")]
+    md = make_posts.to_md(items, sectioned=True)
+    assert md.startswith("## Nauka\n\n- **t0**") and "\n\n## Biznes\n\n- **t2**" in md
+    page = make_posts.to_html_page("2025-10-25", "T", "B", items, [], sectioned=True)
+    assert page.count("<section>") == 2 and "<h2>Biznes</h2>" in page
+    assert "<section>" not in make_posts.to_html_page("2025-10-25", "T", "B", items, [])
@@ -0,0 +1,49 @@
+from pathlib import Path
+
+from conftest import ROOT
+
+
+def _issue(date_str, n=3):
+    return [
+        {"title": f"Wiadomość {date_str} #{i} & więcej", "summary": "opis", "url": f"https://example.com/{date_str}/{i}",
+         "source": "Example", "published_at": f"{date_str}T09:00:00+02:00", "topic": "Ogólne"}
+        for i in range(n)
+    ]
+
+
+def _snapshot():
+    return {str(p): p.read_bytes() for p in sorted(Path("site").rglob("*.html")) + sorted(Path("out").glob("*.md"))}
+
+
+def test_parallel_rebuild_matches_serial(tmp_path, monkeypatch):
+    import generate_all
+
+    (tmp_path / "config.yaml").write_bytes((ROOT / "config.yaml").read_bytes())
+    monkeypatch.chdir(tmp_path)
+    dates = ["2025-09-30", "2025-10-01", "2025-10-02", "2025-10-05"]
+    for d in dates:
+        generate_all.save_issue_input(d, _issue(d))
+
+    generate_all.main(["--rebuild", "--workers", "1"])
+    serial = _snapshot()
+    for p in list(Path("site").rglob("*.html")) + list(Path("out").glob("*.md")):
+        p.unlink()
+
+    generate_all.main(["--rebuild", "--workers", "2"])
+    assert _snapshot() == serial
+
+    assert Path("site/index.html").read_bytes() == Path("site/2025-10-05.html").read_bytes()
+    assert 'href="../2025-09-30.html"' in Path("site/archive/2025-09.html").read_text(encoding="utf-8")
+
+
+def test_rebuild_range(tmp_path, monkeypatch):
+    import generate_all
+
+    (tmp_path / "config.yaml").write_bytes((ROOT / "config.yaml").read_bytes())
+    monkeypatch.chdir(tmp_path)
+    for d in ["2025-10-01", "2025-10-02", "2025-10-03"]:
+        generate_all.save_issue_input(d, _issue(d))
+    generate_all.ensure_dirs()
+    results = generate_all.rebuild(generate_all.load_config(), "2025-10-02", "2025-10-02", workers=1)
+    assert [r[0] for r in results] == ["2025-10-02"]
+    assert sorted(p.name for p in Path("site").glob("2025-*.html")) == ["2025-10-02.html"]
@@ -0,0 +1,56 @@
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+import fetch_ai_news
+import rss_stream
+from utils import TZ
+
+FIXTURE = (Path(__file__).parent / "fixtures" / "gnews_search.xml").read_bytes()
+
+
+def test_matches_feedparser_on_recorded_feed():
+    fast = list(rss_stream.iter_entries(FIXTURE, chunk_size=997))
+    slow = fetch_ai_news._feedparser_entries(FIXTURE)
+    assert len(fast) == 100
+    assert fast[:fetch_ai_news.MAX_ENTRIES] == slow
+    assert fast[0]["source"] == '"sztuczna inteligencja" - Google News'
+    assert fast[0]["outlet"] == "Gazeta Wyborcza"
+    # pubDate is GMT; stored in Warsaw time
+    assert fast[0]["published"] == "2025-10-24T16:31:46+02:00"
+
+
+def test_stops_at_cap_and_skips_old_entries():
+    consumed = []
+
+    class Tracking(bytes):
+        def __getitem__(self, key):
+            consumed.append(key)
+            return bytes.__getitem__(self, key)
+
+    entries = fetch_ai_news._parse_entries(Tracking(FIXTURE))
+    assert len(entries) == fetch_ai_news.MAX_ENTRIES
+    # the cap is reached well before the last chunk is fed
+    assert consumed[-1].stop < len(FIXTURE)
+
+    everything = list(rss_stream.iter_entries(FIXTURE))
+    cutoff = datetime(2025, 10, 24, 12, tzinfo=TZ)
+    recent = list(rss_stream.iter_entries(FIXTURE, cutoff))
+    assert recent == [e for e in everything if datetime.fromisoformat(e["published"]) >= cutoff]
+    assert 0 < len(recent) < len(everything)
+
+
+@pytest.mark.parametrize("body", [
+    b'<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom"><title>A</title>'
+    b'<entry><title>Atom AI</title><link href="https://example.com/a"/><id>a</id>'
+    b'<updated>2025-10-24T10:00:00Z</updated></entry></feed>',
+    b'<rss version="2.0"><channel><title>T</title><item><title>AI&nbsp;news</title>'
+    b'<link>https://example.com/b</link><pubDate>Fri, 24 Oct 2025 10:00:00 GMT</pubDate></item></channel></rss>',
+])
+def test_falls_back_to_feedparser(body):
+    with pytest.raises((rss_stream.UnexpectedFeed, rss_stream.ET.ParseError)):
+        list(rss_stream.iter_entries(body))
+    entries = fetch_ai_news._parse_entries(body)
+    assert len(entries) == 1 and entries[0]["link"].startswith("https://example.com/")
+    assert entries[0]["published"] == "2025-10-24T12:00:00+02:00"
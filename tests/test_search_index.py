@@ -0,0 +1,95 @@
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+import search_index
+from search_index import SearchIndex
+
+
+def _item(title, summary="", url=None, source="Onet", topic="Ogólne"):
+    return {"title": title, "summary": summary, "url": url or f"https://x.pl/{abs(hash(title))}",
+            "source": source, "topic": topic}
+
+
+def _shard(site, prefix):
+    return json.loads((site / "search" / "terms" / f"{prefix}.json").read_text(encoding="utf-8"))
+
+
+def test_polish_folding_and_stems():
+    assert search_index.terms("Sztuczna inteligencja w Łodzi, czyli modele i modelu") == \
+        {"sztuc", "intel", "lodzi", "czyli", "model"}
+    assert search_index.terms("ŻÓŁĆ") == search_index.terms("zolc")
+    assert not search_index.terms("i w na się że")
+
+
+def test_incremental_update_touches_only_its_shards(tmp_path):
+    index = SearchIndex(tmp_path)
+    index.add_issue("2025-10-01", [_item("OpenAI pokazuje model", "<p>Nowy model językowy</p>"),
+                                   _item("Robotyka w fabrykach", source="WP")])
+    model = _shard(tmp_path, "mo")["model"]
+    assert model == [search_index.doc_id("2025-10-01", 0)]
+    assert search_index.doc_id("2025-10-01", 1) in _shard(tmp_path, "wp")["wp"]
+    before = {p.name: p.stat().st_mtime_ns for p in (tmp_path / "search" / "terms").glob("*.json")}
+
+    written = SearchIndex(tmp_path).add_issue("2025-10-02", [_item("Modele językowe drożeją", source="Onet")])
+    assert {p.stem for p in written if p.parent.name == "terms"} == {"mo", "je", "dr", "on", "og"} and "ro.json" in before
+    assert (tmp_path / "search" / "terms" / "ro.json").stat().st_mtime_ns == before["ro.json"]
+    assert _shard(tmp_path, "mo")["model"] == [search_index.doc_id("2025-10-01", 0), search_index.doc_id("2025-10-02", 0)]
+    docs = json.loads((tmp_path / "search" / "docs" / "2025-10.json").read_text(encoding="utf-8"))
+    assert docs[str(search_index.doc_id("2025-10-02", 0))][0] == "Modele językowe drożeją"
+
+    # a rebuilt issue replaces its old postings, and empty shards go away
+    SearchIndex(tmp_path).add_issue("2025-10-01", [_item("OpenAI pokazuje model")])
+    assert not (tmp_path / "search" / "terms" / "ro.json").exists()
+    assert not (tmp_path / "search" / "terms" / "wp.json").exists()
+    assert len(json.loads((tmp_path / "search" / "docs" / "2025-10.json").read_text(encoding="utf-8"))) == 2
+
+
+# drives site/assets/search.js with a stub DOM: prints the shard paths a query
+# fetches and the links it renders
+NODE_HARNESS = r"""
+const fs = require("fs");
+const [page, script, query, known] = process.argv.slice(2);
+const attr = (name) => page.match(new RegExp(name + '="([^"]*)"'))[1];
+const made = [], fetched = [];
+const el = () => { const e = {children: [], appendChild(c) { this.children.push(c); }}; made.push(e); return e; };
+const results = el(), status = el();
+const form = {dataset: {stem: attr("data-stem"), prefix: attr("data-prefix"), stopwords: attr("data-stopwords"),
+                        fold: attr("data-fold")},
+              elements: {q: {value: query}}, addEventListener() {}};
+global.document = {getElementById: (id) => ({search: form, results, status})[id], createElement: el};
+global.location = {search: "?q=" + encodeURIComponent(query)};
+global.history = {replaceState() {}};
+global.fetch = (path) => {
+  fetched.push(path);
+  // every shard lists the terms the Python side produced for the query
+  const body = path.includes("/terms/") ? Object.fromEntries(known.split(" ").map((t) => [t, [20251001000]]))
+    : {"20251001000": ["Tytuł", "javascript:alert(1)", "Onet", ""]};
+  return Promise.resolve({ok: true, json: () => Promise.resolve(body)});
+};
+eval(fs.readFileSync(script, "utf8"));
+setTimeout(() => console.log(JSON.stringify({fetched, hrefs: made.filter((e) => "textContent" in e && e.textContent === "Tytuł").map((e) => e.href || null)})), 50);
+"""
+
+
+def test_search_js_folds_like_the_index(tmp_path):
+    node = shutil.which("node")
+    if node is None:
+        pytest.skip("node not installed")
+    SearchIndex(tmp_path).write_page("T")
+    page = (tmp_path / "search.html").read_text(encoding="utf-8")
+    script = Path(search_index.__file__).parent / "site" / "assets" / "search.js"
+    harness = tmp_path / "harness.js"
+    harness.write_text(NODE_HARNESS, encoding="utf-8")
+    query = "Đorđe Søren Straße"
+    expected = search_index.terms(query)
+    out = subprocess.run([node, str(harness), page, str(script), query, " ".join(expected)], capture_output=True,
+                         text=True, timeout=30, check=True).stdout
+    result = json.loads(out)
+    prefixes = {p.rsplit("/", 1)[1][:-5] for p in result["fetched"] if "/terms/" in p}
+    assert prefixes == {t[:search_index.PREFIX] for t in expected} and "strasse"[:search_index.STEM] in expected
+    # the result from a javascript: URL is rendered as text, not a link
+    assert result["hrefs"] == [None]
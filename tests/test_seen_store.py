@@ -0,0 +1,51 @@
+import json
+
+from seen_store import SeenStore
+
+
+def test_migrates_legacy_json(tmp_path):
+    legacy = tmp_path / "seen.json"
+    legacy.write_text(json.dumps({"https://b": {"ts": 20}, "https://a": {"ts": 10}}), encoding="utf-8")
+    store = SeenStore(str(tmp_path / "seen.jsonl"), str(legacy))
+    assert "https://a" in store and "https://b" in store
+    assert not legacy.exists()
+    lines = (tmp_path / "seen.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(l)["k"] for l in lines] == ["https://a", "https://b"]
+
+
+def test_appends_without_rewriting(tmp_path):
+    path = tmp_path / "seen.jsonl"
+    store = SeenStore(str(path))
+    store.add_many(["u1", "u2"], 100.0)
+    store.flush()
+    first = path.read_text(encoding="utf-8")
+    store = SeenStore(str(path))
+    store.add("u3", 200.0)
+    store.flush()
+    assert path.read_text(encoding="utf-8").startswith(first)
+    assert len(SeenStore(str(path))) == 3
+
+
+def test_ttl_eviction_and_compaction(tmp_path):
+    path = tmp_path / "seen.jsonl"
+    store = SeenStore(str(path))
+    store.add_many([f"old{i}" for i in range(100)], 10.0)
+    store.add_many([f"new{i}" for i in range(10)], 500.0)
+    store.flush()
+    store = SeenStore(str(path))
+    assert store.evict_before(100.0) == 100
+    assert "old5" not in store and "new5" in store
+    store.flush()
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 10
+
+
+def test_reset_rewrites(tmp_path):
+    path = tmp_path / "seen.jsonl"
+    store = SeenStore(str(path))
+    store.add("a", 1.0)
+    store.flush()
+    store = SeenStore(str(path))
+    store.clear()
+    store.add("b", 2.0)
+    store.flush()
+    assert [json.loads(l)["k"] for l in path.read_text(encoding="utf-8").splitlines()] == ["b"]
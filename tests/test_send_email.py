@@ -0,0 +1,141 @@
+import smtplib
+import socket
+import threading
+
+import pytest
+
+from send_email import DeliveryAborted, DeliveryEngine, SendLog
+
+
+class FakeSMTP:
+    """In-process SMTP double; ``script`` maps a recipient to the replies it gets."""
+
+    sent = []
+    script = {}
+    lock = threading.Lock()
+    connections = 0
+
+    def __init__(self, host, port, timeout=None):
+        with FakeSMTP.lock:
+            FakeSMTP.connections += 1
+
+    def starttls(self):
+        pass
+
+    def login(self, user, pwd):
+        if pwd == "wrong":
+            raise smtplib.SMTPAuthenticationError(535, b"bad credentials")
+
+    def sendmail(self, from_addr, rcpts, msg):
+        refused = {}
+        for r in rcpts:
+            replies = self.script.get(r)
+            if replies:
+                code = replies.pop(0)
+                if code >= 400:
+                    refused[r] = (code, b"nope")
+        if len(refused) == len(rcpts):
+            raise smtplib.SMTPRecipientsRefused(refused)
+        with FakeSMTP.lock:
+            FakeSMTP.sent.append(([r for r in rcpts if r not in refused], msg))
+        return refused
+
+    def quit(self):
+        pass
+
+
+@pytest.fixture
+def fake_smtp():
+    FakeSMTP.sent, FakeSMTP.script, FakeSMTP.connections = [], {}, 0
+    return FakeSMTP
+
+
+def _engine(**kw):
+    kw.setdefault("backoff_s", 0)
+    return DeliveryEngine("smtp.invalid", 25, "news@example.com", "u", "p", smtp_factory=FakeSMTP, **kw)
+
+
+def test_one_message_per_recipient_without_leaking_list(fake_smtp, tmp_path):
+    log = SendLog(tmp_path / "log.jsonl")
+    stats = _engine(pool_size=3).deliver("S", "<p>x</p>", ["a@x", "b@x", "c@x", "a@x"], log)
+    assert stats["sent"] == 3
+    assert sorted(r for rcpts, _ in fake_smtp.sent for r in rcpts) == ["a@x", "b@x", "c@x"]
+    for rcpts, msg in fake_smtp.sent:
+        assert f"To: {rcpts[0]}" in msg and all(o not in msg for o in {"a@x", "b@x", "c@x"} - set(rcpts))
+    assert fake_smtp.connections <= 3
+
+
+def test_transient_retry_and_permanent_failure(fake_smtp, tmp_path):
+    fake_smtp.script = {"slow@x": [451, 451], "bad@x": [550]}
+    log = SendLog(tmp_path / "log.jsonl")
+    stats = _engine(batch_size=3).deliver("S", "x", ["ok@x", "slow@x", "bad@x"], log)
+    assert stats == {"sent": 2, "failed": 1, "deferred": 0, "skipped": 0}
+    assert fake_smtp.sent[0][0] == ["ok@x"] and fake_smtp.sent[-1][0] == ["slow@x"]
+    assert "To: news@example.com" in fake_smtp.sent[0][1]
+
+
+def test_resume_skips_handled_recipients(fake_smtp, tmp_path):
+    path = tmp_path / "log.jsonl"
+    log = SendLog(path)
+    log.record(["a@x"], "sent")
+    log.close()
+    log = SendLog(path)
+    stats = _engine().deliver("S", "x", ["a@x", "b@x"], log)
+    log.close()
+    assert stats["sent"] == 1 and stats["skipped"] == 1
+    assert SendLog(path).done == {"a@x", "b@x"}
+
+
+def test_auth_failure_aborts_without_logging_anyone(fake_smtp, tmp_path):
+    path = tmp_path / "log.jsonl"
+    log = SendLog(path)
+    engine = DeliveryEngine("smtp.invalid", 25, "news@example.com", "u", "wrong", smtp_factory=FakeSMTP, pool_size=2)
+    with pytest.raises(DeliveryAborted) as err:
+        engine.deliver("S", "x", ["a@x", "b@x"], log)
+    log.close()
+    assert err.value.stats["failed"] == 0 and "535" in str(err.value)
+    assert SendLog(path).done == set()
+    # with fixed credentials the rerun delivers to everyone
+    stats = _engine().deliver("S", "x", ["a@x", "b@x"], SendLog(path))
+    assert stats["sent"] == 2
+
+
+def test_skipped_counts_current_recipients_only(fake_smtp, tmp_path):
+    log = SendLog(tmp_path / "log.jsonl")
+    log.record(["gone@x", "a@x"], "sent")
+    stats = _engine().deliver("S", "x", ["a@x", "b@x"], log)
+    assert stats["skipped"] == 1 and stats["sent"] == 1
+
+
+def test_local_smtp_server_10k_subscribers(tmp_path):
+    pytest.importorskip("aiosmtpd")
+    from aiosmtpd.controller import Controller
+
+    received = []
+
+    class Handler:
+        async def handle_DATA(self, server, session, envelope):
+            received.extend(envelope.rcpt_tos)
+            return "250 OK"
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    controller = Controller(Handler(), hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+        subs = [f"user{i}@example.com" for i in range(10_000)]
+        engine = DeliveryEngine("127.0.0.1", port, "news@example.com", pool_size=4, batch_size=50,
+                                starttls=False, backoff_s=0)
+        log = SendLog(tmp_path / "issue.jsonl")
+        stats = engine.deliver("S", "<p>x</p>", subs, log)
+        log.close()
+        assert stats["sent"] == 10_000
+        assert sorted(received) == sorted(subs)
+
+        log = SendLog(tmp_path / "issue.jsonl")
+        assert engine.deliver("S", "<p>x</p>", subs, log)["sent"] == 0
+        log.close()
+        assert len(received) == 10_000
+    finally:
+        controller.stop()
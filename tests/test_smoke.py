@@ -1,4 +1,3 @@
-import os
 import sys
 from pathlib import Path
 import yaml
@@ -19,7 +18,7 @@ def test_guard_and_paths():
         importlib.import_module(module)
 
 
-def test_idempotent_and_archive(monkeypatch):
+def test_idempotent_and_archive(monkeypatch, tmp_path):
     from generate_all import main as generate
     import fetch_ai_news
 
@@ -31,25 +30,23 @@ def test_idempotent_and_archive(monkeypatch):
             self.feed = {"title": "Dummy"}
 
     monkeypatch.setattr(fetch_ai_news, "feedparser", type("FP", (), {"parse": staticmethod(lambda url: DummyFeed())}))
+    monkeypatch.setattr(fetch_ai_news, "_download", lambda url, timeout, *a: (200, b"", {}))
 
-    seen_path = Path("data/seen.json")
-    original_seen = seen_path.read_text(encoding="utf-8") if seen_path.exists() else None
+    # build inside a scratch copy so the committed site/ and data/ stay untouched
+    (tmp_path / "data").mkdir()
+    for name in ("config.yaml", "data/curated.json"):
+        (tmp_path / name).write_bytes((ROOT / name).read_bytes())
+    monkeypatch.chdir(tmp_path)
 
-    for path in ["out", "site"]:
-        if Path(path).exists():
-            for target in Path(path).glob("*"):
-                if target.is_file() and target.name != ".nojekyll":
-                    target.unlink()
-
-    os.environ["FORCE_RUN"] = "1"
-    os.environ["RESET_SEEN"] = "1"
+    monkeypatch.setenv("FORCE_RUN", "1")
+    monkeypatch.setenv("RESET_SEEN", "1")
     generate()
 
     archive = Path("site/archive.html").read_text(encoding="utf-8")
     first_listing = sorted(p.name for p in Path("site").glob("*.html"))
 
-    os.environ.pop("FORCE_RUN", None)
-    os.environ["RESET_SEEN"] = "0"
+    monkeypatch.delenv("FORCE_RUN")
+    monkeypatch.setenv("RESET_SEEN", "0")
     generate()
 
     archive_again = Path("site/archive.html").read_text(encoding="utf-8")
@@ -57,11 +54,3 @@ def test_idempotent_and_archive(monkeypatch):
 
     assert archive == archive_again
     assert first_listing == second_listing
-
-    os.environ.pop("RESET_SEEN", None)
-
-    if original_seen is None:
-        if seen_path.exists():
-            seen_path.unlink()
-    else:
-        seen_path.write_text(original_seen, encoding="utf-8")
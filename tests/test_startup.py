@@ -0,0 +1,50 @@
+import json
+import subprocess
+import sys
+
+import utils
+from conftest import ROOT
+
+HEAVY = ["feedparser", "yaml", "numpy", "make_posts", "fetch_ai_news", "filters", "pipeline", "templating",
+         "concurrent.futures.process"]
+# the no-op path takes tens of milliseconds; the headroom is for loaded CI runners
+BUDGET_S = 1.0
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import generate_all
+generate_all.main([])
+print(json.dumps({"seconds": time.perf_counter() - t0, "loaded": [m for m in %r if m in sys.modules]}))
+"""
+
+
+def test_noop_run_skips_heavy_imports(tmp_path):
+    (tmp_path / "config.yaml").write_bytes((ROOT / "config.yaml").read_bytes())
+    (tmp_path / "site").mkdir()
+    (tmp_path / "site" / f"{utils.today_pl_date()}.html").write_text("<html></html>", encoding="utf-8")
+    env = {"PYTHONPATH": str(ROOT), "PATH": "", "FORCE_RUN": "0"}
+    proc = subprocess.run([sys.executable, "-c", PROBE % HEAVY], cwd=tmp_path, env=env,
+                          capture_output=True, text=True, timeout=30, check=True)
+    result = json.loads(proc.stdout.splitlines()[-1])
+    assert result["loaded"] == []
+    # timed inside the probe, so interpreter start-up is not counted
+    assert result["seconds"] < BUDGET_S
+    assert "already exists" in proc.stderr
+    assert not (tmp_path / "out").exists()
+
+
+def test_config_cache_follows_mtime(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "config.yaml"
+    path.write_text("newsletter: {mode: top}\n", encoding="utf-8")
+    assert utils.load_config()["newsletter"]["mode"] == "top"
+    assert json.loads((tmp_path / ".cache" / "config.json").read_text(encoding="utf-8"))["config"]["newsletter"]
+
+    # a hit never touches the YAML parser
+    monkeypatch.setitem(sys.modules, "yaml", None)
+    assert utils.load_config()["newsletter"]["mode"] == "top"
+
+    monkeypatch.delitem(sys.modules, "yaml")
+    path.write_text("newsletter: {mode: segments}\n", encoding="utf-8")
+    assert utils.load_config()["newsletter"]["mode"] == "segments"
@@ -0,0 +1,72 @@
+import json
+
+import generate_all
+import ranking
+import story_index
+from pipeline import Context, Pipeline
+from story_index import StoryIndex, simhash
+
+STORY = {"title": "OpenAI pokazuje nowy model językowy GPT dla firm w Polsce - Onet",
+         "summary": "Model obsługuje język polski, długi kontekst i narzędzia dla programistów oraz firm",
+         "url": "https://onet.pl/a"}
+
+
+def _repeat():
+    # same story a day later from another outlet with a lightly edited title
+    return {"title": "OpenAI pokazuje nowy model językowy GPT dla firm w Polsce - WP",
+            "summary": STORY["summary"], "url": "https://wp.pl/b"}
+
+
+def test_simhash_is_stable_and_close_for_repeats():
+    a, b = simhash(STORY), simhash(_repeat())
+    assert a == simhash(dict(STORY)) and a.bit_length() <= 64
+    assert (a ^ b).bit_count() <= 3
+    other = simhash({"title": "Sejm przyjął ustawę o ochronie danych w szpitalach", "summary": ""})
+    assert (a ^ other).bit_count() > 10
+
+
+def test_match_eviction_and_compaction(tmp_path):
+    path = tmp_path / "stories.jsonl"
+    index = StoryIndex(str(path))
+    index.add_items([{"title": f"Wydarzenie numer {i} w branży {i * 7}", "summary": f"opis {i}", "url": f"https://x.pl/{i}"}
+                     for i in range(100)], 10.0)
+    index.add_items([STORY], 500.0)
+    index.flush()
+
+    index = StoryIndex(str(path))
+    assert index.match(simhash(_repeat())) == STORY["url"]
+    assert index.evict_before(100.0) == 100
+    assert len(index) == 1 and all(url == STORY["url"] for band in index._table for b in band.values() for url in b)
+    index.flush()
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(l)["u"] for l in lines] == [STORY["url"]]
+
+    index.add_items([{"title": "Inna historia", "summary": "", "url": "https://x.pl/new"}], 600.0)
+    index.flush()
+    assert path.read_text(encoding="utf-8").startswith(lines[0])
+    assert len(StoryIndex(str(path))) == 2
+
+
+def _cfg(tmp_path, action="drop"):
+    return {
+        "newsletter": {"mode": "top", "per_bucket": 5, "total_fallback": 5},
+        "seen_cache": {"path": str(tmp_path / "seen.jsonl")},
+        "stories": {"path": str(tmp_path / "stories.jsonl"), "ttl_days": 7, "action": action},
+        "pipeline": {"stages": ["seen"]},
+    }
+
+
+def test_seen_stage_drops_or_marks_repeats(tmp_path):
+    cfg = _cfg(tmp_path)
+    _, seen = generate_all.apply_seen([], cfg)
+    generate_all.commit_seen([STORY], cfg, seen, story_index.open_story_index(cfg))
+
+    fresh = {"title": "Sejm przyjął ustawę o ochronie danych", "summary": "", "url": "https://x.pl/c"}
+    out = list(Pipeline.from_config(cfg).run([dict(STORY), _repeat(), fresh], Context(cfg, 5)))
+    assert [it["url"] for it in out] == [fresh["url"]]
+
+    cfg = _cfg(tmp_path, "downrank")
+    out, _ = generate_all.apply_seen([_repeat(), fresh], cfg)
+    assert out[0]["repeat_of"] == STORY["url"] and "repeat_of" not in out[1]
+    s = ranking.Scorer(out)
+    assert s(out[0]) < s(out[1])
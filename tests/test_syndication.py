@@ -0,0 +1,58 @@
+import json
+import os
+import xml.etree.ElementTree as ET
+
+from syndication import FeedWindow, iter_json_feed, write_feeds
+
+CFG = {"html": {"title": "Machine Cinema"}, "feed": {"site_url": "https://example.org/news"}}
+
+
+def _items(date_str, n=2):
+    return [{"title": f"Nowość {date_str} #{i} & „więcej”", "summary": "<p>Opis &amp; szczegóły</p>",
+             "url": f"https://x.pl/{date_str}/{i}?a=1&b=2", "source": "Onet", "topic": "Biznes",
+             "published_at": f"{date_str}T08:0{i}:00+02:00"} for i in range(n)]
+
+
+def test_window_is_bounded_and_replaces_reruns(tmp_path):
+    window = FeedWindow(tmp_path / "window.json", max_issues=2)
+    for d in ["2025-10-01", "2025-10-02", "2025-10-03"]:
+        window.add_issue(d, _items(d))
+    window.add_issue("2025-10-03", _items("2025-10-03", 1))
+    assert window.save()
+    window = FeedWindow(tmp_path / "window.json", max_issues=2)
+    assert [i["date"] for i in window.issues] == ["2025-10-03", "2025-10-02"]
+    assert [e["url"] for e in window.entries()][:2] == ["https://x.pl/2025-10-03/0?a=1&b=2", "https://x.pl/2025-10-02/0?a=1&b=2"]
+    assert next(window.entries())["summary"] == "Opis & szczegóły"
+
+
+def test_feeds_are_valid_and_byte_stable(tmp_path):
+    window = FeedWindow(tmp_path / "window.json")
+    window.add_issue("2025-10-02", _items("2025-10-02"))
+    window.save()
+    write_feeds(window, CFG, tmp_path)
+
+    rss = ET.parse(tmp_path / "feed.xml").getroot().find("channel")
+    items = rss.findall("item")
+    assert rss.findtext("link") == "https://example.org/news/"
+    assert items[0].findtext("title") == "Nowość 2025-10-02 #0 & „więcej”"
+    assert items[0].findtext("link") == "https://x.pl/2025-10-02/0?a=1&b=2"
+    assert items[0].findtext("pubDate") == "Thu, 02 Oct 2025 08:00:00 +0200"
+    assert rss.findtext("lastBuildDate") == "Thu, 02 Oct 2025 00:00:00 +0200"
+
+    feed = json.loads((tmp_path / "feed.json").read_text(encoding="utf-8"))
+    assert feed["version"] == "https://jsonfeed.org/version/1.1" and feed["feed_url"] == "https://example.org/news/feed.json"
+    assert [it["id"] for it in feed["items"]] == [it.findtext("guid") for it in items]
+    assert feed["items"][1] == {"id": "https://x.pl/2025-10-02/1?a=1&b=2", "url": "https://x.pl/2025-10-02/1?a=1&b=2",
+                                "title": "Nowość 2025-10-02 #1 & „więcej”", "content_text": "Opis & szczegóły",
+                                "date_published": "2025-10-02T08:01:00+02:00", "authors": [{"name": "Onet"}],
+                                "tags": ["Biznes"]}
+
+    for name in ("feed.xml", "feed.json"):
+        os.utime(tmp_path / name, ns=(1, 1))
+    write_feeds(FeedWindow(tmp_path / "window.json"), CFG, tmp_path)
+    window = FeedWindow(tmp_path / "window.json")
+    window.add_issue("2025-10-02", _items("2025-10-02"))
+    write_feeds(window, CFG, tmp_path)
+    assert all((tmp_path / name).stat().st_mtime_ns == 1 for name in ("feed.xml", "feed.json"))
+
+    assert json.loads("".join(iter_json_feed(FeedWindow(tmp_path / "none.json"), "t", "u/")))["items"] == []
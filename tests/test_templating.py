@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+import make_posts
+import templating
+
+
+def test_autoescape_and_safe():
+    fn = templating.compile_template("<b>{{ a }}</b>{{ a|safe }}", "t.html")
+    assert fn({"a": "<R&D>"}) == "<b>&lt;R&amp;D&gt;</b><R&D>"
+    plain = templating.compile_template("{{ a }}", "t.md", autoescape=False)
+    assert plain({"a": "<x>"}) == "<x>"
+
+
+def test_loops_conditions_and_lookups():
+    src = "{% for x in xs %}{% if not loop.first %}, {% endif %}{{ loop.index }}:{{ x.name }}/{{ x.pair.1 }}{% endfor %}" \
+          "{% if missing %}yes{% else %}no{% endif %}"
+    fn = templating.compile_template(src)
+    xs = [{"name": "a", "pair": ["p", "q"]}, {"name": "b", "pair": ["r", "s"]}]
+    assert fn({"xs": xs}) == "1:a/q, 2:b/sno"
+
+
+def test_syntax_errors():
+    with pytest.raises(templating.TemplateError):
+        templating.compile_template("{% for x in xs %}")
+    with pytest.raises(templating.TemplateError):
+        templating.compile_template("{{ a + b }}")
+
+
+def test_cache_keyed_by_mtime(tmp_path):
+    path = tmp_path / "t.html"
+    path.write_text("v1 {{ a }}", encoding="utf-8")
+    first = templating.get_template("t.html", tmp_path)
+    assert templating.get_template("t.html", tmp_path) is first
+    path.write_text("v2 {{ a }}", encoding="utf-8")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert templating.get_template("t.html", tmp_path)({"a": 1}) == "v2 1"
+
+
+def test_render_many_shares_context():
+    items = [{"title": "A & B", "summary": "s", "url": "https://x/?a=1&b=2", "source": "src"}]
+    html_cfg = {"title": "T", "banner_text": "B", "footer_links": [["GitHub", "https://github.com"]]}
+    out = list(make_posts.render_many([{"date": "2025-10-25", "items": items}], html_cfg))
+    assert out[0]["html"] == make_posts.to_html_page("2025-10-25", "T", "B", items, html_cfg["footer_links"])
+    assert 'href="https://x/?a=1&amp;b=2"' in out[0]["html"] and "A &amp; B" in out[0]["html"]
+    assert out[0]["md"] == "- **A & B** — s [Czytaj](https://x/?a=1&b=2)\n"
+    assert '<a href="https://github.com">GitHub</a> | <a href="archive.html">' in out[0]["html"]
@@ -0,0 +1,75 @@
+import json
+
+import numpy as np
+
+import pipeline
+import topics
+from pipeline import Context, Pipeline
+
+EXAMPLES = [
+    {"title": "Startup pozyskał miliony od inwestorów", "topic": "Biznes"},
+    {"title": "Spółka notuje rekordowe przychody", "topic": "Biznes"},
+    {"title": "Fundusz inwestuje w startup AI", "topic": "Biznes"},
+    {"title": "Naukowcy publikują badanie o sieciach neuronowych", "topic": "Badania"},
+    {"title": "Nowe badanie uniwersytetu o modelach", "topic": "Badania"},
+    {"title": "Zespół naukowców opisał eksperyment", "topic": "Badania"},
+]
+
+
+def _model(tmp_path):
+    path = tmp_path / "model.npy"
+    topics.train(EXAMPLES, dim=1 << 12).save(path, examples=len(EXAMPLES))
+    return path
+
+
+def test_train_save_and_mmap_load(tmp_path):
+    path = _model(tmp_path)
+    assert json.loads(path.with_suffix(".json").read_text(encoding="utf-8"))["labels"] == ["Badania", "Biznes"]
+    model = topics.TopicModel.load(path)
+    assert isinstance(model.weights, np.memmap) and model.weights.shape == (1 << 12 | 1, 2)
+    got = model.predict([{"title": "Inwestorzy i fundusz: startup z rekordem"},
+                         {"summary": "Badanie naukowców z uniwersytetu"}, {"title": ""}])
+    assert [t for t, _ in got[:2]] == ["Biznes", "Badania"]
+    assert got[0][1] > 0.9
+
+
+def test_features_are_per_item_and_stable():
+    a = [{"title": "Nowe badanie"}, {"title": "Startup, inwestorzy!"}]
+    ids, owner = topics.features(a, 1 << 16)
+    # two unigrams + one bigram per item; the bigram never spans items
+    assert owner.tolist() == [0, 0, 1, 1, 0, 1]
+    ids2, _ = topics.features(list(reversed(a)), 1 << 16)
+    assert sorted(ids.tolist()) == sorted(ids2.tolist())
+    # case and punctuation do not change the features
+    assert topics.features([{"title": "NOWE — badanie."}], 1 << 16)[0].tolist() == ids[[0, 1, 4]].tolist()
+
+
+def test_classify_keeps_source_topics_and_low_confidence(tmp_path):
+    cfg = {"topics": {"model_path": str(_model(tmp_path)), "min_confidence": 0.9}}
+    items = [{"title": "Startup i inwestorzy", "topic": "Ogólne"},
+             {"title": "Startup i inwestorzy", "topic": "Produkty"},
+             {"title": "Coś zupełnie innego", "topic": "Ogólne"}]
+    out = list(topics.iter_classify(items, cfg))
+    assert out[0]["topic"] == "Biznes" and out[0]["topic_score"] >= 0.9
+    assert out[1]["topic"] == "Produkty" and "topic_score" not in out[1]
+    assert out[2]["topic"] == "Ogólne"
+
+
+def test_topic_stage_keeps_early_stop_bounded(tmp_path):
+    cfg = {
+        "newsletter": {"mode": "top", "per_bucket": 2, "total_fallback": 2},
+        "seen_cache": {"path": str(tmp_path / "seen.jsonl"), "ttl_days": None},
+        "topics": {"model_path": str(_model(tmp_path)), "batch_size": 64},
+        "pipeline": {},
+    }
+    pulled = []
+
+    def source():
+        for i in range(1000):
+            pulled.append(i)
+            yield {"title": f"Startup inwestorzy temat{i} wiadomość{i} nowość{i} sprawa{i}", "summary": "", "url": f"https://example.com/{i}"}
+
+    ctx = Context(cfg, pipeline.selection_quota(cfg), margin=3)
+    out = list(Pipeline.from_config(cfg).run(source(), ctx))
+    assert len(out) == 5 and all(it["topic"] == "Biznes" for it in out)
+    assert len(pulled) < 2 * len(out)
@@ -0,0 +1,80 @@
+import json
+
+import generate_all
+import urlkey
+from filters import dedup
+from seen_store import open_seen_store
+from urlkey import canonical, key
+
+SAMPLE = "https://news.google.com/rss/articles/CBMiRmh0dHBzOi8vZXhhbXBsZS5jb20vYXJ0aWNsZS_SAQA?oc=5"
+
+
+def test_canonical_normalizes_links():
+    assert canonical("HTTPS://WWW.Onet.PL:443/a/b?utm_source=rss&id=7&fbclid=x#komentarze") == "https://www.onet.pl/a/b?id=7"
+    assert canonical("http://onet.pl:8080/a") == "http://onet.pl:8080/a"
+    assert canonical("https://news.google.com/url?url=https://Wp.pl/x%3Futm_medium%3Dsocial") == "https://wp.pl/x"
+    assert canonical(SAMPLE) == "https://example.com/article/"
+    assert canonical("") == ""
+
+
+def test_key_is_shared_by_equivalent_links():
+    same = ["https://onet.pl/a/?id=1&p=2", "http://ONET.pl/a?p=2&id=1", "https://onet.pl:443/a?id=1&p=2&utm_campaign=x#top"]
+    assert len({key(u) for u in same}) == 1
+    assert key("https://onet.pl/a?id=1") != key("https://onet.pl/a?id=2")
+    # Google News links that cannot be unwrapped lose only their locale query
+    opaque = "https://news.google.com/articles/placeholder-openai-video"
+    assert key(opaque + "?hl=pl&gl=PL&ceid=PL:pl") == key(opaque)
+    assert key(SAMPLE) == key("https://example.com/article")
+    assert len(key(SAMPLE)) == 2 * urlkey.KEY_BYTES and urlkey.is_key(key(SAMPLE))
+    assert key.cache_info().maxsize == urlkey.MEMO_SIZE
+
+
+def test_normalize_computes_the_key_once(monkeypatch):
+    from fetch_ai_news import normalize
+    items = normalize([{"title": "A", "url": "https://onet.pl/a/?utm_source=x"}, {"title": "B", "url": SAMPLE}])
+    assert [it["key"] for it in items] == [key("https://onet.pl/a"), key(SAMPLE)]
+
+    # downstream stages read it["key"] instead of recomputing it
+    def boom(_url):
+        raise AssertionError("key recomputed")
+    monkeypatch.setattr("filters.url_key", boom)
+    monkeypatch.setattr(urlkey, "key", boom)
+    assert dedup(items, None) == items
+
+
+def test_dedup_and_seen_agree(tmp_path):
+    items = [{"title": "Pierwszy", "url": "https://onet.pl/a/"}, {"title": "Drugi", "url": "https://onet.pl/a?utm_source=x"}]
+    assert len(dedup([dict(it) for it in items], None)) == 1
+
+    cfg = {"seen_cache": {"path": str(tmp_path / "seen.jsonl"), "ttl_days": None}}
+    fresh, seen = generate_all.apply_seen(items[:1], cfg)
+    generate_all.commit_seen(fresh, cfg, seen)
+    fresh, _ = generate_all.apply_seen(items[1:], cfg)
+    assert fresh == []
+
+
+def test_seen_urls_are_migrated_to_keys(tmp_path):
+    path = tmp_path / "seen.jsonl"
+    legacy = tmp_path / "seen.json"
+    cfg = {"seen_cache": {"path": str(path), "legacy_path": str(legacy), "ttl_days": None}}
+
+    legacy.write_text(json.dumps({"https://onet.pl/a": {"ts": 10}, "https://news.google.com/articles/opaque?hl=pl": {"ts": 20},
+                                  SAMPLE: {"ts": 30}}), encoding="utf-8")
+    seen = open_seen_store(cfg)
+    # Google News article IDs are decoded during migration, without the network
+    assert seen.get(key("https://example.com/article")) == 30.0
+    assert key("https://onet.pl/a/#x") in seen and key("https://news.google.com/articles/opaque") in seen
+    assert seen.get(key("https://onet.pl/a")) == 10.0
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert all(urlkey.is_key(rec["k"]) for rec in lines) and len(lines) == 3
+    # already migrated: nothing to rewrite
+    assert open_seen_store(cfg).rekey(urlkey.offline_key, urlkey.is_key) == 0
+
+
+def test_migration_is_saved_without_a_flush(tmp_path):
+    path = tmp_path / "seen.jsonl"
+    path.write_text('{"k": "https://onet.pl/a", "ts": 10}\n', encoding="utf-8")
+    cfg = {"seen_cache": {"path": str(path), "ttl_days": None}}
+    # a run that selects nothing never flushes the store it opened
+    assert key("https://onet.pl/a") in open_seen_store(cfg)
+    assert open_seen_store(cfg).rekey(urlkey.offline_key, urlkey.is_key) == 0
@@ -0,0 +1,215 @@
+"""Offline topic classifier: hashed word n-grams scored by a linear model.
+
+    python topics.py train [--out data/topic_model.npy] [--dim 4096]
+
+Training reads ``data/curated.json``, hand labels in
+``data/topic_labels.jsonl`` and stored issues whose topics were not set by
+the model. The weights are a ``(dim + 1, n_topics)`` float16 ``.npy`` (last
+row = bias) that is memory-mapped at load time; topic names live in a JSON
+sidecar next to it.
+"""
+from __future__ import annotations
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import argparse
+import json
+import os
+import string
+import sys
+import unicodedata
+
+try:  # optional; without numpy items keep their default topic
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised when numpy is missing
+    np = None
+
+from utils import LOG, read_json
+
+DEFAULT_TOPIC = "Ogólne"
+# 4096 x 5 topics in float16 is ~40 KB; raise --dim once the labelled set outgrows it
+DEFAULT_DIM = 1 << 12
+BATCH_SIZE = 256
+MIN_CONFIDENCE = 0.5
+ALPHA = 0.1
+_BIGRAM_MULT = 0x9E3779B1
+
+_SEP = b"\x1e"  # never in feed text: XML 1.0 does not allow it
+_UNICODE_PUNCT = "„”“’‘—–…«»"
+_SPACES = bytes(range(33)) + string.punctuation.encode("ascii")
+_TO_SPACE = bytes.maketrans(_SPACES.replace(_SEP, b""), b" " * (len(_SPACES) - 1))
+_MAX_TOKEN_BYTES = 64
+# powers of an odd multiplier; a token's hash is sum((byte + 1) * P**i) mod 2**32
+_POW = np.cumprod(np.full(_MAX_TOKEN_BYTES, 0x01000193, dtype=np.uint32)) if np is not None else None
+
+
+def _fold(text: str) -> bytes:
+    text = unicodedata.normalize("NFKC", text).casefold()
+    for ch in _UNICODE_PUNCT:
+        text = text.replace(ch, " ")
+    return text.encode("utf-8").translate(_TO_SPACE)
+
+
+def features(items: List[Dict], dim: int) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Feature ids of word unigrams and bigrams for a batch, with the index
+    of the item each one belongs to.
+
+    The batch is folded as one byte string with a record separator between
+    items; tokens are hashed with vectorized polynomial hashing, so no
+    Python code runs per token and ids are stable across processes.
+    """
+    data = _fold(" \x1e ".join(f"{it.get('title') or ''} {it.get('summary') or ''}" for it in items))
+    buf = np.frombuffer(data, dtype=np.uint8)
+    word = buf != 32
+    wb = buf[word].astype(np.uint32)
+    first = (word & np.concatenate(([True], ~word[:-1])))[word]
+    starts = np.flatnonzero(first)
+    if not len(starts):
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    tok = np.cumsum(first) - 1
+    pos = np.arange(len(wb)) - starts[tok]
+    hashes = np.add.reduceat((wb + np.uint32(1)) * _POW[pos & (_MAX_TOKEN_BYTES - 1)], starts).astype(np.uint64)
+    lengths = np.diff(np.append(starts, len(wb)))
+    is_sep = (lengths == 1) & (wb[starts] == _SEP[0])
+    owner = np.cumsum(is_sep)
+    # single characters ("w", "z", "i") carry no topic signal
+    keep = (lengths > 1) & ~is_sep
+    h, owner = hashes[keep], owner[keep]
+    same = owner[:-1] == owner[1:]
+    bigrams = (h[:-1] * np.uint64(_BIGRAM_MULT) + h[1:])[same]
+    ids = np.concatenate([h, bigrams]) % np.uint64(dim)
+    return ids.astype(np.int64), np.concatenate([owner, owner[:-1][same]])
+
+
+class TopicModel:
+    def __init__(self, weights: "np.ndarray", labels: List[str]):
+        self.weights = weights
+        self.labels = labels
+        self.dim = weights.shape[0] - 1
+
+    @classmethod
+    def load(cls, path: str | Path) -> "TopicModel":
+        path = Path(path)
+        meta = read_json(path.with_suffix(".json"), {})
+        return cls(np.load(path, mmap_mode="r"), meta["labels"])
+
+    def save(self, path: str | Path, **meta) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp.npy")
+        np.save(tmp, np.asarray(self.weights, dtype=np.float16))
+        os.replace(tmp, path)
+        Path(path.with_suffix(".json")).write_text(
+            json.dumps(dict(meta, labels=self.labels, dim=self.dim), ensure_ascii=False, indent=2), encoding="utf-8")
+
+    def scores(self, items: List[Dict]) -> "np.ndarray":
+        ids, owner = features(items, self.dim)
+        rows = self.weights[ids]
+        out = np.empty((len(items), len(self.labels)), dtype=np.float64)
+        for c in range(len(self.labels)):
+            out[:, c] = np.bincount(owner, weights=rows[:, c], minlength=len(items))
+        return out + self.weights[self.dim]
+
+    def predict(self, items: List[Dict]) -> List[Tuple[str, float]]:
+        """``(topic, probability)`` per item."""
+        if not items:
+            return []
+        s = self.scores(items)
+        s -= s.max(axis=1, keepdims=True)
+        p = np.exp(s)
+        p /= p.sum(axis=1, keepdims=True)
+        best = p.argmax(axis=1)
+        return [(self.labels[b], float(p[i, b])) for i, b in enumerate(best)]
+
+
+def train(examples: Iterable[Dict], dim: int = DEFAULT_DIM, alpha: float = ALPHA) -> TopicModel:
+    """Multinomial naive Bayes over hashed n-grams, stored as linear weights."""
+    examples = [ex for ex in examples if ex.get("topic") and ex["topic"] != DEFAULT_TOPIC]
+    labels = sorted({ex["topic"] for ex in examples})
+    if len(labels) < 2:
+        raise ValueError("need labeled examples for at least two topics")
+    y = np.array([labels.index(ex["topic"]) for ex in examples])
+    ids, owner = features(examples, dim)
+    counts = np.zeros((dim, len(labels)), dtype=np.float64)
+    np.add.at(counts, (ids, y[owner]), 1.0)
+    logp = np.log(counts + alpha) - np.log(counts.sum(axis=0) + alpha * dim)
+    # centring each row leaves the argmax unchanged and makes unseen
+    # features contribute exactly zero
+    logp -= logp.mean(axis=1, keepdims=True)
+    prior = np.log(np.bincount(y, minlength=len(labels)) / len(y))
+    return TopicModel(np.vstack([logp, prior]).astype(np.float16), labels)
+
+
+def training_examples(curated: str = "data/curated.json", labels: str = "data/topic_labels.jsonl",
+                      issues_dir: str = "data/issues") -> List[Dict]:
+    out = list(read_json(curated, []))
+    p = Path(labels)
+    if p.exists():
+        out += [json.loads(line) for line in p.read_text(encoding="utf-8").splitlines() if line.strip()]
+    for f in sorted(Path(issues_dir).glob("*.json")):
+        # items the model labelled itself carry topic_score; skip them
+        out += [it for it in read_json(f, {}).get("items", []) if "topic_score" not in it]
+    return out
+
+
+_loaded: Dict[str, Tuple[int, TopicModel]] = {}
+
+
+def load_model(path: Optional[str]) -> Optional[TopicModel]:
+    if np is None or not path or not Path(path).exists():
+        return None
+    mtime = os.stat(path).st_mtime_ns
+    hit = _loaded.get(path)
+    if hit is None or hit[0] != mtime:
+        hit = _loaded[path] = (mtime, TopicModel.load(path))
+    return hit[1]
+
+
+def iter_classify(items: Iterable[Dict], cfg: Optional[Dict] = None) -> Iterator[Dict]:
+    """Fill ``topic`` on items that only have the default one, a batch at a time.
+
+    Batches start at one item and double up to ``topics.batch_size``, so an
+    early stop downstream never pulls more than twice what it consumed.
+    """
+    tc = (cfg or {}).get("topics") or {}
+    model = load_model(tc.get("model_path"))
+    if model is None:
+        if tc.get("model_path"):
+            LOG.info("No topic model at %s; items keep their source topic.", tc["model_path"])
+        yield from items
+        return
+    min_conf = float(tc.get("min_confidence", MIN_CONFIDENCE))
+    max_batch = int(tc.get("batch_size", BATCH_SIZE))
+    it = iter(items)
+    size = 1
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        size = min(size * 2, max_batch)
+        todo = [x for x in batch if (x.get("topic") or DEFAULT_TOPIC) == DEFAULT_TOPIC]
+        for x, (topic, p) in zip(todo, model.predict(todo)):
+            if p >= min_conf:
+                x["topic"], x["topic_score"] = topic, round(p, 3)
+        yield from batch
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Train the topic classifier.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    t = sub.add_parser("train")
+    t.add_argument("--out", default="data/topic_model.npy")
+    t.add_argument("--dim", type=int, default=DEFAULT_DIM)
+    args = ap.parse_args(argv)
+    if np is None:
+        LOG.error("numpy is required to train the topic model.")
+        return 1
+    examples = training_examples()
+    model = train(examples, args.dim)
+    model.save(args.out, examples=len(examples))
+    LOG.info("Trained %d topics on %d examples -> %s", len(model.labels), len(examples), args.out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,117 @@
+"""One URL identity for normalize, dedup and the seen cache.
+
+:func:`canonical` is the link an item is published under: Google News
+wrappers unwrapped (``?url=`` or :mod:`gnews`), scheme and host lowercased,
+default ports, tracking parameters and the fragment dropped.
+:func:`key` is its identity: a fixed-width blake2b digest of the canonical
+link without scheme, trailing slash or parameter order (and without the
+locale query of links Google News could not unwrap), so ``http://X.pl/a/``
+and ``https://x.pl/a?utm_source=rss`` share a key.
+
+Both are memoized in bounded LRUs. Normalize stores each item's key as
+``it["key"]`` (via :func:`digest` of the link it already canonicalized) and
+later stages read that field instead of going back to the memo.
+"""
+from __future__ import annotations
+from functools import lru_cache
+from typing import Callable
+import hashlib
+import re
+import urllib.parse as _up
+
+KEY_BYTES = 12
+MEMO_SIZE = 1 << 16
+TRACKING = frozenset({"gclid", "fbclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid", "_ga"})
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+_KEY_RE = re.compile(rf"[0-9a-f]{{{KEY_BYTES * 2}}}")
+
+
+def _is_google(host: str) -> bool:
+    return "news.google." in host
+
+
+def _clean(url: str) -> str:
+    p = _up.urlsplit(url)
+    scheme = p.scheme.lower()
+    host = (p.hostname or "").lower()
+    netloc = host if p.port in (None, DEFAULT_PORTS.get(scheme)) else f"{host}:{p.port}"
+    if p.username:
+        netloc = f"{p.username}@{netloc}"
+    qs = [(k, v) for k, v in _up.parse_qsl(p.query) if not k.lower().startswith("utm_") and k.lower() not in TRACKING]
+    return _up.urlunsplit((scheme, netloc, p.path, _up.urlencode(qs), ""))
+
+
+def _online(url: str) -> str | None:
+    from gnews import resolve
+    return resolve(url)
+
+
+def _offline(url: str) -> str | None:
+    from gnews import article_id, decode_article_id
+    aid = article_id(url)
+    return decode_article_id(aid) if aid else None
+
+
+def _unwrap(url: str, resolve: Callable[[str], str | None]) -> str | None:
+    cand = (_up.parse_qs(_up.urlsplit(url).query).get("url") or [None])[0]
+    if cand and cand.startswith(("http://", "https://")):
+        return cand
+    cand = resolve(url)
+    if cand and not _is_google(cand):
+        return cand
+    return None
+
+
+def _canonical(url: str, resolve: Callable[[str], str | None]) -> str:
+    if not url:
+        return url
+    try:
+        if _is_google((_up.urlsplit(url).hostname or "").lower()):
+            target = _unwrap(url, resolve)
+            # undecodable Google News links are kept as-is
+            return _canonical(target, resolve) if target else url
+        return _clean(url)
+    except ValueError:
+        return url
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def canonical(url: str) -> str:
+    return _canonical(url, _online)
+
+
+def _key_form(url: str) -> str:
+    p = _up.urlsplit(url)
+    host = p.netloc.lower()
+    query = "" if _is_google(host) else _up.urlencode(sorted(_up.parse_qsl(p.query)))
+    return f"{host}{p.path.rstrip('/')}?{query}"
+
+
+def digest(canon: str) -> str:
+    """:func:`key` of a link that is already canonical."""
+    try:
+        form = _key_form(canon)
+    except ValueError:
+        form = canon
+    return hashlib.blake2b(form.encode("utf-8"), digest_size=KEY_BYTES).hexdigest()
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def key(url: str) -> str:
+    return digest(canonical(url))
+
+
+def offline_key(url: str) -> str:
+    """:func:`key` without network lookups (article IDs are still decoded), for migrating stored URLs."""
+    return digest(_canonical(url, _offline))
+
+
+def is_key(value: str) -> bool:
+    return _KEY_RE.fullmatch(value) is not None
+
+
+def clear() -> None:
+    """Forget memoized results, e.g. after :func:`gnews.configure` changed how links resolve."""
+    canonical.cache_clear()
+    key.cache_clear()
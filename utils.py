@@ -3,7 +3,6 @@ import json, os, hashlib, logging
 from pathlib import Path
 from datetime import datetime
 from zoneinfo import ZoneInfo
-import urllib.parse as _up
 
 LOG = logging.getLogger("mcpl")
 logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
@@ -36,43 +35,52 @@ def write_json(path, data):
     Path(tmp).write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
     os.replace(tmp, path)
 
+def write_if_changed(path, data):
+    """Atomically write ``data`` (str or bytes) unless the file already holds
+    exactly these bytes; returns whether it wrote. Skipped files keep their mtime."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    p = Path(path)
+    try:
+        if p.stat().st_size == len(data) and p.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = f"{path}.tmp"
+    Path(tmp).write_bytes(data)
+    os.replace(tmp, path)
+    return True
+
 def stable_hash(s: str) -> str:
     return hashlib.sha256(s.encode("utf-8")).hexdigest()[:12]
 
 def canonical_or_allowed(url: str) -> str:
-    if not url:
-        return url
-    if "news.google." in url:
-        try:
-            parsed = _up.urlparse(url)
-            qs = _up.parse_qs(parsed.query)
-            cand = qs.get("url", [None])[0]
-            if cand and cand.startswith(("http://", "https://")):
-                return cand
-        except Exception:
-            pass
-        return url
-    try:
-        p = _up.urlparse(url)
-        cleaned_qs = _up.parse_qsl(p.query, keep_blank_values=False)
-        cleaned_qs = [
-            (k, v)
-            for (k, v) in cleaned_qs
-            if k.lower() not in {"utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content", "gclid", "fbclid"}
-        ]
-        new_query = _up.urlencode(cleaned_qs)
-        return _up.urlunparse((p.scheme, p.netloc, p.path, p.params, new_query, p.fragment))
-    except Exception:
-        return url
+    from urlkey import canonical
+    return canonical(url)
 
 def idempotent_guard_for_today():
     d = today_pl_date()
     target = Path(f"site/{d}.html")
     return target.exists()
 
-def load_config():
+CONFIG_CACHE = ".cache/config.json"
+
+def load_config(path="config.yaml", cache_path=CONFIG_CACHE):
+    # importing and running the YAML parser costs more than a whole no-op run;
+    # the parsed config is kept as JSON, keyed by the file's mtime and size
+    st = os.stat(path)
+    key = [str(Path(path).resolve()), st.st_mtime_ns, st.st_size]
+    cached = read_json(cache_path, None)
+    if isinstance(cached, dict) and cached.get("key") == key:
+        return cached["config"]
     import yaml
-    return yaml.safe_load(Path("config.yaml").read_text(encoding="utf-8"))
+    cfg = yaml.safe_load(Path(path).read_text(encoding="utf-8"))
+    try:
+        write_json(cache_path, {"key": key, "config": cfg})
+    except (OSError, TypeError, ValueError) as e:
+        LOG.warning("Config cache not written: %s", e)
+    return cfg
 
 def read_textfile(path: str) -> list[str]:
     p = Path(path)